@@ -1,36 +1,518 @@
 """ YouTube Аналитик - Полная система автоматизации продвижения на YouTube
 Версия 5.0 - Полностью рабочий интерфейс с реальными функциями """
 
-import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext, simpledialog
 import threading
+import atexit
+import queue
 import json
 import os
+import sys
+import subprocess
 import time
-from datetime import datetime, timedelta
+import argparse
+import importlib
+import importlib.util
+import csv
+import tracemalloc
+from datetime import datetime, timedelta, timezone
 import random
-import pandas as pd
+import secrets
 from pathlib import Path
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import hashlib
+import functools
+import itertools
+import re
+import zlib
 import uuid
-from tkinter import font as tkfont
+import tempfile
 import sqlite3
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
+
+# ================ ОТЛОЖЕННЫЕ ИМПОРТЫ ================
+
+class _LazyModule:
+    """Модуль (или атрибут модуля), импортируемый при первом обращении
+
+    Tkinter, matplotlib, pandas и numpy нужны только GUI, отчетам и
+    прогнозу; консольные команды работают без них и без дисплея.
+    """
+    
+    def __init__(self, module_name, attribute=None):
+        self._module_name = module_name
+        self._attribute = attribute
+        self._target = None
+    
+    def _load(self):
+        if self._target is None:
+            module = importlib.import_module(self._module_name)
+            self._target = getattr(module, self._attribute) if self._attribute else module
+        return self._target
+    
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+    
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+tk = _LazyModule('tkinter')
+ttk = _LazyModule('tkinter.ttk')
+messagebox = _LazyModule('tkinter.messagebox')
+scrolledtext = _LazyModule('tkinter.scrolledtext')
+simpledialog = _LazyModule('tkinter.simpledialog')
+tkfont = _LazyModule('tkinter.font')
+Figure = _LazyModule('matplotlib.figure', 'Figure')
+FigureCanvasTkAgg = _LazyModule('matplotlib.backends.backend_tkagg', 'FigureCanvasTkAgg')
+FigureCanvasAgg = _LazyModule('matplotlib.backends.backend_agg', 'FigureCanvasAgg')
+PdfPages = _LazyModule('matplotlib.backends.backend_pdf', 'PdfPages')
+np = _LazyModule('numpy')
+pd = _LazyModule('pandas')
+pa = _LazyModule('pyarrow')
+pq = _LazyModule('pyarrow.parquet')
 
 # ================ БАЗА ДАННЫХ ================
 
+# Размер кэша подготовленных выражений на одно соединение
+STATEMENT_CACHE_SIZE = 128
+
+# Профили хранения: PRAGMA, применяемые при открытии каждого соединения.
+# cache_size < 0 задается в КиБ, mmap_size - в байтах, busy_timeout - в мс.
+STORAGE_PROFILES = {
+    # Поведение SQLite по умолчанию (журнал отката, полная синхронизация)
+    'compat': {},
+    # WAL: читатели не блокируются писателем потока симуляции
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,
+        'mmap_size': 64 * 1024 * 1024,
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY'
+    },
+    # WAL с fsync на каждый коммит
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -16000,
+        'mmap_size': 0,
+        'busy_timeout': 10000
+    }
+}
+
+DEFAULT_STORAGE_PROFILE = 'balanced'
+
+# Миграции схемы: (версия, описание, шаги). Шаг - SQL-строка или функция,
+# принимающая соединение. Каждая миграция применяется в своей транзакции,
+# номер версии записывается в таблицу schema_version.
+SCHEMA_MIGRATIONS = [
+    (1, "Индексы по пользователю и времени для истории", [
+        'CREATE INDEX IF NOT EXISTS idx_channel_stats_user_time ON channel_stats (user_id, timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_simulation_history_user_time ON simulation_history (user_id, timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_video_content_user_created ON video_content (user_id, created_at)'
+    ]),
+    (2, "Индекс активных задач в порядке выдачи", [
+        'CREATE INDEX IF NOT EXISTS idx_tasks_user_open ON tasks (user_id, completed, priority DESC, due_date)'
+    ]),
+    (3, "Индекс настроек пользователя", [
+        'CREATE INDEX IF NOT EXISTS idx_user_settings_user ON user_settings (user_id)'
+    ]),
+    (4, "Seed генератора прогона в истории симуляций", [
+        'ALTER TABLE simulation_history ADD COLUMN seed INTEGER'
+    ]),
+    (5, "Дневной накопительный ряд подписчиков и просмотров", [
+        '''
+        CREATE TABLE IF NOT EXISTS channel_daily_rollup (
+            user_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            new_subscribers INTEGER NOT NULL DEFAULT 0,
+            new_views INTEGER NOT NULL DEFAULT 0,
+            subscribers INTEGER NOT NULL DEFAULT 0,
+            total_views INTEGER NOT NULL DEFAULT 0,
+            runs INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day)
+        ) WITHOUT ROWID
+        ''',
+        # Заполнение по уже накопленной истории: накопительные суммы оконной функцией
+        '''
+        INSERT OR REPLACE INTO channel_daily_rollup
+        (user_id, day, new_subscribers, new_views, subscribers, total_views, runs)
+        SELECT user_id, day, new_subscribers, new_views,
+               SUM(new_subscribers) OVER (PARTITION BY user_id ORDER BY day),
+               SUM(new_views) OVER (PARTITION BY user_id ORDER BY day),
+               runs
+        FROM (
+            SELECT user_id, date(timestamp) AS day, SUM(new_subscribers) AS new_subscribers,
+                   SUM(new_views) AS new_views, COUNT(*) AS runs
+            FROM simulation_history
+            GROUP BY user_id, date(timestamp)
+        )
+        '''
+    ]),
+    (6, "Текущая статистика и дельты вместо полного снимка на каждое изменение", [
+        '''
+        CREATE TABLE IF NOT EXISTS channel_stats_current (
+            user_id TEXT PRIMARY KEY,
+            timestamp TIMESTAMP NOT NULL,
+            total_views INTEGER DEFAULT 0,
+            subscribers INTEGER DEFAULT 0,
+            total_likes INTEGER DEFAULT 0,
+            total_comments INTEGER DEFAULT 0,
+            videos_uploaded INTEGER DEFAULT 0,
+            estimated_earnings REAL DEFAULT 0.0,
+            engagement_rate REAL DEFAULT 0.0,
+            watch_time_hours REAL DEFAULT 0.0,
+            keyframe_id INTEGER NOT NULL,
+            delta_count INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS channel_stats_deltas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            timestamp TIMESTAMP NOT NULL,
+            keyframe_id INTEGER NOT NULL,
+            changes TEXT NOT NULL,
+            FOREIGN KEY (keyframe_id) REFERENCES channel_stats(id)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_stats_deltas_keyframe ON channel_stats_deltas (keyframe_id, id)',
+        'CREATE INDEX IF NOT EXISTS idx_stats_deltas_user_time ON channel_stats_deltas (user_id, timestamp)',
+        # Текущее состояние - последний полный снимок пользователя
+        '''
+        INSERT OR REPLACE INTO channel_stats_current
+        (user_id, timestamp, total_views, subscribers, total_likes, total_comments,
+         videos_uploaded, estimated_earnings, engagement_rate, watch_time_hours, keyframe_id, delta_count)
+        SELECT user_id, timestamp, total_views, subscribers, total_likes, total_comments,
+               videos_uploaded, estimated_earnings, engagement_rate, watch_time_hours, id, 0
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY timestamp DESC, id DESC) AS rn
+            FROM channel_stats
+        )
+        WHERE rn = 1
+        '''
+    ]),
+    (7, "Индексы сортировок постраничных списков истории и контента", [
+        'CREATE INDEX IF NOT EXISTS idx_simulation_history_user_subs ON simulation_history (user_id, IFNULL(new_subscribers, 0))',
+        'CREATE INDEX IF NOT EXISTS idx_simulation_history_user_views ON simulation_history (user_id, IFNULL(new_views, 0))',
+        "CREATE INDEX IF NOT EXISTS idx_video_content_user_category ON video_content (user_id, IFNULL(category, ''))",
+        'CREATE INDEX IF NOT EXISTS idx_video_content_user_title ON video_content (user_id, title)'
+    ]),
+    (8, "Журнал событий активности с типизированными полями", [
+        '''
+        CREATE TABLE IF NOT EXISTS activity_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            timestamp TIMESTAMP NOT NULL,
+            activity TEXT NOT NULL,
+            category TEXT,
+            keyword TEXT,
+            hours INTEGER,
+            subscribers INTEGER,
+            views INTEGER,
+            details TEXT
+        )
+        ''',
+        # День - ключ секционирования: диапазон дней пользователя читается
+        # из индекса без обращения к таблице (агрегаты по дням и категориям)
+        'CREATE INDEX IF NOT EXISTS idx_activity_events_user_day ON activity_events (user_id, day, activity, category)'
+    ]),
+    (9, "Хеш заголовка и LSH-полосы MinHash для поиска повторов контента", [
+        'ALTER TABLE video_content ADD COLUMN title_hash INTEGER',
+        '''
+        CREATE TABLE IF NOT EXISTS video_title_bands (
+            user_id TEXT NOT NULL,
+            band_key INTEGER NOT NULL,
+            content_id INTEGER NOT NULL,
+            PRIMARY KEY (user_id, band_key, content_id)
+        ) WITHOUT ROWID
+        ''',
+        # Функция объявлена ниже, в разделе индекса заголовков
+        lambda conn: _backfill_title_fingerprints(conn),
+        'CREATE INDEX IF NOT EXISTS idx_video_content_user_title_hash ON video_content (user_id, title_hash)'
+    ]),
+    (10, "Статистика начала прогона и число шагов роста в истории симуляций", [
+        # Без статистики начала прогон не повторить по одному seed: рост зависит от нее
+        'ALTER TABLE simulation_history ADD COLUMN start_stats TEXT',
+        'ALTER TABLE simulation_history ADD COLUMN steps INTEGER',
+        'CREATE INDEX IF NOT EXISTS idx_simulation_history_user_seed ON simulation_history (user_id, seed)'
+    ])
+]
+
+# Поля снимка статистики канала (порядок колонок channel_stats)
+CHANNEL_STATS_FIELDS = (
+    'total_views', 'subscribers', 'total_likes', 'total_comments',
+    'videos_uploaded', 'estimated_earnings', 'engagement_rate', 'watch_time_hours'
+)
+
+# Типизированные поля записи журнала активности (колонки activity_events)
+ACTIVITY_EVENT_FIELDS = ('category', 'keyword', 'hours', 'subscribers', 'views')
+
+# Период сводки активности для AI помощника (дни)
+ACTIVITY_SUMMARY_DAYS = 30
+
+# Полный снимок (ключевой кадр) в channel_stats после стольких дельт
+STATS_KEYFRAME_INTERVAL = 50
+
+# Интервал сброса пакета записей симуляции в БД (секунды)
+SIMULATION_FLUSH_INTERVAL = 5.0
+
+def _sql_timestamp():
+    """Текущее время в формате CURRENT_TIMESTAMP SQLite (UTC)"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+
+def _encode_start_stats(stats):
+    """Статистика начала прогона для колонки simulation_history.start_stats (JSON)"""
+    return None if stats is None else json.dumps(dict(stats))
+
+def _decode_start_stats(text):
+    return None if text is None else json.loads(text)
+
+class ChannelStatsCache:
+    """Кэш текущей статистики каналов (read-through, write-through)
+
+    Чтение отдает копию из памяти; промах читает channel_stats_current.
+    Записи Database обновляют кэш после коммита. Изменения из других
+    соединений и процессов обнаруживаются по PRAGMA data_version соединения
+    текущего потока: при его изменении кэш сбрасывается целиком. Проверка
+    не читает таблицы, поэтому повторные чтения без изменений не обращаются
+    к данным БД.
+    """
+    
+    def __init__(self, db):
+        self.db = db
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def _validate(self, conn):
+        """Сброс кэша, если в БД коммитили другие соединения"""
+        version = conn.execute('PRAGMA data_version').fetchone()[0]
+        seen = getattr(self._local, 'seen', None)
+        
+        # data_version сравнима только в пределах одного соединения. Первая
+        # проверка потока (или нового соединения) - тоже несовпадение: записи,
+        # заполненные другими потоками, могли пропустить коммиты других
+        # процессов, сделанные до того, как это соединение запомнило версию
+        if seen != (conn, version):
+            self.invalidate()
+            self._local.seen = (conn, version)
+    
+    def get(self, user_id):
+        """Текущая статистика пользователя (копия) или None"""
+        self._validate(self.db.get_connection())
+        
+        with self._lock:
+            stats = self._entries.get(user_id)
+            if stats is not None:
+                self.hits += 1
+                return dict(stats)
+            self.misses += 1
+        
+        stats = self.db._read_latest_channel_stats(user_id)
+        if stats is not None:
+            with self._lock:
+                # Не затираем более свежую запись, пришедшую write-through во время чтения
+                self._entries.setdefault(user_id, dict(stats))
+        return stats
+    
+    def update(self, changed):
+        """Write-through: {user_id: статистика} после успешного коммита"""
+        with self._lock:
+            for user_id, stats in changed.items():
+                self._entries[user_id] = dict(stats)
+    
+    def invalidate(self, user_id=None):
+        """Сброс записи пользователя или всего кэша"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+            self.invalidations += 1
+
 class Database:
-    """Класс для работы с базой данных SQLite"""
+    """Класс для работы с базой данных SQLite
+
+    Соединения живут долго: каждый поток (главный поток Tk, поток симуляции)
+    получает собственное соединение из небольшого пула и держит его до
+    release_connection() или close(). Подготовленные выражения переиспользуются
+    кэшем sqlite3 (cached_statements) на уровне соединения.
+    """
     
-    def __init__(self, db_name="youtube_promo.db"):
+    # Частые запросы: используются методами ниже и проверяются verify_query_plans()
+    HOT_QUERIES = {
+        'latest_channel_stats': 'SELECT * FROM channel_stats_current WHERE user_id = ?',
+        'stats_keyframe_at': '''
+        SELECT * FROM channel_stats 
+        WHERE user_id = ? AND timestamp <= ? 
+        ORDER BY timestamp DESC, id DESC 
+        LIMIT 1
+        ''',
+        'stats_deltas_after_keyframe': '''
+        SELECT changes FROM channel_stats_deltas 
+        WHERE keyframe_id = ? AND timestamp <= ? 
+        ORDER BY id
+        ''',
+        'simulation_history': '''
+        SELECT * FROM simulation_history 
+        WHERE user_id = ? 
+        ORDER BY timestamp DESC, id DESC 
+        LIMIT ?
+        ''',
+        'video_content': '''
+        SELECT * FROM video_content 
+        WHERE user_id = ? 
+        ORDER BY created_at DESC, id DESC 
+        LIMIT ?
+        ''',
+        'open_tasks': 'SELECT * FROM tasks WHERE user_id = ? AND completed = 0 ORDER BY priority DESC, due_date',
+        'subscriber_curve': '''
+        SELECT day, subscribers, total_views FROM channel_daily_rollup 
+        WHERE user_id = ? 
+        ORDER BY day DESC 
+        LIMIT ?
+        ''',
+        'activity_daily': '''
+        SELECT day, activity, category, COUNT(*) FROM activity_events 
+        WHERE user_id = ? AND day >= ? 
+        GROUP BY day, activity, category
+        ''',
+        'title_by_hash': 'SELECT title FROM video_content WHERE user_id = ? AND title_hash = ? LIMIT 1',
+        'title_parts': 'SELECT title FROM video_content WHERE user_id = ? AND title >= ? AND title < ?',
+        'simulation_run': '''
+        SELECT simulation_hours, new_subscribers, new_views, new_likes, new_comments, start_stats, steps 
+        FROM simulation_history 
+        WHERE user_id = ? AND seed = ? 
+        ORDER BY id
+        '''
+    }
+    
+    # Постраничные списки: выводимые колонки и ключи сортировки (SQL-выражение,
+    # для каждого есть индекс (user_id, выражение), см. миграции 1 и 7)
+    PAGED_LISTS = {
+        'simulation_history': {
+            'table': 'simulation_history',
+            'columns': 'timestamp, simulation_hours, new_subscribers, new_views, new_likes, new_comments',
+            'sort_keys': {
+                'timestamp': 'timestamp',
+                'new_subscribers': 'IFNULL(new_subscribers, 0)',
+                'new_views': 'IFNULL(new_views, 0)'
+            },
+            'default_sort': 'timestamp'
+        },
+        'video_content': {
+            'table': 'video_content',
+            'columns': 'created_at, category, title',
+            'sort_keys': {
+                'created_at': 'created_at',
+                'category': "IFNULL(category, '')",
+                'title': 'title'
+            },
+            'default_sort': 'created_at'
+        }
+    }
+    
+    def __init__(self, db_name="youtube_promo.db", pool_size=4, storage_profile=DEFAULT_STORAGE_PROFILE):
         self.db_name = db_name
+        self.pool_size = pool_size
+        
+        # Профиль хранения: имя из STORAGE_PROFILES или словарь PRAGMA
+        if isinstance(storage_profile, dict):
+            self.pragmas = dict(storage_profile)
+        else:
+            self.pragmas = dict(STORAGE_PROFILES[storage_profile])
+        
+        # Пул соединений: свободные соединения и соединения, закрепленные за потоками
+        self._pool_lock = threading.Lock()
+        self._idle_connections = []
+        self._active_connections = set()
+        self._local = threading.local()
+        
+        # Общий кэш текущей статистики для GUI и промоутера
+        self.stats_cache = ChannelStatsCache(self)
+        
+        # Порядок снимков статистики: номер при снятии снимка и номер последнего
+        # записанного снимка пользователя (см. stats_sequence())
+        self._stats_sequence = itertools.count(1)
+        self._stats_written = {}
+        self._stats_order_lock = threading.Lock()
+        
         self.init_database()
     
+    def _connect(self):
+        """Открытие нового соединения для пула"""
+        # check_same_thread=False: соединение может вернуться в пул и перейти
+        # к другому потоку, но одновременно его использует только один поток
+        conn = sqlite3.connect(
+            self.db_name,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        
+        # busy_timeout первым: смена journal_mode сама может ждать блокировку
+        pragmas = sorted(self.pragmas.items(), key=lambda item: item[0] != 'busy_timeout')
+        for name, value in pragmas:
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+    
+    def get_connection(self):
+        """Соединение текущего потока (берется из пула при первом обращении)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        
+        with self._pool_lock:
+            conn = self._idle_connections.pop() if self._idle_connections else None
+        if conn is None:
+            conn = self._connect()
+        
+        with self._pool_lock:
+            self._active_connections.add(conn)
+        self._local.conn = conn
+        return conn
+    
+    def release_connection(self):
+        """Возврат соединения текущего потока в пул (вызывать при завершении потока)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        
+        with self._pool_lock:
+            self._active_connections.discard(conn)
+            if len(self._idle_connections) < self.pool_size:
+                self._idle_connections.append(conn)
+                return
+        conn.close()
+    
+    def close(self):
+        """Закрытие всех соединений пула"""
+        with self._pool_lock:
+            connections = self._idle_connections + list(self._active_connections)
+            self._idle_connections = []
+            self._active_connections = set()
+            self._local = threading.local()
+        
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def init_database(self):
         """Инициализация базы данных"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.get_connection()
         cursor = conn.cursor()
         
         # Таблица пользователей
@@ -123,80 +605,145 @@ class Database:
         )
         ''')
         
+        # Версия схемы
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        
         conn.commit()
-        conn.close()
+        
+        self.apply_migrations()
+    
+    def get_schema_version(self):
+        """Текущая версия схемы (0 - базовые таблицы без миграций)"""
+        cursor = self.get_connection().execute('SELECT MAX(version) FROM schema_version')
+        return cursor.fetchone()[0] or 0
+    
+    def apply_migrations(self):
+        """Применение недостающих миграций по порядку версий"""
+        conn = self.get_connection()
+        applied = []
+        
+        for version, description, steps in SCHEMA_MIGRATIONS:
+            if version <= self.get_schema_version():
+                continue
+            
+            # BEGIN IMMEDIATE: другой процесс не применит ту же миграцию параллельно
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if version <= self.get_schema_version():
+                    conn.rollback()
+                    continue
+                
+                for step in steps:
+                    if callable(step):
+                        step(conn)
+                    else:
+                        conn.execute(step)
+                
+                conn.execute(
+                    'INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                    (version, description)
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            
+            applied.append(version)
+        
+        return applied
+    
+    def explain_hot_queries(self):
+        """Планы выполнения частых запросов (EXPLAIN QUERY PLAN)"""
+        conn = self.get_connection()
+        plans = {}
+        
+        queries = dict(self.HOT_QUERIES)
+        for list_name, spec in self.PAGED_LISTS.items():
+            for sort_key in spec['sort_keys']:
+                queries[f'page:{list_name}:{sort_key}'] = self._page_sql(list_name, sort_key, True, True)
+        
+        for name, sql in queries.items():
+            params = ('',) * (sql.count('?') - 1) + (10,) if '?' in sql else ()
+            rows = conn.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+            plans[name] = [row[3] for row in rows]
+        
+        return plans
+    
+    def verify_query_plans(self):
+        """Список частых запросов, которые сканируют таблицу целиком или сортируют результат
+
+        Пустой список означает, что все запросы идут по индексам.
+        """
+        problems = []
+        
+        for name, details in self.explain_hot_queries().items():
+            for detail in details:
+                if detail.startswith('SCAN ') or 'TEMP B-TREE' in detail:
+                    problems.append((name, detail))
+        
+        return problems
     
     def save_user(self, username, password_hash, email="", user_id=None):
         """Сохранение пользователя в БД"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        conn = self.get_connection()
         
         if not user_id:
             user_id = str(uuid.uuid4())
         
         try:
-            cursor.execute('''
-            INSERT INTO users (username, password_hash, email, user_id, created_at, last_login)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ''', (username, password_hash, email, user_id, datetime.now().isoformat(), datetime.now().isoformat()))
-            
-            # Создаем настройки по умолчанию для пользователя
-            cursor.execute('''
-            INSERT INTO user_settings (user_id, remember_login, auto_fullscreen, theme, auto_save)
-            VALUES (?, 1, 1, 'dark', 1)
-            ''', (user_id,))
-            
-            # Создаем начальную статистику - НУЛЕВУЮ
-            cursor.execute('''
-            INSERT INTO channel_stats (
-                user_id, total_views, subscribers, total_likes, 
-                total_comments, videos_uploaded, estimated_earnings, 
-                engagement_rate, watch_time_hours
-            ) VALUES (?, 0, 0, 0, 0, 0, 0.0, 0.0, 0.0)
-            ''', (user_id,))
-            
-            conn.commit()
+            with conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                INSERT INTO users (username, password_hash, email, user_id, created_at, last_login)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ''', (username, password_hash, email, user_id, datetime.now().isoformat(), datetime.now().isoformat()))
+                
+                # Создаем настройки по умолчанию для пользователя
+                cursor.execute('''
+                INSERT INTO user_settings (user_id, remember_login, auto_fullscreen, theme, auto_save)
+                VALUES (?, 1, 1, 'dark', 1)
+                ''', (user_id,))
+                
+                # Создаем начальную статистику - НУЛЕВУЮ
+                changed = self._store_channel_stats(conn, [(user_id, _sql_timestamp()) + (0,) * len(CHANNEL_STATS_FIELDS)])
+            
+            self.stats_cache.update(changed)
             return True, user_id
         except sqlite3.IntegrityError:
             return False, "Пользователь уже существует"
-        finally:
-            conn.close()
     
     def get_user(self, username):
         """Получение пользователя из БД"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM users WHERE username = ?', (username,))
-        user = cursor.fetchone()
-        
-        conn.close()
-        return user
+        cursor = self.get_connection().execute('SELECT * FROM users WHERE username = ?', (username,))
+        return cursor.fetchone()
+    
+    def get_user_ids(self):
+        """Идентификаторы всех пользователей (для пакетных операций)"""
+        cursor = self.get_connection().execute('SELECT user_id FROM users ORDER BY id')
+        return [row[0] for row in cursor.fetchall()]
     
     def update_last_login(self, username):
         """Обновление времени последнего входа"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        UPDATE users 
-        SET last_login = ?, total_sessions = total_sessions + 1 
-        WHERE username = ?
-        ''', (datetime.now().isoformat(), username))
-        
-        conn.commit()
-        conn.close()
+        conn = self.get_connection()
+        
+        with conn:
+            conn.execute('''
+            UPDATE users 
+            SET last_login = ?, total_sessions = total_sessions + 1 
+            WHERE username = ?
+            ''', (datetime.now().isoformat(), username))
     
     def get_user_settings(self, user_id):
         """Получение настроек пользователя"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM user_settings WHERE user_id = ?', (user_id,))
+        cursor = self.get_connection().execute('SELECT * FROM user_settings WHERE user_id = ?', (user_id,))
         settings = cursor.fetchone()
         
-        conn.close()
-        
         if settings:
             return {
                 'remember_login': bool(settings[2]),
@@ -208,187 +755,1075 @@ class Database:
     
     def update_user_settings(self, user_id, settings):
         """Обновление настроек пользователя"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        UPDATE user_settings 
-        SET remember_login = ?, auto_fullscreen = ?, theme = ?, auto_save = ?
-        WHERE user_id = ?
-        ''', (
-            int(settings['remember_login']),
-            int(settings['auto_fullscreen']),
-            settings['theme'],
-            int(settings['auto_save']),
-            user_id
-        ))
-        
-        conn.commit()
-        conn.close()
+        conn = self.get_connection()
+        
+        with conn:
+            conn.execute('''
+            UPDATE user_settings 
+            SET remember_login = ?, auto_fullscreen = ?, theme = ?, auto_save = ?
+            WHERE user_id = ?
+            ''', (
+                int(settings['remember_login']),
+                int(settings['auto_fullscreen']),
+                settings['theme'],
+                int(settings['auto_save']),
+                user_id
+            ))
     
-    def save_channel_stats(self, user_id, stats):
-        """Сохранение статистики канала"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        INSERT INTO channel_stats 
-        (user_id, total_views, subscribers, total_likes, total_comments, 
-         videos_uploaded, estimated_earnings, engagement_rate, watch_time_hours)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            user_id,
-            stats['total_views'],
-            stats['subscribers'],
-            stats['total_likes'],
-            stats['total_comments'],
-            stats['videos_uploaded'],
-            stats['estimated_earnings'],
-            stats['engagement_rate'],
-            stats['watch_time_hours']
-        ))
+    def stats_sequence(self):
+        """Номер снимка статистики в порядке снятия
+
+        Снимок пишут разные потоки (очередь фоновой записи, поток симуляции),
+        и он может дойти до БД позже более нового. Снимок с номером не больше
+        уже записанного для пользователя пропускается, так что
+        channel_stats_current не откатывается к старым значениям.
+        """
+        return next(self._stats_sequence)
+    
+    def save_channel_stats(self, user_id, stats, sequence=None):
+        """Сохранение статистики канала (sequence - номер stats_sequence() при снятии снимка)"""
+        self.save_simulation_batch(
+            [(user_id, _sql_timestamp()) + tuple(stats[field] for field in CHANNEL_STATS_FIELDS)], [],
+            None if sequence is None else [sequence]
+        )
+    
+    def _store_channel_stats(self, conn, rows):
+        """Запись снимков статистики: текущая строка + дельта или ключевой кадр
+
+        rows: кортежи (user_id, timestamp, поля CHANNEL_STATS_FIELDS) в порядке
+        времени. channel_stats_current всегда содержит последнее состояние;
+        в channel_stats_deltas пишутся только изменившиеся поля (абсолютные
+        значения), а каждые STATS_KEYFRAME_INTERVAL дельт - полный снимок в
+        channel_stats. Снимок без изменений не записывается.
+        Вызывается внутри транзакции; возвращает {user_id: статистика}
+        изменившихся пользователей для обновления кэша после коммита.
+        """
+        current = {}
+        changed_users = set()
         
-        conn.commit()
-        conn.close()
+        for user_id, timestamp, *values in rows:
+            if user_id not in current:
+                row = conn.execute(self.HOT_QUERIES['latest_channel_stats'], (user_id,)).fetchone()
+                current[user_id] = (row[1], dict(zip(CHANNEL_STATS_FIELDS, row[2:10])), row[10], row[11]) if row else None
+            
+            stats = dict(zip(CHANNEL_STATS_FIELDS, values))
+            state = current[user_id]
+            
+            if state is not None:
+                _, previous, keyframe_id, delta_count = state
+                changes = {field: value for field, value in stats.items() if previous[field] != value}
+                if not changes:
+                    continue
+            
+            if state is None or delta_count >= STATS_KEYFRAME_INTERVAL:
+                keyframe_id = conn.execute('''
+                INSERT INTO channel_stats 
+                (user_id, timestamp, total_views, subscribers, total_likes, total_comments, 
+                 videos_uploaded, estimated_earnings, engagement_rate, watch_time_hours)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (user_id, timestamp, *values)).lastrowid
+                delta_count = 0
+            else:
+                conn.execute('''
+                INSERT INTO channel_stats_deltas (user_id, timestamp, keyframe_id, changes)
+                VALUES (?, ?, ?, ?)
+                ''', (user_id, timestamp, keyframe_id, json.dumps(changes)))
+                delta_count += 1
+            
+            current[user_id] = (timestamp, stats, keyframe_id, delta_count)
+            changed_users.add(user_id)
+        
+        conn.executemany('''
+        INSERT OR REPLACE INTO channel_stats_current 
+        (user_id, timestamp, total_views, subscribers, total_likes, total_comments, 
+         videos_uploaded, estimated_earnings, engagement_rate, watch_time_hours, keyframe_id, delta_count)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (user_id, timestamp, *(stats[field] for field in CHANNEL_STATS_FIELDS), keyframe_id, delta_count)
+            for user_id, (timestamp, stats, keyframe_id, delta_count) in current.items()
+            if user_id in changed_users
+        ])
+        
+        return {user_id: current[user_id][1] for user_id in changed_users}
     
     def get_latest_channel_stats(self, user_id):
-        """Получение последней статистики канала"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT * FROM channel_stats 
-        WHERE user_id = ? 
-        ORDER BY timestamp DESC 
-        LIMIT 1
-        ''', (user_id,))
+        """Получение последней статистики канала (через общий кэш)"""
+        return self.stats_cache.get(user_id)
+    
+    def _read_latest_channel_stats(self, user_id):
+        """Чтение текущей статистики канала из БД в обход кэша"""
+        cursor = self.get_connection().execute(self.HOT_QUERIES['latest_channel_stats'], (user_id,))
         
         stats = cursor.fetchone()
-        conn.close()
         
         if stats:
-            return {
-                'total_views': stats[3],
-                'subscribers': stats[4],
-                'total_likes': stats[5],
-                'total_comments': stats[6],
-                'videos_uploaded': stats[7],
-                'estimated_earnings': stats[8],
-                'engagement_rate': stats[9],
-                'watch_time_hours': stats[10]
-            }
+            return dict(zip(CHANNEL_STATS_FIELDS, stats[2:10]))
         return None
     
-    def save_simulation(self, user_id, hours, results):
-        """Сохранение истории симуляции"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+    def get_channel_stats_at(self, user_id, timestamp):
+        """Статистика канала на момент timestamp ('ГГГГ-ММ-ДД ЧЧ:ММ:СС', UTC)
+
+        Ближайший ключевой кадр не позже timestamp плюс его дельты (не более
+        STATS_KEYFRAME_INTERVAL); None, если статистики на тот момент еще нет.
+        """
+        conn = self.get_connection()
+        keyframe = conn.execute(self.HOT_QUERIES['stats_keyframe_at'], (user_id, timestamp)).fetchone()
+        if not keyframe:
+            return None
         
-        cursor.execute('''
-        INSERT INTO simulation_history 
-        (user_id, simulation_hours, new_subscribers, new_views, new_likes, new_comments)
-        VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            user_id,
-            hours,
-            results.get('subscribers', 0),
-            results.get('views', 0),
-            results.get('likes', 0),
-            results.get('comments', 0)
-        ))
+        stats = dict(zip(CHANNEL_STATS_FIELDS, keyframe[3:11]))
+        for (changes,) in conn.execute(self.HOT_QUERIES['stats_deltas_after_keyframe'], (keyframe[0], timestamp)):
+            stats.update(json.loads(changes))
         
-        conn.commit()
-        conn.close()
+        return stats
+    
+    def compact_channel_stats(self, older_than_days=30):
+        """Прореживание истории статистики старше older_than_days дней
+
+        Для каждого пользователя и каждого дня до границы остается один
+        ключевой кадр с состоянием на конец дня; остальные кадры и дельты
+        этих дней удаляются. Дельты после границы, ссылавшиеся на удаленный
+        кадр, переводятся на последний оставшийся кадр.
+        """
+        conn = self.get_connection()
+        cutoff = time.strftime('%Y-%m-%d', time.gmtime(time.time() - older_than_days * 86400))
+        removed_keyframes = removed_deltas = kept_keyframes = 0
+        
+        with conn:
+            user_ids = [row[0] for row in conn.execute(
+                'SELECT DISTINCT user_id FROM channel_stats WHERE timestamp < ?', (cutoff,)
+            )]
+            
+            for user_id in user_ids:
+                keyframes = conn.execute('''
+                SELECT * FROM channel_stats WHERE user_id = ? AND timestamp < ? ORDER BY timestamp, id
+                ''', (user_id, cutoff)).fetchall()
+                
+                # Состояние на конец каждого дня: кадр, затем его дельты по порядку
+                day_states = {}
+                for keyframe in keyframes:
+                    stats = dict(zip(CHANNEL_STATS_FIELDS, keyframe[3:11]))
+                    day_states[keyframe[2][:10]] = (keyframe[2], dict(stats))
+                    for timestamp, changes in conn.execute('''
+                    SELECT timestamp, changes FROM channel_stats_deltas 
+                    WHERE keyframe_id = ? AND timestamp < ? ORDER BY id
+                    ''', (keyframe[0], cutoff)):
+                        stats.update(json.loads(changes))
+                        day_states[timestamp[:10]] = (timestamp, dict(stats))
+                
+                removed_deltas += conn.execute(
+                    'DELETE FROM channel_stats_deltas WHERE user_id = ? AND timestamp < ?', (user_id, cutoff)
+                ).rowcount
+                removed_keyframes += conn.execute(
+                    'DELETE FROM channel_stats WHERE user_id = ? AND timestamp < ?', (user_id, cutoff)
+                ).rowcount
+                
+                last_id = None
+                for day in sorted(day_states):
+                    timestamp, stats = day_states[day]
+                    last_id = conn.execute('''
+                    INSERT INTO channel_stats 
+                    (user_id, timestamp, total_views, subscribers, total_likes, total_comments, 
+                     videos_uploaded, estimated_earnings, engagement_rate, watch_time_hours)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', (user_id, timestamp, *(stats[field] for field in CHANNEL_STATS_FIELDS))).lastrowid
+                    kept_keyframes += 1
+                
+                # Перевязка оставшихся ссылок на удаленные кадры (подзапросом:
+                # список id старых кадров может превысить лимит параметров SQLite)
+                conn.execute('''
+                UPDATE channel_stats_deltas SET keyframe_id = ? 
+                WHERE user_id = ? AND keyframe_id NOT IN (SELECT id FROM channel_stats WHERE user_id = ?)
+                ''', (last_id, user_id, user_id))
+                conn.execute('''
+                UPDATE channel_stats_current SET keyframe_id = ? 
+                WHERE user_id = ? AND keyframe_id NOT IN (SELECT id FROM channel_stats WHERE user_id = ?)
+                ''', (last_id, user_id, user_id))
+        
+        return {
+            'cutoff': cutoff,
+            'users': len(user_ids),
+            'removed_keyframes': removed_keyframes,
+            'removed_deltas': removed_deltas,
+            'kept_keyframes': kept_keyframes
+        }
+    
+    def save_simulation(self, user_id, hours, results, seed=None, start_stats=None, steps=1):
+        """Сохранение истории симуляции
+
+        seed - seed генератора прогона, start_stats - статистика канала на
+        начало прогона, steps - число шагов роста в строке (см. replay_stored_simulation).
+        """
+        conn = self.get_connection()
+        timestamp = _sql_timestamp()
+        
+        with conn:
+            conn.execute('''
+            INSERT INTO simulation_history 
+            (user_id, timestamp, simulation_hours, new_subscribers, new_views, new_likes, new_comments,
+             seed, start_stats, steps)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                user_id,
+                timestamp,
+                hours,
+                results.get('subscribers', 0),
+                results.get('views', 0),
+                results.get('likes', 0),
+                results.get('comments', 0),
+                seed,
+                _encode_start_stats(start_stats),
+                steps
+            ))
+            self._update_daily_rollup(conn, [(user_id, timestamp, results.get('subscribers', 0), results.get('views', 0))])
+    
+    def save_simulation_batch(self, stats_rows, simulation_rows, sequences=None):
+        """Запись пакета снимков статистики и истории симуляций одной транзакцией
+
+        stats_rows: кортежи (user_id, timestamp, total_views, subscribers, total_likes,
+        total_comments, videos_uploaded, estimated_earnings, engagement_rate, watch_time_hours)
+        simulation_rows: кортежи (user_id, timestamp, simulation_hours, new_subscribers,
+        new_views, new_likes, new_comments, seed, start_stats, steps)
+        sequences: номера stats_sequence() строк stats_rows; снимки старше уже
+        записанных пропускаются.
+        """
+        conn = self.get_connection()
+        changed = {}
+        
+        # Проверка номеров и запись - под одной блокировкой: иначе более старый
+        # снимок мог бы закоммитить после более нового
+        with self._stats_order_lock:
+            if sequences is not None:
+                ordered = [(row, sequence) for row, sequence in zip(stats_rows, sequences)
+                           if sequence > self._stats_written.get(row[0], 0)]
+                stats_rows = [row for row, _ in ordered]
+            
+            with conn:
+                if stats_rows:
+                    changed = self._store_channel_stats(conn, stats_rows)
+                
+                if simulation_rows:
+                    conn.executemany('''
+                    INSERT INTO simulation_history 
+                    (user_id, timestamp, simulation_hours, new_subscribers, new_views, new_likes, new_comments,
+                     seed, start_stats, steps)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', simulation_rows)
+                    self._update_daily_rollup(conn, [row[:2] + row[3:5] for row in simulation_rows])
+            
+            if sequences is not None:
+                for row, sequence in ordered:
+                    self._stats_written[row[0]] = sequence
+        
+        self.stats_cache.update(changed)
+    
+    def _update_daily_rollup(self, conn, rows):
+        """Инкрементальное обновление дневного ряда channel_daily_rollup
+
+        rows: кортежи (user_id, timestamp, new_subscribers, new_views) в порядке
+        времени. Строки одного дня сворачиваются в одно обновление; новый день
+        продолжает накопительные суммы предыдущего дня пользователя.
+        Вызывается внутри транзакции записи истории.
+        """
+        days = {}
+        for user_id, timestamp, new_subscribers, new_views in rows:
+            key = (user_id, timestamp[:10])
+            day = days.setdefault(key, {'user_id': user_id, 'day': key[1], 'subscribers': 0, 'views': 0, 'runs': 0})
+            day['subscribers'] += new_subscribers
+            day['views'] += new_views
+            day['runs'] += 1
+        
+        conn.executemany('''
+        INSERT INTO channel_daily_rollup 
+        (user_id, day, new_subscribers, new_views, subscribers, total_views, runs)
+        VALUES (
+            :user_id, :day, :subscribers, :views,
+            COALESCE((SELECT subscribers FROM channel_daily_rollup 
+                      WHERE user_id = :user_id AND day < :day ORDER BY day DESC LIMIT 1), 0) + :subscribers,
+            COALESCE((SELECT total_views FROM channel_daily_rollup 
+                      WHERE user_id = :user_id AND day < :day ORDER BY day DESC LIMIT 1), 0) + :views,
+            :runs
+        )
+        ON CONFLICT (user_id, day) DO UPDATE SET
+            new_subscribers = new_subscribers + excluded.new_subscribers,
+            new_views = new_views + excluded.new_views,
+            subscribers = subscribers + excluded.new_subscribers,
+            total_views = total_views + excluded.new_views,
+            runs = runs + excluded.runs
+        ''', list(days.values()))
+    
+    def get_subscriber_curve(self, user_id, days=30):
+        """Накопительные подписчики и просмотры по дням: [(день, подписчики, просмотры)]
+
+        Последние days дней в хронологическом порядке, один запрос по первичному ключу.
+        """
+        cursor = self.get_connection().execute(self.HOT_QUERIES['subscriber_curve'], (user_id, days))
+        
+        return cursor.fetchall()[::-1]
+    
+    def save_activity_events(self, records):
+        """Запись пакета событий журнала активности одной транзакцией
+
+        records: словари ActivityLogSink (ts - время UTC в ISO 8601, user_id,
+        activity, details и необязательные поля ACTIVITY_EVENT_FIELDS).
+        """
+        rows = [
+            (record['user_id'], record['ts'][:10], record['ts'][:19].replace('T', ' '), record['activity'])
+            + tuple(record.get(field) for field in ACTIVITY_EVENT_FIELDS)
+            + (record.get('details'),)
+            for record in records
+        ]
+        conn = self.get_connection()
+        
+        with conn:
+            conn.executemany('''
+            INSERT INTO activity_events 
+            (user_id, day, timestamp, activity, category, keyword, hours, subscribers, views, details)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+    
+    def get_activity_summary(self, user_id, days=ACTIVITY_SUMMARY_DAYS):
+        """Сводка журнала активности пользователя за последние days дней"""
+        return self._read_activity_summary(self.get_connection(), user_id, days)
+    
+    def _read_activity_summary(self, conn, user_id, days):
+        """Агрегаты activity_events по дням (UTC) из индекса (user_id, day, ...)
+
+        daily: [(день, генераций контента, симуляций)] в хронологическом
+        порядке; totals, week и today: {событие: число} за период, последние
+        7 дней и сегодня; active_days - дни с событиями; categories -
+        [(категория, генераций контента)] по убыванию.
+        """
+        now = time.time()
+        cutoff = time.strftime('%Y-%m-%d', time.gmtime(now - days * 86400))
+        week_start = time.strftime('%Y-%m-%d', time.gmtime(now - 6 * 86400))
+        today = time.strftime('%Y-%m-%d', time.gmtime(now))
+        
+        by_day = {}
+        totals, week, today_counts, categories = {}, {}, {}, {}
+        for day, activity, category, count in conn.execute(self.HOT_QUERIES['activity_daily'], (user_id, cutoff)):
+            counts = by_day.setdefault(day, {})
+            counts[activity] = counts.get(activity, 0) + count
+            totals[activity] = totals.get(activity, 0) + count
+            if day >= week_start:
+                week[activity] = week.get(activity, 0) + count
+            if day == today:
+                today_counts[activity] = today_counts.get(activity, 0) + count
+            if activity == 'CONTENT_GENERATED':
+                categories[category or ''] = categories.get(category or '', 0) + count
+        
+        daily = [
+            (day, counts.get('CONTENT_GENERATED', 0), counts.get('GROWTH_SIMULATED', 0))
+            for day, counts in sorted(by_day.items())
+        ]
+        return {
+            'period_days': days,
+            'totals': totals,
+            'week': week,
+            'today': today_counts,
+            'daily': daily,
+            'active_days': len(daily),
+            'categories': sorted(categories.items(), key=lambda item: -item[1])
+        }
+    
+    def get_report_snapshot(self, user_id, days=30):
+        """Агрегаты для отчетов за последние days дней одним чтением
+
+        Все запросы выполняются в одной транзакции чтения (согласованный
+        снимок WAL) и возвращают уже сгруппированные строки; результат -
+        обычный словарь, который можно передать в процессы отчетов.
+        """
+        conn = self.get_connection()
+        cutoff = time.strftime('%Y-%m-%d', time.gmtime(time.time() - days * 86400))
+        
+        with conn:
+            conn.execute('BEGIN')
+            stats = conn.execute(self.HOT_QUERIES['latest_channel_stats'], (user_id,)).fetchone()
+            
+            daily = conn.execute('''
+            SELECT day, new_subscribers, new_views, subscribers, total_views, runs 
+            FROM channel_daily_rollup WHERE user_id = ? AND day >= ? ORDER BY day
+            ''', (user_id, cutoff)).fetchall()
+            
+            simulations = conn.execute('''
+            SELECT COUNT(*), IFNULL(SUM(simulation_hours), 0), IFNULL(SUM(new_subscribers), 0),
+                   IFNULL(SUM(new_views), 0), IFNULL(SUM(new_likes), 0), IFNULL(SUM(new_comments), 0)
+            FROM simulation_history WHERE user_id = ? AND timestamp >= ?
+            ''', (user_id, cutoff)).fetchone()
+            
+            hours_of_day = conn.execute('''
+            SELECT CAST(strftime('%H', timestamp) AS INTEGER), COUNT(*), IFNULL(SUM(new_views), 0),
+                   IFNULL(SUM(new_likes), 0), IFNULL(SUM(new_comments), 0)
+            FROM simulation_history WHERE user_id = ? AND timestamp >= ? GROUP BY 1 ORDER BY 1
+            ''', (user_id, cutoff)).fetchall()
+            
+            content = conn.execute('''
+            SELECT IFNULL(category, ''), COUNT(*), MIN(created_at), MAX(created_at)
+            FROM video_content WHERE user_id = ? GROUP BY 1 ORDER BY 2 DESC
+            ''', (user_id,)).fetchall()
+            
+            recent_titles = conn.execute('''
+            SELECT created_at, category, title FROM video_content WHERE user_id = ? 
+            ORDER BY created_at DESC, id DESC LIMIT 10
+            ''', (user_id,)).fetchall()
+            
+            tasks = conn.execute('''
+            SELECT priority, COUNT(*), IFNULL(SUM(completed), 0) 
+            FROM tasks WHERE user_id = ? GROUP BY priority ORDER BY priority
+            ''', (user_id,)).fetchall()
+            
+            activity = self._read_activity_summary(conn, user_id, days)
+        
+        return {
+            'user_id': user_id,
+            'generated_at': _sql_timestamp(),
+            'period_days': days,
+            'stats': dict(zip(CHANNEL_STATS_FIELDS, stats[2:10])) if stats else empty_channel_stats(),
+            'daily': daily,
+            'simulations': dict(zip(('runs', 'hours', 'subscribers', 'views', 'likes', 'comments'), simulations)),
+            'hours_of_day': hours_of_day,
+            'content': content,
+            'recent_titles': recent_titles,
+            'tasks': tasks,
+            'activity': activity
+        }
+    
+    def _page_sql(self, list_name, sort_key, scan_descending, with_cursor):
+        """SQL страницы списка по ключу (keyset) для get_page()"""
+        spec = self.PAGED_LISTS[list_name]
+        expression = spec['sort_keys'][sort_key]
+        order = 'DESC' if scan_descending else 'ASC'
+        
+        sql = f"SELECT id, {expression}, {spec['columns']} FROM {spec['table']} WHERE user_id = ?"
+        if with_cursor:
+            # Отдельная граница по выражению дает диапазон по индексу выражения,
+            # сравнение пар (значение, id) - точную позицию курсора
+            sql += (f" AND {expression} {'<=' if scan_descending else '>='} ?"
+                    f" AND ({expression}, id) {'<' if scan_descending else '>'} (?, ?)")
+        return sql + f" ORDER BY {expression} {order}, id {order} LIMIT ?"
+    
+    def get_page(self, list_name, user_id, sort_key=None, descending=True, cursor=None, forward=True, limit=100):
+        """Страница постраничного списка PAGED_LISTS без OFFSET
+
+        Строки: (id, значение сортировки, колонки списка) в порядке отображения.
+        cursor - (значение сортировки, id) граничной строки: forward=True
+        выбирает строки после нее, forward=False - строки перед ней.
+        """
+        sort_key = sort_key or self.PAGED_LISTS[list_name]['default_sort']
+        # Назад по списку - это проход индекса в обратном направлении
+        scan_descending = descending == forward
+        sql = self._page_sql(list_name, sort_key, scan_descending, cursor is not None)
+        params = (user_id, cursor[0], *cursor, limit) if cursor is not None else (user_id, limit)
+        
+        rows = self.get_connection().execute(sql, params).fetchall()
+        return rows if forward else rows[::-1]
+    
+    def get_simulation_run(self, user_id, seed):
+        """Строки истории одного прогона (по seed) в порядке записи
+
+        Кортежи (simulation_hours, new_subscribers, new_views, new_likes,
+        new_comments, start_stats, steps); start_stats - уже разобранный словарь.
+        """
+        cursor = self.get_connection().execute(self.HOT_QUERIES['simulation_run'], (user_id, seed))
+        return [row[:5] + (_decode_start_stats(row[5]), row[6]) for row in cursor]
     
     def get_simulation_history(self, user_id, limit=10):
         """Получение истории симуляций"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT * FROM simulation_history 
-        WHERE user_id = ? 
-        ORDER BY timestamp DESC 
-        LIMIT ?
-        ''', (user_id, limit))
+        cursor = self.get_connection().execute(self.HOT_QUERIES['simulation_history'], (user_id, limit))
         
-        history = cursor.fetchall()
-        conn.close()
-        return history
+        return cursor.fetchall()
     
     def save_video_content(self, user_id, title, description, category, keywords):
         """Сохранение сгенерированного контента"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        INSERT INTO video_content (user_id, title, description, category, keywords)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (user_id, title, description, category, keywords))
-        
-        conn.commit()
-        conn.close()
+        self.save_video_content_batch(user_id, [(title, description, category, keywords)])
     
-    def get_video_content(self, user_id, limit=10):
-        """Получение сохраненного контента"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+    def save_video_content_batch(self, user_id, rows, stats=None):
+        """Запись пакета контента одной транзакцией
+
+        rows: кортежи (title, description, category, keywords). Если передан
+        stats, в той же транзакции сохраняется снимок статистики канала.
+        """
+        conn = self.get_connection()
+        changed = {}
+        # Отпечатки заголовков (обычно уже в кэше генератора) - до транзакции,
+        # чтобы не держать блокировку записи на время MinHash
+        _preload_minhash_numpy(len(rows))
+        fingerprints = [title_fingerprint(row[0]) for row in rows]
+        
+        with conn:
+            conn.executemany('''
+            INSERT INTO video_content (user_id, title, description, category, keywords, title_hash)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(user_id, *row, fingerprint[0]) for row, fingerprint in zip(rows, fingerprints)])
+            
+            # Одна инструкция в своей транзакции: id пакета идут подряд и
+            # заканчиваются last_insert_rowid()
+            first_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0] - len(rows) + 1
+            conn.executemany(
+                'INSERT OR IGNORE INTO video_title_bands (user_id, band_key, content_id) VALUES (?, ?, ?)',
+                [(user_id, band_key, first_id + offset)
+                 for offset, (_, _, band_keys) in enumerate(fingerprints) for band_key in band_keys]
+            )
+            
+            if stats is not None:
+                changed = self._store_channel_stats(
+                    conn,
+                    [(user_id, _sql_timestamp()) + tuple(stats[field] for field in CHANNEL_STATS_FIELDS)]
+                )
         
-        cursor.execute('''
-        SELECT * FROM video_content 
-        WHERE user_id = ? 
-        ORDER BY created_at DESC 
+        self.stats_cache.update(changed)
+    
+    def find_title_by_hash(self, user_id, title_hash):
+        """Сохраненный заголовок пользователя с тем же title_hash или None"""
+        row = self.get_connection().execute(self.HOT_QUERIES['title_by_hash'], (user_id, title_hash)).fetchone()
+        return row[0] if row else None
+    
+    def find_title_candidates(self, user_id, band_keys):
+        """Заголовки, совпавшие с band_keys хотя бы в одной LSH-полосе (до TITLE_MAX_CANDIDATES)"""
+        placeholders = ', '.join('?' * len(band_keys))
+        cursor = self.get_connection().execute(f'''
+        SELECT v.title FROM video_title_bands b 
+        JOIN video_content v ON v.id = b.content_id 
+        WHERE b.user_id = ? AND b.band_key IN ({placeholders}) 
         LIMIT ?
-        ''', (user_id, limit))
+        ''', (user_id,) + tuple(band_keys) + (TITLE_MAX_CANDIDATES,))
+        return {row[0] for row in cursor}
+    
+    def find_title_last_part(self, user_id, base_title):
+        """Наибольший N среди сохраненных заголовков «base_title (часть N)»; 1, если частей нет"""
+        # Диапазон по индексу (user_id, title): префикс заканчивается пробелом, следующий символ - '!'
+        prefix = f"{base_title} (часть "
+        cursor = self.get_connection().execute(self.HOT_QUERIES['title_parts'], (user_id, prefix, prefix[:-1] + '!'))
+        last = 1
+        for (title,) in cursor:
+            match = _TITLE_PART.fullmatch(title, len(prefix))
+            if match:
+                last = max(last, int(match.group(1)))
+        return last
+    
+    def get_video_content(self, user_id, limit=10):
+        """Получение сохраненного контента"""
+        cursor = self.get_connection().execute(self.HOT_QUERIES['video_content'], (user_id, limit))
         
-        content = cursor.fetchall()
-        conn.close()
-        return content
+        return cursor.fetchall()
     
     def save_task(self, user_id, title, description, due_date, priority):
         """Сохранение задачи"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        conn = self.get_connection()
         
-        cursor.execute('''
-        INSERT INTO tasks (user_id, title, description, due_date, priority)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (user_id, title, description, due_date, priority))
-        
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute('''
+            INSERT INTO tasks (user_id, title, description, due_date, priority)
+            VALUES (?, ?, ?, ?, ?)
+            ''', (user_id, title, description, due_date, priority))
     
     def get_tasks(self, user_id, show_completed=False):
         """Получение задач пользователя"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        conn = self.get_connection()
         
         if show_completed:
-            cursor.execute('SELECT * FROM tasks WHERE user_id = ? ORDER BY priority DESC, due_date', (user_id,))
+            cursor = conn.execute('SELECT * FROM tasks WHERE user_id = ? ORDER BY priority DESC, due_date', (user_id,))
         else:
-            cursor.execute('SELECT * FROM tasks WHERE user_id = ? AND completed = 0 ORDER BY priority DESC, due_date', (user_id,))
+            cursor = conn.execute(self.HOT_QUERIES['open_tasks'], (user_id,))
         
-        tasks = cursor.fetchall()
-        conn.close()
-        return tasks
+        return cursor.fetchall()
     
     def update_task_status(self, task_id, completed):
         """Обновление статуса задачи"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
+        conn = self.get_connection()
         
-        cursor.execute('UPDATE tasks SET completed = ? WHERE id = ?', (completed, task_id))
+        with conn:
+            conn.execute('UPDATE tasks SET completed = ? WHERE id = ?', (completed, task_id))
+
+class SimulationBatchWriter:
+    """Единица работы для прогона симуляции
+
+    Копит снимки статистики и строки истории симуляций и записывает их
+    одной транзакцией (executemany). flush_interval задает, как часто
+    (в секундах) накопленное сбрасывается в БД во время длинного прогона:
+    None - только в конце, 0 - после каждой записи. При выходе из блока
+    with накопленное записывается всегда, в том числе при ошибке.
+    """
+    
+    def __init__(self, db, flush_interval=SIMULATION_FLUSH_INTERVAL):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.flush_count = 0
+        self._stats_rows = []
+        self._stats_sequences = []
+        self._simulation_rows = []
+        self._last_flush = time.monotonic()
+    
+    def add_channel_stats(self, user_id, stats):
+        """Добавление снимка статистики канала (с номером Database.stats_sequence())"""
+        self._stats_sequences.append(self.db.stats_sequence())
+        self._stats_rows.append((
+            user_id,
+            _sql_timestamp(),
+            stats['total_views'],
+            stats['subscribers'],
+            stats['total_likes'],
+            stats['total_comments'],
+            stats['videos_uploaded'],
+            stats['estimated_earnings'],
+            stats['engagement_rate'],
+            stats['watch_time_hours']
+        ))
+        self._maybe_flush()
+    
+    def add_simulation(self, user_id, hours, results, seed=None, start_stats=None, steps=1):
+        """Добавление строки истории симуляции (аргументы как у Database.save_simulation)"""
+        self._simulation_rows.append((
+            user_id,
+            _sql_timestamp(),
+            hours,
+            results.get('subscribers', 0),
+            results.get('views', 0),
+            results.get('likes', 0),
+            results.get('comments', 0),
+            seed,
+            _encode_start_stats(start_stats),
+            steps
+        ))
+        self._maybe_flush()
+    
+    @property
+    def pending(self):
+        """Количество записей, еще не сброшенных в БД"""
+        return len(self._stats_rows) + len(self._simulation_rows)
+    
+    def _maybe_flush(self):
+        if self.flush_interval is None:
+            return
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+    
+    def flush(self):
+        """Запись накопленного одной транзакцией"""
+        if self.pending:
+            self.db.save_simulation_batch(self._stats_rows, self._simulation_rows, self._stats_sequences)
+            self.flush_count += 1
+            self._stats_rows = []
+            self._stats_sequences = []
+            self._simulation_rows = []
+        self._last_flush = time.monotonic()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+# ================ ФОНОВАЯ ЗАПИСЬ В БД ================
+
+# Емкость очереди фоновой записи; при переполнении submit() ждет (обратное давление)
+PERSISTENCE_QUEUE_SIZE = 1000
+
+class PersistenceQueue:
+    """Фоновый поток записи в БД для потока интерфейса
+
+    submit() ставит операцию (функцию с аргументами) в ограниченную очередь
+    и сразу возвращает управление; операции выполняются по порядку в
+    отдельном потоке со своим соединением. Операции с одинаковым key, еще
+    не начатые, сливаются: выполняется только последняя версия аргументов.
+    Колбэки результата и ошибки передаются через dispatch (в GUI -
+    root.after), чтобы выполняться в потоке Tk. shutdown() дописывает очередь.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, db, dispatch=None, maxsize=PERSISTENCE_QUEUE_SIZE):
+        self.db = db
+        self._dispatch = dispatch or (lambda callback, *args: callback(*args))
+        self._queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._pending_keys = {}
+        self._in_flight = 0
+        self._closing = False
+        
+        # Метрики
+        self.submitted = 0
+        self.completed = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.max_depth = 0
+        self._latency_total = 0.0
+        self.max_latency = 0.0
+        
+        self._thread = threading.Thread(target=self._run, name="persistence-writer", daemon=True)
+        self._thread.start()
+    
+    def submit(self, operation, *args, key=None, callback=None, error_callback=None):
+        """Постановка операции в очередь; callback(результат) / error_callback(исключение)"""
+        if self._closing:
+            raise RuntimeError("Очередь записи остановлена")
+        
+        with self._lock:
+            self.submitted += 1
+            job = self._pending_keys.get(key) if key is not None else None
+            if job is not None:
+                # Операция с тем же ключом еще ждет: подменяем аргументы
+                job.update(operation=operation, args=args, callback=callback, error_callback=error_callback)
+                self.coalesced += 1
+                return
+            
+            job = {
+                'operation': operation, 'args': args, 'key': key,
+                'callback': callback, 'error_callback': error_callback,
+                'enqueued': time.perf_counter()
+            }
+            if key is not None:
+                self._pending_keys[key] = job
+            self._in_flight += 1
         
-        conn.commit()
-        conn.close()
+        self._queue.put(job)
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+    
+    @property
+    def depth(self):
+        """Число операций в очереди"""
+        return self._queue.qsize()
+    
+    @property
+    def pending(self):
+        """Число поставленных, но еще не выполненных операций"""
+        return self._in_flight
+    
+    def _run(self):
+        try:
+            while True:
+                job = self._queue.get()
+                if job is self._STOP:
+                    break
+                
+                with self._lock:
+                    if job['key'] is not None:
+                        self._pending_keys.pop(job['key'], None)
+                    operation, args = job['operation'], job['args']
+                    callback, error_callback = job['callback'], job['error_callback']
+                
+                try:
+                    result = operation(*args)
+                except Exception as e:
+                    self.failed += 1
+                    if error_callback is not None and not self._closing:
+                        self._dispatch(error_callback, e)
+                else:
+                    if callback is not None and not self._closing:
+                        self._dispatch(callback, result)
+                finally:
+                    latency = time.perf_counter() - job['enqueued']
+                    with self._lock:
+                        self._in_flight -= 1
+                        self.completed += 1
+                        self._latency_total += latency
+                        self.max_latency = max(self.max_latency, latency)
+        finally:
+            self.db.release_connection()
+    
+    def metrics(self):
+        """Глубина очереди, счетчики и задержка (от постановки до выполнения)"""
+        with self._lock:
+            average = self._latency_total / self.completed if self.completed else 0.0
+            return {
+                'depth': self.depth,
+                'max_depth': self.max_depth,
+                'pending': self._in_flight,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'coalesced': self.coalesced,
+                'failed': self.failed,
+                'avg_latency_ms': round(average * 1000, 2),
+                'max_latency_ms': round(self.max_latency * 1000, 2)
+            }
+    
+    def shutdown(self, timeout=None):
+        """Выполнение оставшихся операций и остановка потока
+
+        Колбэки после начала остановки не вызываются: цикл Tk уже завершен.
+        """
+        if self._closing:
+            return
+        self._closing = True
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+
+# ================ ЖУРНАЛ АКТИВНОСТИ ================
+
+# Журнал активности: один JSONL-файл на все процессы (GUI и CLI) с ротацией
+# по размеру и по дню под межпроцессной блокировкой
+LOG_DIR = "youtube_promo_logs"
+LOG_FILE_NAME = "activity.jsonl"
+LOG_MAX_BYTES = 5 * 1024 * 1024   # Ротация при превышении размера файла
+LOG_BACKUP_COUNT = 5              # Сколько старых файлов хранить (activity.jsonl.1 ... .N)
+LOG_FLUSH_INTERVAL = 1.0          # Секунд между фоновыми сбросами буфера
+LOG_BUFFER_EVENTS = 1000          # Досрочный сброс при таком числе событий в буфере
+LOG_MAX_BUFFERED = 100000         # Предел буфера, пока файл недоступен; лишние события отбрасываются
+
+if os.name == 'nt':
+    import msvcrt
+    
+    def _lock_file(file):
+        """Межпроцессная блокировка открытого файла (ждет до ~10 с, затем OSError)"""
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+    
+    def _unlock_file(file):
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+    
+    def _lock_file(file):
+        """Межпроцессная блокировка открытого файла (ждет освобождения)"""
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+    
+    def _unlock_file(file):
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+class ActivityLogSink:
+    """Буферизованный журнал активности в формате JSON Lines
+
+    emit() только кладет запись в буфер под блокировкой; сериализация и
+    запись выполняются фоновым потоком раз в flush_interval секунд или
+    досрочно, когда в буфере накопилось max_buffer событий. Ротация - как
+    у RotatingFileHandler: при переполнении max_bytes или со сменой дня
+    текущий файл становится .1, старые сдвигаются, файлы дальше
+    backup_count удаляются, так что на диске не больше
+    (backup_count + 1) * max_bytes. close() дописывает буфер.
+
+    В один файл пишут несколько процессов (GUI и CLI), поэтому каждый сброс
+    берет блокировку файла path.lock, решает о ротации по размеру и дате
+    изменения файла на диске и дописывает пакет, открывая файл заново:
+    держать его открытым нельзя - в Windows открытый другим процессом файл
+    не переименовать, а в POSIX процесс писал бы в уже сдвинутый .1.
+
+    Ошибки ввода-вывода не останавливают фоновый поток: пакет, который не
+    удалось записать, возвращается в начало буфера и пишется следующим
+    сбросом (строки, успевшие попасть в файл до ошибки, могут повториться).
+    Буфер ограничен max_buffered событиями, сверх него события
+    отбрасываются и считаются в dropped. Неудачная ротация не мешает
+    записи: файл продолжает расти до следующей успешной попытки.
+
+    Запись может нести listener - функцию, которой при сбросе передается
+    пакет записей с тем же listener (так события попадают в activity_events
+    своей БД). Файл и listener независимы: ошибка одного не задерживает
+    другой. Пакет, на котором listener упал, хранится (не больше
+    max_buffered записей) и передается снова при следующем сбросе.
+    """
+    
+    def __init__(self, path=None, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT,
+                 flush_interval=LOG_FLUSH_INTERVAL, max_buffer=LOG_BUFFER_EVENTS,
+                 max_buffered=LOG_MAX_BUFFERED):
+        self.path = Path(path) if path is not None else Path(LOG_DIR) / LOG_FILE_NAME
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.max_buffered = max_buffered
+        
+        self._buffer = []
+        # Пакеты для listener, еще не принятые им: {listener: [записи]}
+        self._pending = {}
+        self._lock = threading.Lock()
+        # Сериализует сбросы: фоновый поток, flush() и close()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._finished = False
+        
+        # Метрики
+        self.emitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.rotations = 0
+        self.write_errors = 0
+        self.listener_errors = 0
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._size = 0
+        # Файл блокировки не переименовывается, поэтому открыт все время работы
+        self._lock_handle = open(self.path.with_name(f"{self.path.name}.lock"), 'a+b')
+        
+        self._thread = threading.Thread(target=self._run, name="activity-log", daemon=True)
+        self._thread.start()
+    
+    def emit(self, record, listener=None):
+        """Постановка записи (словаря) в буфер; listener(пакет) - после записи в файл"""
+        if self._closed:
+            return
+        with self._lock:
+            if len(self._buffer) >= self.max_buffered:
+                self.dropped += 1
+                return
+            self._buffer.append((record, listener))
+            self.emitted += 1
+            if len(self._buffer) >= self.max_buffer:
+                self._wakeup.set()
+    
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Поток не должен умирать: иначе буфер растет, а события не пишутся
+                self.write_errors += 1
+    
+    def _requeue(self, records):
+        """Возврат незаписанного пакета в начало буфера в пределах max_buffered"""
+        with self._lock:
+            room = max(self.max_buffered - len(self._buffer), 0)
+            if len(records) > room:
+                self.dropped += len(records) - room
+                records = records[len(records) - room:] if room else []
+            self._buffer[:0] = records
+    
+    def _deliver(self):
+        """Передача пакетов listener; упавший пакет остается до следующего сброса"""
+        for listener, batch in list(self._pending.items()):
+            try:
+                listener(batch)
+            except Exception:
+                self.listener_errors += 1
+                if len(batch) > self.max_buffered:
+                    self.dropped += len(batch) - self.max_buffered
+                    del batch[:len(batch) - self.max_buffered]
+            else:
+                del self._pending[listener]
+    
+    def flush(self):
+        """Запись накопленных событий в файл и передача их listener"""
+        with self._write_lock:
+            with self._lock:
+                records, self._buffer = self._buffer, []
+            for record, listener in records:
+                if listener is not None:
+                    self._pending.setdefault(listener, []).append(record)
+            self._deliver()
+            
+            if not records:
+                return
+            if self._finished:
+                self.dropped += len(records)
+                return
+            
+            data = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n"
+                           for record, _ in records).encode('utf-8')
+            try:
+                _lock_file(self._lock_handle)
+                try:
+                    if self._should_rotate(len(data)):
+                        self._rotate()
+                    with open(self.path, 'ab') as f:
+                        f.write(data)
+                        self._size = f.tell()
+                finally:
+                    _unlock_file(self._lock_handle)
+            except OSError:
+                self.write_errors += 1
+                # listener свои записи уже получил - повторяется только файл
+                self._requeue([(record, None) for record, _ in records])
+                return
+            self.written += len(records)
+            self.flushes += 1
+    
+    def _should_rotate(self, incoming):
+        # Размер и день - по файлу на диске: в него пишут и другие процессы
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return False
+        if not stat.st_size:
+            return False
+        if self.max_bytes and stat.st_size + incoming > self.max_bytes:
+            return True
+        return datetime.fromtimestamp(stat.st_mtime).date() != datetime.now().date()
+    
+    def _rotate(self):
+        try:
+            if self.backup_count > 0:
+                for index in range(self.backup_count - 1, 0, -1):
+                    source = self.path.with_name(f"{self.path.name}.{index}")
+                    if source.exists():
+                        os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+                os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+            else:
+                self.path.unlink()
+            self.rotations += 1
+        except OSError:
+            # Файл занят (антивирус, просмотрщик): пишем дальше в него же
+            self.write_errors += 1
+    
+    def metrics(self):
+        """Счетчики событий, сбросов и ротаций"""
+        with self._lock:
+            buffered = len(self._buffer)
+        return {
+            'emitted': self.emitted,
+            'written': self.written,
+            'buffered': buffered,
+            'dropped': self.dropped,
+            'flushes': self.flushes,
+            'rotations': self.rotations,
+            'write_errors': self.write_errors,
+            'listener_errors': self.listener_errors,
+            'listener_pending': sum(len(batch) for batch in self._pending.values()),
+            'file_bytes': self._size
+        }
+    
+    def close(self):
+        """Остановка фонового потока, запись остатка и закрытие файла"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+        with self._write_lock:
+            self._finished = True
+            self._lock_handle.close()
+        # Пакеты, так и не записанные из-за ошибок, теряются
+        with self._lock:
+            self.dropped += len(self._buffer) + sum(len(batch) for batch in self._pending.values())
+            self._buffer = []
+            self._pending = {}
+
+_activity_log = None
+_activity_log_lock = threading.Lock()
+
+def flush_activity_log():
+    """Сброс общего журнала процесса, если он создан
+
+    Вызывается перед закрытием БД: события в буфере ждут записи в ее
+    activity_events.
+    """
+    with _activity_log_lock:
+        sink = _activity_log
+    if sink is not None:
+        sink.flush()
+
+def get_activity_log():
+    """Общий журнал активности процесса (создается при первом обращении)
+
+    Закрывается (с записью буфера) при выходе из интерпретатора.
+    """
+    global _activity_log
+    with _activity_log_lock:
+        if _activity_log is None:
+            _activity_log = ActivityLogSink()
+            atexit.register(_activity_log.close)
+        return _activity_log
 
 # ================ СИСТЕМА АВТОРИЗАЦИИ ================
 
 class AuthSystem:
     """Система аутентификации пользователей"""
     
-    def __init__(self):
-        self.db = Database()
+    def __init__(self, db=None):
+        self.db = db or Database()
         self.current_user = None
         self.current_user_data = None
         self.user_settings = None
@@ -472,147 +1907,731 @@ class AuthSystem:
             except:
                 pass
 
+# ================ КАТАЛОГ ШАБЛОНОВ КОНТЕНТА ================
+
+# Встроенный каталог шаблонов. Внешний каталог (JSON, или YAML при
+# установленном PyYAML) задается параметром или переменной окружения
+# CONTENT_CATALOG_ENV и заменяет разделы верхнего уровня целиком.
+DEFAULT_CONTENT_CATALOG = {
+    'default_category': 'education',
+    'titles': {
+        'gaming': [
+            "🎮 {keyword} - ЭПИЧЕСКИЙ ГЕЙМПЛЕЙ!",
+            "🚀 {keyword}: ВСЕ СЕКРЕТЫ И ТАЙНЫ",
+            "🔥 {keyword} - ПОЛНОЕ ПРОХОЖДЕНИЕ",
+            "🤯 {keyword} - ВЫ НЕ ПОВЕРИТЕ!",
+            "👑 {keyword} - СТАНОВЛЮСЬ ЛУЧШИМ"
+        ],
+        'education': [
+            "📚 {keyword} - ПРОСТО О СЛОЖНОМ",
+            "💡 {keyword}: КАК ЭТО РАБОТАЕТ",
+            "🎓 {keyword} - ПОЛНЫЙ ГАЙД 2024",
+            "🧠 {keyword} - ОТ НОВИЧКА К ПРОФИ",
+            "⚡ {keyword} - УСКОРЕННОЕ ОБУЧЕНИЕ"
+        ],
+        'tech': [
+            "🤖 {keyword} - ОБЗОР И ТЕСТЫ",
+            "💻 {keyword}: РАЗБОР ПО ДЕТАЛЯМ",
+            "⚡ {keyword} - ЧЕСТНЫЙ РЕВЬЮ",
+            "🔧 {keyword} - РЕМОНТ И НАСТРОЙКА",
+            "🚀 {keyword} - БУДУЩЕЕ УЖЕ ЗДЕСЬ"
+        ],
+        'entertainment': [
+            "😄 {keyword} - СМЕШНЫЕ МОМЕНТЫ",
+            "🎭 {keyword}: ШОУ ПРОДОЛЖАЕТСЯ",
+            "🌟 {keyword} - ЛУЧШИЕ ВЫПУСКИ",
+            "🤣 {keyword} - УГАРАЕМ ВМЕСТЕ",
+            "🎬 {keyword} - ЗА КУЛИСАМИ"
+        ]
+    },
+    'descriptions': [
+        "🔔 Подписывайтесь на канал и ставьте колокольчик!\n",
+        "👍 Ставьте лайк, если видео было полезным!\n",
+        "💬 Обязательно пишите в комментариях ваше мнение!\n",
+        "📱 Ссылки на соцсети в описании 👇\n",
+        "🎯 Новое видео каждую неделю!\n",
+        "🌟 Не забудьте поделиться с друзьями!\n",
+        "📅 Следующий выпуск уже скоро!\n",
+        "🏆 Спасибо за вашу поддержку!\n"
+    ],
+    # Базовые слова для генерации контента
+    'keywords': {
+        'gaming': ['Minecraft', 'CS:GO', 'Dota 2', 'GTA 5', 'Fortnite', 'Warzone', 'Valorant', 'Apex Legends', 'Cyberpunk', 'Rocket League'],
+        'education': ['Python', 'JavaScript', 'Дизайн', 'Маркетинг', 'Английский', 'Финансы', 'Кулинария', 'Фотография', 'Музыка', 'История'],
+        'tech': ['iPhone', 'Android', 'Ноутбук', 'Графика', 'Процессор', 'Видеокарта', 'Смартфон', 'Планшет', 'Наушники', 'Камера'],
+        'entertainment': ['Приколы', 'Топ 10', 'Реакция', 'Челлендж', 'Интервью', 'Путешествия', 'Еда', 'Музыка', 'Танцы', 'Юмор']
+    },
+    'default_keyword': "Популярная тема",
+    'hashtags': {
+        'gaming': ['#игры', '#гейминг', '#стрим', '#летсплей', '#киберспорт'],
+        'education': ['#обучение', '#образование', '#гайд', '#советы', '#знания'],
+        'tech': ['#технологии', '#гаджеты', '#обзор', '#it', '#инновации'],
+        'entertainment': ['#развлечения', '#юмор', '#топ', '#приколы', '#реакция']
+    },
+    'common_hashtags': ['#youtube', '#ютуб', '#новоевидео'],
+    'timecodes': {
+        'seconds': [0, 30, 120, 300, 600],
+        'topics': ['Вступление', 'Основная часть', 'Демонстрация', 'Советы', 'Заключение']
+    }
+}
+
+CONTENT_CATALOG_ENV = "YOUTUBE_CONTENT_CATALOG"
+TITLE_PLACEHOLDER = "{keyword}"
+MAX_HASHTAGS = 10
+DESCRIPTION_PARTS = (3, 5)   # Сколько фраз описания (мин, макс)
+TIMECODE_COUNT = (3, 5)      # Сколько тайм-кодов (мин, макс)
+
+yaml = _LazyModule('yaml')
+
+class ContentCatalog:
+    """Каталог шаблонов контента, собранный один раз в неизменяемые структуры
+
+    Заголовки хранятся как пары (префикс, суффикс) вокруг {keyword}:
+    рендер - конкатенация без str.format. Разделы - кортежи и
+    MappingProxyType. Выборки идут через rng.choice / rng.sample по
+    индексам, поэтому стоимость рендера не зависит от размера каталога,
+    а при одинаковом seed результат совпадает со старой генерацией.
+    """
+    
+    def __init__(self, data=None):
+        data = dict(DEFAULT_CONTENT_CATALOG, **(data or {}))
+        
+        self.default_category = data['default_category']
+        self.titles = MappingProxyType({
+            category: tuple(self._compile_title(template) for template in templates)
+            for category, templates in data['titles'].items()
+        })
+        self.descriptions = tuple(data['descriptions'])
+        self.keywords = MappingProxyType({category: tuple(words) for category, words in data['keywords'].items()})
+        self.default_keyword = data['default_keyword']
+        self.hashtags = MappingProxyType({category: tuple(tags) for category, tags in data['hashtags'].items()})
+        self.common_hashtags = tuple(data['common_hashtags'])
+        self.timecode_marks = tuple(f"{seconds // 60}:{seconds % 60:02d}" for seconds in data['timecodes']['seconds'])
+        self.timecode_topics = tuple(data['timecodes']['topics'])
+        
+        if self.default_category not in self.titles or self.default_category not in self.hashtags:
+            raise ValueError(f"Нет шаблонов категории по умолчанию: {self.default_category}")
+        if len(self.descriptions) < DESCRIPTION_PARTS[1]:
+            raise ValueError(f"Нужно не меньше {DESCRIPTION_PARTS[1]} фраз описания")
+        if len(self.timecode_marks) < TIMECODE_COUNT[1] or not self.timecode_topics:
+            raise ValueError(f"Нужно не меньше {TIMECODE_COUNT[1]} отметок тайм-кодов и хотя бы одна тема")
+    
+    @staticmethod
+    def _compile_title(template):
+        parts = template.split(TITLE_PLACEHOLDER)
+        if len(parts) != 2:
+            raise ValueError(f"В шаблоне заголовка должен быть ровно один {TITLE_PLACEHOLDER}: {template!r}")
+        return parts[0], parts[1]
+    
+    @classmethod
+    def from_file(cls, path):
+        """Каталог из JSON- или YAML-файла"""
+        path = Path(path)
+        with open(path, encoding='utf-8') as f:
+            if path.suffix.lower() in ('.yaml', '.yml'):
+                if importlib.util.find_spec('yaml') is None:
+                    raise ValueError("Для каталога YAML нужен PyYAML (pip install pyyaml)")
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+        return cls(data)
+    
+    def pick_keyword(self, category, rng):
+        words = self.keywords.get(category)
+        return rng.choice(words) if words else self.default_keyword
+    
+    def render_title(self, category, keyword, rng):
+        prefix, suffix = rng.choice(self.titles.get(category) or self.titles[self.default_category])
+        return prefix + keyword.upper() + suffix
+    
+    def render_description(self, rng):
+        return "\n".join(rng.sample(self.descriptions, rng.randint(*DESCRIPTION_PARTS)))
+    
+    def render_hashtags(self, category, keyword, rng):
+        """До MAX_HASHTAGS хештегов: категории, ключевого слова и общих"""
+        base = self.hashtags.get(category) or self.hashtags[self.default_category]
+        extra = ('#' + keyword.replace(' ', '').lower(), '#' + category.lower() + 'канал') + self.common_hashtags
+        total = len(base) + len(extra)
+        if total <= 4 * MAX_HASHTAGS:
+            return rng.sample(base + extra, min(MAX_HASHTAGS, total))
+        
+        # Большой каталог: выборка индексов из range без склейки, O(MAX_HASHTAGS);
+        # выбор тот же, что у rng.sample по склеенному кортежу
+        return [base[i] if i < len(base) else extra[i - len(base)]
+                for i in rng.sample(range(total), MAX_HASHTAGS)]
+    
+    def render_timecodes(self, rng):
+        marks = self.timecode_marks[:rng.randint(*TIMECODE_COUNT)]
+        return "Тайм-коды:\n" + "\n".join(f"{mark} - {rng.choice(self.timecode_topics)}" for mark in marks)
+
+_content_catalogs = {}
+_content_catalogs_lock = threading.Lock()
+
+def get_content_catalog(path=None):
+    """Каталог шаблонов: файл path, иначе из CONTENT_CATALOG_ENV, иначе встроенный
+
+    Каталог собирается один раз на процесс и путь.
+    """
+    path = path or os.environ.get(CONTENT_CATALOG_ENV) or None
+    key = str(Path(path).resolve()) if path else None
+    with _content_catalogs_lock:
+        catalog = _content_catalogs.get(key)
+        if catalog is None:
+            catalog = ContentCatalog.from_file(path) if path else ContentCatalog()
+            _content_catalogs[key] = catalog
+        return catalog
+
+# ================ ИНДЕКС ЗАГОЛОВКОВ ================
+
+# Поиск повторов заголовков: точный - по хешу нормализованного заголовка,
+# похожий - MinHash по символьным 3-граммам с LSH-бакетами (полосами)
+TITLE_SHINGLE_SIZE = 3
+TITLE_MINHASH_BANDS = 8
+TITLE_MINHASH_ROWS = 4              # Значений подписи в полосе (всего BANDS * ROWS)
+TITLE_SIMILARITY_THRESHOLD = 0.8    # Жаккар 3-грамм, с которого заголовок считается повтором
+TITLE_MAX_CANDIDATES = 200          # Предел кандидатов LSH на одну проверку
+TITLE_GENERATION_ATTEMPTS = 5       # Повторных рендеров до нумерации «(часть N)»
+TITLE_MINHASH_SEED = 20240101       # Параметры перестановок хранятся в БД: не менять
+TITLE_BACKFILL_CHUNK = 5000         # Строк за порцию при заполнении отпечатков миграцией
+TITLE_FINGERPRINT_CACHE = 4096      # Отпечатков в кэше: заголовок проверяется и сразу пишется
+TITLE_NUMPY_MIN_BATCH = 500         # С такого пакета заголовков MinHash загружает numpy (импорт окупается)
+
+# Перестановки MinHash - хеширование multiply-shift: старшие 32 бита
+# (a * x + b) mod 2**64 для нечетного 64-битного a. Переполнение uint64
+# в numpy дает тот же результат, что и маска в чистом Python.
+_MINHASH_MASK = (1 << 64) - 1
+_minhash_rng = random.Random(TITLE_MINHASH_SEED)
+_MINHASH_PERMUTATIONS = tuple(
+    (_minhash_rng.getrandbits(64) | 1, _minhash_rng.getrandbits(64))
+    for _ in range(TITLE_MINHASH_BANDS * TITLE_MINHASH_ROWS)
+)
+_TITLE_WORD = re.compile(r'\w+')
+_TITLE_PART = re.compile(r'(\d+)\)')
+
+def _int64_digest(data, salt=b''):
+    """Знаковое 64-битное целое из blake2b (тип INTEGER SQLite)"""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8, salt=salt).digest(), 'little', signed=True)
+
+def normalize_title(title):
+    """Заголовок без эмодзи, пунктуации и регистра: слова через пробел
+
+    Заголовок без слов (одни эмодзи или пунктуация) остается как есть, в
+    нижнем регистре: иначе все такие заголовки совпали бы с пустой строкой.
+    """
+    folded = title.casefold()
+    return ' '.join(_TITLE_WORD.findall(folded)) or folded.strip()
+
+def title_shingles(normalized):
+    """Множество символьных 3-грамм нормализованного заголовка"""
+    padded = f" {normalized} "
+    return frozenset(padded[i:i + TITLE_SHINGLE_SIZE] for i in range(len(padded) - TITLE_SHINGLE_SIZE + 1))
+
+def title_hash(normalized):
+    """Хеш нормализованного заголовка (точный повтор)"""
+    return _int64_digest(normalized.encode('utf-8'))
+
+def _minhash_arrays():
+    """Параметры перестановок для numpy или None, пока numpy не загружен
+
+    Одиночные заголовки (generate-content) не должны импортировать numpy;
+    его загружает прогноз, графики или большой пакет (_preload_minhash_numpy).
+    """
+    if 'numpy' not in sys.modules:
+        return None
+    return _numpy_permutations()
+
+def _preload_minhash_numpy(count):
+    """Загрузка numpy перед MinHash count заголовков, если импорт окупится"""
+    if count >= TITLE_NUMPY_MIN_BATCH and importlib.util.find_spec('numpy') is not None:
+        importlib.import_module('numpy')
+
+@functools.lru_cache(maxsize=None)
+def _numpy_permutations():
+    """Параметры перестановок столбцами uint64"""
+    a = np.array([a for a, _ in _MINHASH_PERMUTATIONS], dtype=np.uint64)[:, None]
+    b = np.array([b for _, b in _MINHASH_PERMUTATIONS], dtype=np.uint64)[:, None]
+    return a, b, np.uint64(32)
+
+def title_band_keys(shingles):
+    """Ключи LSH-полос MinHash-подписи множества 3-грамм
+
+    Все перестановки считаются одной матричной операцией numpy, если он
+    загружен; иначе - циклом на Python с тем же результатом. У пустого множества (пустой
+    заголовок) полос нет: повтор такого заголовка ищется только по title_hash.
+    """
+    if not shingles:
+        return ()
+    values = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingles]
+    arrays = _minhash_arrays()
+    if arrays is not None:
+        a, b, shift = arrays
+        x = np.array(values, dtype=np.uint64)
+        signature = ((a * x + b) >> shift).min(axis=1).tolist()
+    else:
+        signature = [min([((a * x + b) & _MINHASH_MASK) >> 32 for x in values])
+                     for a, b in _MINHASH_PERMUTATIONS]
+    
+    return tuple(
+        _int64_digest(repr(signature[band * TITLE_MINHASH_ROWS:(band + 1) * TITLE_MINHASH_ROWS]).encode(),
+                      salt=bytes([band]))
+        for band in range(TITLE_MINHASH_BANDS)
+    )
+
+@functools.lru_cache(maxsize=TITLE_FINGERPRINT_CACHE)
+def title_fingerprint(title):
+    """Хеш нормализованного заголовка, его 3-граммы и ключи LSH-полос
+
+    Возвращает (title_hash, shingles, band_keys): title_hash и band_keys -
+    знаковые 64-битные целые для индексов SQLite. Результат кэшируется:
+    принятый генератором заголовок затем сохраняется в БД.
+    """
+    normalized = normalize_title(title)
+    shingles = title_shingles(normalized)
+    return title_hash(normalized), shingles, title_band_keys(shingles)
+
+def _store_title_fingerprints(conn, rows):
+    """title_hash и LSH-полосы для строк video_content: [(id, user_id, title)]"""
+    updates, bands = [], []
+    for content_id, user_id, title in rows:
+        hashed, _, band_keys = title_fingerprint(title)
+        updates.append((hashed, content_id))
+        bands.extend((user_id, band_key, content_id) for band_key in band_keys)
+    
+    conn.executemany('UPDATE video_content SET title_hash = ? WHERE id = ?', updates)
+    conn.executemany('INSERT OR IGNORE INTO video_title_bands (user_id, band_key, content_id) VALUES (?, ?, ?)', bands)
+
+def _backfill_title_fingerprints(conn):
+    """Шаг миграции: отпечатки уже сохраненных заголовков"""
+    cursor = conn.execute('SELECT id, user_id, title FROM video_content WHERE title IS NOT NULL ORDER BY id')
+    while True:
+        rows = cursor.fetchmany(TITLE_BACKFILL_CHUNK)
+        if not rows:
+            break
+        _preload_minhash_numpy(len(rows))
+        _store_title_fingerprints(conn, rows)
+
+class TitleIndex:
+    """Проверка заголовка на повтор среди сохраненного контента пользователя
+
+    Точный повтор ищется по индексу (user_id, title_hash), похожий - по
+    LSH-полосам MinHash в video_title_bands с проверкой кандидатов точным
+    коэффициентом Жаккара 3-грамм. Оба запроса индексные, поэтому время
+    проверки почти не зависит от числа сохраненных заголовков. Заголовки,
+    принятые в этом процессе, но еще не записанные (очередь фоновой
+    записи, пакет), учитываются через remember(); после записи в БД
+    forget() убирает их из памяти (колбэк очереди записи может прийти из
+    ее потока, поэтому учтенные заголовки под блокировкой).
+    """
+    
+    def __init__(self, db, threshold=TITLE_SIMILARITY_THRESHOLD):
+        self.db = db
+        self.threshold = threshold
+        self._recent_hashes = {}
+        self._recent_bands = {}
+        # Последний выданный номер серии «(часть N)»: {(user_id, base_title): N}
+        self._parts = {}
+        self._lock = threading.Lock()
+    
+    def find_duplicate(self, user_id, title, exact_only=False):
+        """Похожий сохраненный заголовок: {'title', 'similarity', 'exact'} или None
+
+        Отпечаток берется из кэша title_fingerprint: принятый заголовок
+        затем запоминается и пишется в БД без повторного MinHash.
+        """
+        hashed, shingles, band_keys = title_fingerprint(title)
+        
+        with self._lock:
+            recent = self._recent_hashes.get((user_id, hashed))
+        if recent is not None:
+            return {'title': recent, 'similarity': 1.0, 'exact': True}
+        match = self.db.find_title_by_hash(user_id, hashed)
+        if match is not None:
+            return {'title': match, 'similarity': 1.0, 'exact': True}
+        if exact_only:
+            return None
+        
+        candidates = set()
+        with self._lock:
+            for band_key in band_keys:
+                candidates.update(self._recent_bands.get((user_id, band_key), ()))
+        candidates.update(self.db.find_title_candidates(user_id, band_keys))
+        
+        best = None
+        for candidate in candidates:
+            other = title_shingles(normalize_title(candidate))
+            similarity = len(shingles & other) / len(shingles | other)
+            if similarity >= self.threshold and (best is None or similarity > best['similarity']):
+                best = {'title': candidate, 'similarity': similarity, 'exact': False}
+        return best
+    
+    def remember(self, user_id, title):
+        """Учет принятого заголовка до его записи в БД"""
+        hashed, _, band_keys = title_fingerprint(title)
+        with self._lock:
+            self._recent_hashes[(user_id, hashed)] = title
+            for band_key in band_keys:
+                self._recent_bands.setdefault((user_id, band_key), []).append(title)
+    
+    def next_part(self, user_id, base_title):
+        """Первый свободный номер N для заголовка «base_title (часть N)»
+
+        Наибольший сохраненный номер читается из БД один раз на серию,
+        дальше номер ведется в памяти: на черновик - одна проверка повтора.
+        """
+        key = (user_id, base_title)
+        with self._lock:
+            part = self._parts.get(key)
+        if part is None:
+            part = self.db.find_title_last_part(user_id, base_title)
+        part += 1
+        while self.find_duplicate(user_id, f"{base_title} (часть {part})", exact_only=True):
+            part += 1
+        with self._lock:
+            self._parts[key] = part
+        return part
+    
+    def forget(self, user_id, titles):
+        """Удаление записанных в БД заголовков из учтенных remember()"""
+        for title in titles:
+            hashed, _, band_keys = title_fingerprint(title)
+            with self._lock:
+                self._recent_hashes.pop((user_id, hashed), None)
+                for band_key in band_keys:
+                    recent = self._recent_bands.get((user_id, band_key))
+                    if recent is not None and title in recent:
+                        recent.remove(title)
+                        if not recent:
+                            del self._recent_bands[(user_id, band_key)]
+
 # ================ УЛУЧШЕННЫЙ КЛАСС ДЛЯ YOUTUBE АВТОМАТИЗАЦИИ ================
 
+# Модель роста канала. Прирост за час: randint(мин, макс) * часы * множитель,
+# но не меньше нижней границы: метрика -> (мин, макс, нижняя граница)
+GROWTH_RANGES = {
+    'views': (50, 300, 10),
+    'subscribers': (1, 15, 1),
+    'likes': (10, 60, 1),
+    'comments': (1, 20, 0),
+    'shares': (1, 10, 0)
+}
+MIN_GROWTH_MULTIPLIER = 0.1   # Множитель роста больших каналов
+WATCH_HOURS_PER_VIEW = 0.05
+BASE_CPM = 0.5
+MAX_CPM_BONUS = 2.0
+CPM_BONUS_SUBSCRIBERS = 10000  # Подписчиков на +1.0 к CPM
+
+# Этапы расширенной симуляции
+SIMULATION_STAGES = [
+    "📊 Анализ текущей статистики...",
+    "🎯 Поиск целевой аудитории...",
+    "📈 Оптимизация контента...",
+    "🚀 Запуск продвижения...",
+    "📱 Настройка рекламных кампаний...",
+    "💬 Взаимодействие с аудиторией...",
+    "📊 Сбор аналитики...",
+    "💰 Расчет монетизации..."
+]
+
+# Темп расширенной симуляции
+PACING_FAST = 'fast'                 # Без пауз (пакетные задачи)
+PACING_PACED = 'paced'               # Демонстрационная пауза на каждом этапе
+PACING_REALTIME = 'realtime-scaled'  # Реальное время, сжатое в time_scale раз
+PACING_MODES = (PACING_FAST, PACING_PACED, PACING_REALTIME)
+PACED_STAGE_DELAY = 0.5              # Секунд на этап в режиме paced
+DEFAULT_TIME_SCALE = 3600            # 1 час симуляции = 1 секунда
+
+# Наибольший пакет черновиков за одну генерацию (GUI и CLI)
+CONTENT_BATCH_MAX = 500
+
+def empty_channel_stats():
+    """Нулевая статистика нового канала"""
+    return {
+        'total_views': 0,
+        'subscribers': 0,
+        'total_likes': 0,
+        'total_comments': 0,
+        'videos_uploaded': 0,
+        'estimated_earnings': 0.0,
+        'engagement_rate': 0.0,
+        'watch_time_hours': 0.0
+    }
+
+def new_seed():
+    """Новый случайный seed для генератора промоутера или прогона"""
+    return secrets.randbits(63)
+
+def apply_growth_step(stats, hours, rng):
+    """Один шаг модели роста: изменяет stats и возвращает приросты
+
+    rng - экземпляр random.Random; одинаковый seed дает одинаковый рост.
+    """
+    # Базовый рост зависит от текущей статистики
+    # Чем больше аккаунт, тем медленнее относительный рост
+    base_multiplier = max(MIN_GROWTH_MULTIPLIER, 10 / (stats['subscribers'] + 1))
+    
+    growth_data = {
+        key: max(floor, int(rng.randint(low, high) * hours * base_multiplier))
+        for key, (low, high, floor) in GROWTH_RANGES.items()
+    }
+    
+    # Обновляем статистику
+    stats['total_views'] += growth_data['views']
+    stats['subscribers'] += growth_data['subscribers']
+    stats['total_likes'] += growth_data['likes']
+    stats['total_comments'] += growth_data['comments']
+    stats['watch_time_hours'] += growth_data['views'] * WATCH_HOURS_PER_VIEW
+    
+    # Расчет дохода (примерная монетизация)
+    # CPM растет с увеличением подписчиков
+    cpm_bonus = min(MAX_CPM_BONUS, stats['subscribers'] / CPM_BONUS_SUBSCRIBERS)  # Бонус за большое количество подписчиков
+    cpm = BASE_CPM + cpm_bonus
+    earnings = (growth_data['views'] / 1000) * cpm
+    stats['estimated_earnings'] += earnings
+    
+    # Расчет engagement rate
+    if stats['total_views'] > 0:
+        engagement = ((stats['total_likes'] + stats['total_comments']) / stats['total_views']) * 100
+        stats['engagement_rate'] = round(engagement, 2)
+    
+    return growth_data
+
+def replay_simulation(stats, hours, seed, stages=1):
+    """Повтор прогона по сохраненному seed бит в бит
+
+    stats - статистика на момент начала прогона (не изменяется), stages -
+    число этапов прогона (1 для быстрой симуляции, len(SIMULATION_STAGES)
+    для расширенной). Возвращает итоговую статистику и приросты этапов.
+    """
+    stats = dict(stats)
+    rng = random.Random(seed)
+    stage_hours = hours / stages
+    growth = [apply_growth_step(stats, stage_hours, rng) for _ in range(stages)]
+    return stats, growth
+
+def replay_stored_simulation(db, user_id, seed):
+    """Повтор сохраненного в БД прогона по его seed
+
+    Статистика начала и число шагов берутся из строк истории прогона
+    (миграция 10). Возвращает (итоговая статистика, приросты шагов) или None,
+    если прогона нет или он записан до миграции 10.
+    """
+    rows = db.get_simulation_run(user_id, seed)
+    if not rows or rows[0][5] is None:
+        return None
+    
+    hours = sum(row[0] for row in rows)
+    stages = sum(row[6] or 1 for row in rows)
+    return replay_simulation(rows[0][5], hours, seed, stages)
+
+class ObservableStats(dict):
+    """Статистика канала с событиями изменения отдельных полей
+
+    Подписчики вызываются как callback(field, old, new) только при реальной
+    смене значения и в том потоке, который изменил статистику (поток
+    симуляции тоже). Копии (dict(stats), pickle) - обычные словари без
+    подписчиков.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._listeners = []
+    
+    def subscribe(self, callback):
+        """Подписка на изменения полей"""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+        return callback
+    
+    def unsubscribe(self, callback):
+        """Отписка; неизвестный callback игнорируется"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def __setitem__(self, field, value):
+        old = self.get(field)
+        changed = field not in self or old != value
+        super().__setitem__(field, value)
+        if changed:
+            for callback in list(self._listeners):
+                callback(field, old, value)
+    
+    def update(self, *args, **kwargs):
+        """Как dict.update, но через __setitem__ (с событиями по каждому полю)"""
+        for field, value in dict(*args, **kwargs).items():
+            self[field] = value
+    
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
 class YouTubeAutoPromoter:
     """Основной класс для автоматизации YouTube продвижения"""
 
-    def __init__(self, username="User", user_id=None, db=None):
+    def __init__(self, username="User", user_id=None, db=None, seed=None, persistence=None, activity_log=None,
+                 catalog=None):
         self.username = username
         self.user_id = user_id or str(uuid.uuid4())
         self.db = db or Database()
         
+        # Журнал активности; по умолчанию общий для процесса
+        self.activity_log = activity_log
+        
+        # Очередь фоновой записи (GUI); без нее запись в БД синхронная
+        self.persistence = persistence
+        
+        # Собственный генератор случайных чисел: воспроизводимость и
+        # независимые потоки для параллельных промоутеров
+        self.seed = seed if seed is not None else new_seed()
+        self.rng = random.Random(self.seed)
+        self.last_seed = None
+        
         # Загружаем статистику из БД
+        # (ObservableStats: GUI подписывается на изменения отдельных полей)
         stats = self.db.get_latest_channel_stats(self.user_id)
         if stats:
-            self.stats = stats
+            self.stats = ObservableStats(stats)
         else:
             # НУЛЕВАЯ СТАТИСТИКА для новых аккаунтов
-            self.stats = {
-                'total_views': 0,
-                'subscribers': 0,
-                'total_likes': 0,
-                'total_comments': 0,
-                'videos_uploaded': 0,
-                'estimated_earnings': 0.0,
-                'engagement_rate': 0.0,
-                'watch_time_hours': 0.0
-            }
+            self.stats = ObservableStats(empty_channel_stats())
             # Сохраняем начальную статистику (нулевую)
-            self.db.save_channel_stats(self.user_id, self.stats)
+            self.db.save_channel_stats(self.user_id, dict(self.stats))
         
         self.analytics_data = []
         self.is_running = False
         self.simulation_active = False
+        self._stop_event = threading.Event()
         
-        # Улучшенные данные для генерации контента
-        self.content_templates = {
-            'titles': {
-                'gaming': [
-                    "🎮 {keyword} - ЭПИЧЕСКИЙ ГЕЙМПЛЕЙ!",
-                    "🚀 {keyword}: ВСЕ СЕКРЕТЫ И ТАЙНЫ",
-                    "🔥 {keyword} - ПОЛНОЕ ПРОХОЖДЕНИЕ",
-                    "🤯 {keyword} - ВЫ НЕ ПОВЕРИТЕ!",
-                    "👑 {keyword} - СТАНОВЛЮСЬ ЛУЧШИМ"
-                ],
-                'education': [
-                    "📚 {keyword} - ПРОСТО О СЛОЖНОМ",
-                    "💡 {keyword}: КАК ЭТО РАБОТАЕТ",
-                    "🎓 {keyword} - ПОЛНЫЙ ГАЙД 2024",
-                    "🧠 {keyword} - ОТ НОВИЧКА К ПРОФИ",
-                    "⚡ {keyword} - УСКОРЕННОЕ ОБУЧЕНИЕ"
-                ],
-                'tech': [
-                    "🤖 {keyword} - ОБЗОР И ТЕСТЫ",
-                    "💻 {keyword}: РАЗБОР ПО ДЕТАЛЯМ",
-                    "⚡ {keyword} - ЧЕСТНЫЙ РЕВЬЮ",
-                    "🔧 {keyword} - РЕМОНТ И НАСТРОЙКА",
-                    "🚀 {keyword} - БУДУЩЕЕ УЖЕ ЗДЕСЬ"
-                ],
-                'entertainment': [
-                    "😄 {keyword} - СМЕШНЫЕ МОМЕНТЫ",
-                    "🎭 {keyword}: ШОУ ПРОДОЛЖАЕТСЯ",
-                    "🌟 {keyword} - ЛУЧШИЕ ВЫПУСКИ",
-                    "🤣 {keyword} - УГАРАЕМ ВМЕСТЕ",
-                    "🎬 {keyword} - ЗА КУЛИСАМИ"
-                ]
-            },
-            
-            'descriptions': [
-                "🔔 Подписывайтесь на канал и ставьте колокольчик!\n",
-                "👍 Ставьте лайк, если видео было полезным!\n",
-                "💬 Обязательно пишите в комментариях ваше мнение!\n",
-                "📱 Ссылки на соцсети в описании 👇\n",
-                "🎯 Новое видео каждую неделю!\n",
-                "🌟 Не забудьте поделиться с друзьями!\n",
-                "📅 Следующий выпуск уже скоро!\n",
-                "🏆 Спасибо за вашу поддержку!\n"
-            ]
-        }
+        # Каталог шаблонов контента (общий для процесса, собран один раз)
+        self.catalog = catalog or get_content_catalog()
         
-        # Базовые слова для генерации контента
-        self.keyword_bank = {
-            'gaming': ['Minecraft', 'CS:GO', 'Dota 2', 'GTA 5', 'Fortnite', 'Warzone', 'Valorant', 'Apex Legends', 'Cyberpunk', 'Rocket League'],
-            'education': ['Python', 'JavaScript', 'Дизайн', 'Маркетинг', 'Английский', 'Финансы', 'Кулинария', 'Фотография', 'Музыка', 'История'],
-            'tech': ['iPhone', 'Android', 'Ноутбук', 'Графика', 'Процессор', 'Видеокарта', 'Смартфон', 'Планшет', 'Наушники', 'Камера'],
-            'entertainment': ['Приколы', 'Топ 10', 'Реакция', 'Челлендж', 'Интервью', 'Путешествия', 'Еда', 'Музыка', 'Танцы', 'Юмор']
-        }
+        # Индекс заголовков: генерация избегает повторов уже созданного контента
+        self.title_index = TitleIndex(self.db)
         
         # Инициализируем логи
         self.setup_logging()
         
     def setup_logging(self):
-        """Настройка системы логирования"""
-        log_dir = Path("youtube_promo_logs")
-        log_dir.mkdir(exist_ok=True)
-        
-        self.log_file = log_dir / f"promo_{self.user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+        """Настройка системы логирования: общий буферизованный журнал процесса"""
+        if self.activity_log is None:
+            self.activity_log = get_activity_log()
+        self.log_file = self.activity_log.path
         
-    def log_activity(self, activity, details=""):
-        """Логирование активности"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] [{self.user_id}] {activity}: {details}"
-        
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(log_entry + "\n")
+    def _persist(self, operation, *args, key=None, callback=None):
+        """Запись в БД: через очередь фоновой записи, если она задана
+
+        callback(результат) вызывается после успешной записи.
+        """
+        if self.persistence is not None:
+            self.persistence.submit(operation, *args, key=key, callback=callback)
+        else:
+            result = operation(*args)
+            if callback is not None:
+                callback(result)
+    
+    def _persist_stats(self):
+        """Сохранение снимка stats; ожидающие в очереди снимки сливаются в последний
+
+        Номер снимка берется сейчас: если поток симуляции тем временем
+        запишет более новый снимок, этот при записи будет пропущен.
+        """
+        self._persist(self.db.save_channel_stats, self.user_id, dict(self.stats), self.db.stats_sequence(),
+                      key=('channel_stats', self.user_id))
+    
+    def log_activity(self, activity, details="", **fields):
+        """Логирование активности: запись JSONL в буфер журнала
+
+        Дополнительные именованные поля попадают в запись как есть; после
+        сброса буфера событие записывается и в activity_events.
+        """
+        timestamp = datetime.now(timezone.utc).isoformat(timespec='milliseconds')
+        record = {'ts': timestamp, 'user_id': self.user_id, 'activity': activity, 'details': details}
+        record.update(fields)
+        self.activity_log.emit(record, self.db.save_activity_events)
         
-        return log_entry
+        return f"[{timestamp}] [{self.user_id}] {activity}: {details}"
     
     def generate_video_content(self, category, keyword=None):
         """Генерация полного контента для видео"""
-        # Если ключевое слово не указано, выбираем случайное из банка
-        if not keyword or keyword.strip() == "":
-            if category in self.keyword_bank:
-                keyword = random.choice(self.keyword_bank[category])
-            else:
-                keyword = "Популярная тема"
+        content = self._render_unique_content(category, keyword)
         
-        # Заголовок
-        templates = self.content_templates['titles'].get(category, self.content_templates['titles']['education'])
-        title_template = random.choice(templates)
-        title = title_template.format(keyword=keyword.upper())
+        self.log_activity("CONTENT_GENERATED", f"Title: {content['title']}", category=category, keyword=content['keyword'])
         
-        # Описание
-        description_parts = random.sample(self.content_templates['descriptions'], random.randint(3, 5))
-        description = "\n".join(description_parts)
+        # Сохраняем в БД; после записи заголовок находится индексом БД
+        self._persist(self.db.save_video_content, self.user_id, content['title'], content['description'], category, content['keyword'],
+                      callback=lambda _: self.title_index.forget(self.user_id, [content['title']]))
         
-        # Генерация хештеги
-        hashtags = self.generate_hashtags(category, keyword)
-        hashtag_string = " ".join(hashtags)
+        # Увеличиваем счетчик видео при генерации контента
+        self.stats['videos_uploaded'] += 1
+        self._persist_stats()
         
-        # Генерация тайм-кодов
-        timecodes = self.generate_timecodes()
+        return content
+    
+    def generate_video_content_batch(self, category, keywords=None, n=1):
+        """Пакетная генерация n черновиков: одна запись контента и одно обновление статистики
+
+        keywords - ключевые слова по кругу; без них каждое выбирается из банка.
+        Без очереди фоновой записи контент и снимок статистики пишутся одной
+        транзакцией. С очередью снимок ставится отдельно с ключом
+        channel_stats: ожидающий снимок в очереди может быть новее пакета.
+        """
+        keywords = [keyword for keyword in (keywords or []) if keyword and keyword.strip()]
+        items = [
+            self._render_unique_content(category, keywords[i % len(keywords)] if keywords else None)
+            for i in range(n)
+        ]
+        if not items:
+            return items
         
-        full_description = f"{title}\n\n{description}\n\n{timecodes}\n\n{hashtag_string}"
+        for content in items:
+            self.log_activity("CONTENT_GENERATED", f"Title: {content['title']}", category=category, keyword=content['keyword'])
         
-        self.log_activity("CONTENT_GENERATED", f"Title: {title}")
+        rows = [(content['title'], content['description'], category, content['keyword']) for content in items]
+        titles = [content['title'] for content in items]
+        self.stats['videos_uploaded'] += len(items)
         
-        # Сохраняем в БД
-        self.db.save_video_content(self.user_id, title, full_description, category, keyword)
+        if self.persistence is not None:
+            self._persist(self.db.save_video_content_batch, self.user_id, rows,
+                          callback=lambda _: self.title_index.forget(self.user_id, titles))
+            self._persist_stats()
+        else:
+            self.db.save_video_content_batch(self.user_id, rows, dict(self.stats))
+            self.title_index.forget(self.user_id, titles)
         
-        # Увеличиваем счетчик видео при генерации контента
-        self.stats['videos_uploaded'] += 1
-        self.db.save_channel_stats(self.user_id, self.stats)
+        return items
+    
+    def _render_unique_content(self, category, keyword=None):
+        """Рендер контента с заголовком, которого еще нет у пользователя
+
+        Повтор или похожий заголовок (TitleIndex) рендерится заново до
+        TITLE_GENERATION_ATTEMPTS раз; если шаблоны исчерпаны, к заголовку
+        добавляется «(часть N)» со следующим номером серии. Принятый заголовок
+        запоминается сразу, до записи в БД.
+        """
+        for _ in range(TITLE_GENERATION_ATTEMPTS):
+            content = self._render_video_content(category, keyword)
+            if self.title_index.find_duplicate(self.user_id, content['title']) is None:
+                break
+        else:
+            # Серия: номерные части проверяются только на точный повтор
+            base_title = content['title']
+            part = self.title_index.next_part(self.user_id, base_title)
+            content['title'] = f"{base_title} (часть {part})"
+            content['description'] = content['title'] + content['description'][len(base_title):]
+        
+        self.title_index.remember(self.user_id, content['title'])
+        return content
+    
+    def _render_video_content(self, category, keyword=None):
+        """Заголовок, описание и хештеги одного видео (без записи в БД)"""
+        # Если ключевое слово не указано, выбираем случайное из банка
+        if not keyword or keyword.strip() == "":
+            keyword = self.catalog.pick_keyword(category, self.rng)
+        
+        title = self.catalog.render_title(category, keyword, self.rng)
+        description = self.catalog.render_description(self.rng)
+        hashtag_string = " ".join(self.generate_hashtags(category, keyword))
+        timecodes = self.generate_timecodes()
+        
+        full_description = f"{title}\n\n{description}\n\n{timecodes}\n\n{hashtag_string}"
         
         return {
             'title': title,
@@ -625,72 +2644,40 @@ class YouTubeAutoPromoter:
     
     def generate_hashtags(self, category, keyword):
         """Генерация релевантных хештегов"""
-        base_hashtags = {
-            'gaming': ['#игры', '#гейминг', '#стрим', '#летсплей', '#киберспорт'],
-            'education': ['#обучение', '#образование', '#гайд', '#советы', '#знания'],
-            'tech': ['#технологии', '#гаджеты', '#обзор', '#it', '#инновации'],
-            'entertainment': ['#развлечения', '#юмор', '#топ', '#приколы', '#реакция']
-        }
-        
-        hashtags = base_hashtags.get(category, base_hashtags['education'])
-        
-        # Добавляем специфичные хештеги
-        keyword_hashtags = ['#' + keyword.replace(' ', '').lower(), 
-                           '#' + category.lower() + 'канал',
-                           '#youtube', '#ютуб', '#новоевидео']
-        
-        all_hashtags = hashtags + keyword_hashtags
-        return random.sample(all_hashtags, min(10, len(all_hashtags)))
+        return self.catalog.render_hashtags(category, keyword, self.rng)
     
     def generate_timecodes(self):
         """Генерация тайм-кодов для видео"""
-        times = [0, 30, 120, 300, 600]  # секунды
-        topics = ['Вступление', 'Основная часть', 'Демонстрация', 'Советы', 'Заключение']
-        
-        timecodes = []
-        for i in range(random.randint(3, 5)):
-            time_str = f"{times[i] // 60}:{str(times[i] % 60).zfill(2)}"
-            timecodes.append(f"{time_str} - {random.choice(topics)}")
-        
-        return "Тайм-коды:\n" + "\n".join(timecodes)
-    
-    def simulate_channel_growth(self, hours=1):
-        """Симуляция роста канала за указанное время (реалистичный рост)"""
-        # Базовый рост зависит от текущей статистики
-        # Чем больше аккаунт, тем медленнее относительный рост
-        base_multiplier = max(0.1, 10 / (self.stats['subscribers'] + 1))
-        
-        growth_data = {
-            'views': max(10, int(random.randint(50, 300) * hours * base_multiplier)),
-            'subscribers': max(1, int(random.randint(1, 15) * hours * base_multiplier)),
-            'likes': max(1, int(random.randint(10, 60) * hours * base_multiplier)),
-            'comments': max(0, int(random.randint(1, 20) * hours * base_multiplier)),
-            'shares': max(0, int(random.randint(1, 10) * hours * base_multiplier))
-        }
+        return self.catalog.render_timecodes(self.rng)
+    
+    def simulate_channel_growth(self, hours=1, writer=None, rng=None, seed=None, start_stats=None):
+        """Симуляция роста канала за указанное время (реалистичный рост)
+
+        Если передан writer (SimulationBatchWriter), записи в БД копятся
+        в нем и сбрасываются пакетом, иначе сохраняются сразу.
+        rng, seed и start_stats (статистику на начало прогона) передает
+        расширенный прогон; без них вызов - отдельный прогон со своим seed.
+        seed и start_stats сохраняются вместе со строкой истории, см.
+        replay_stored_simulation().
+        """
+        # Генератор прогона: свой seed на каждый прогон, если не передан
+        if rng is None:
+            if seed is None:
+                seed = self.rng.getrandbits(63)
+            rng = random.Random(seed)
+        self.last_seed = seed
+        if start_stats is None:
+            start_stats = dict(self.stats)
         
-        # Обновляем статистику
-        self.stats['total_views'] += growth_data['views']
-        self.stats['subscribers'] += growth_data['subscribers']
-        self.stats['total_likes'] += growth_data['likes']
-        self.stats['total_comments'] += growth_data['comments']
-        self.stats['watch_time_hours'] += growth_data['views'] * 0.05
-        
-        # Расчет дохода (примерная монетизация)
-        # CPM растет с увеличением подписчиков
-        base_cpm = 0.5
-        cpm_bonus = min(2.0, self.stats['subscribers'] / 10000)  # Бонус за большое количество подписчиков
-        cpm = base_cpm + cpm_bonus
-        earnings = (growth_data['views'] / 1000) * cpm
-        self.stats['estimated_earnings'] += earnings
-        
-        # Расчет engagement rate
-        if self.stats['total_views'] > 0:
-            engagement = ((self.stats['total_likes'] + self.stats['total_comments']) / self.stats['total_views']) * 100
-            self.stats['engagement_rate'] = round(engagement, 2)
+        growth_data = apply_growth_step(self.stats, hours, rng)
         
         # Сохраняем в БД
-        self.db.save_channel_stats(self.user_id, self.stats)
-        self.db.save_simulation(self.user_id, hours, growth_data)
+        if writer is not None:
+            writer.add_channel_stats(self.user_id, self.stats)
+            writer.add_simulation(self.user_id, hours, growth_data, seed, start_stats)
+        else:
+            self._persist_stats()
+            self._persist(self.db.save_simulation, self.user_id, hours, growth_data, seed, start_stats)
         
         # Сохраняем аналитику
         analytics_entry = {
@@ -700,29 +2687,51 @@ class YouTubeAutoPromoter:
         }
         self.analytics_data.append(analytics_entry)
         
-        self.log_activity("GROWTH_SIMULATED", f"{hours} hours: +{growth_data['subscribers']} subs")
+        self.log_activity("GROWTH_SIMULATED", f"{hours} hours: +{growth_data['subscribers']} subs",
+                          hours=hours, subscribers=growth_data['subscribers'], views=growth_data['views'])
         
         return growth_data
     
-    def run_extended_simulation(self, hours, update_callback=None):
-        """Расширенная симуляция с обновлением UI"""
-        self.simulation_active = True
+    def run_extended_simulation(self, hours, update_callback=None, flush_interval=SIMULATION_FLUSH_INTERVAL,
+                                pacing=PACING_PACED, time_scale=DEFAULT_TIME_SCALE, seed=None):
+        """Расширенная симуляция с обновлением UI
+
+        pacing задает паузы между этапами: PACING_FAST - без пауз,
+        PACING_PACED - демонстрационные 0.5 с на этап, PACING_REALTIME -
+        реальная длительность этапа, сжатая в time_scale раз.
+        update_callback(stage, номер этапа, всего этапов) вызывается в начале
+        каждого этапа во всех режимах. Все записи прогона сохраняются пакетно
+        (см. SimulationBatchWriter).
+        
+        Прогон использует собственный генератор с seed (переданным или новым
+        из генератора промоутера); seed возвращается в results['seed'] и
+        вместе со статистикой начала прогона сохраняется в каждой строке
+        истории прогона, см. replay_stored_simulation().
+        
+        Флаг остановки здесь не сбрасывается: прогон, запускаемый в другом
+        потоке, готовит prepare_simulation() до старта потока, иначе
+        stop_simulation() до начала прогона потерялся бы.
+        """
+        if pacing not in PACING_MODES:
+            raise ValueError(f"Неизвестный режим темпа: {pacing}")
         
-        # Этапы симуляции
-        stages = [
-            "📊 Анализ текущей статистики...",
-            "🎯 Поиск целевой аудитории...",
-            "📈 Оптимизация контента...",
-            "🚀 Запуск продвижения...",
-            "📱 Настройка рекламных кампаний...",
-            "💬 Взаимодействие с аудиторией...",
-            "📊 Сбор аналитики...",
-            "💰 Расчет монетизации..."
-        ]
+        self.simulation_active = not self._stop_event.is_set()
+        
+        run_seed = seed if seed is not None else self.rng.getrandbits(63)
+        run_rng = random.Random(run_seed)
+        start_stats = dict(self.stats)
         
+        stages = SIMULATION_STAGES
         total_stages = len(stages)
         stage_time = hours * 3600 / total_stages  # В секундах
         
+        if pacing == PACING_FAST:
+            stage_delay = 0
+        elif pacing == PACING_PACED:
+            stage_delay = PACED_STAGE_DELAY
+        else:
+            stage_delay = stage_time / time_scale
+        
         results = {
             'subscribers': 0,
             'views': 0,
@@ -731,29 +2740,85 @@ class YouTubeAutoPromoter:
             'shares': 0
         }
         
-        for i, stage in enumerate(stages):
-            if not self.simulation_active:
-                break
+        with SimulationBatchWriter(self.db, flush_interval) as writer:
+            for i, stage in enumerate(stages):
+                if self._stop_event.is_set():
+                    break
+                    
+                if update_callback:
+                    update_callback(stage, i + 1, total_stages)
                 
-            if update_callback:
-                update_callback(stage, i + 1, total_stages)
-            
-            # Имитация работы на каждом этапе
-            time.sleep(0.5)  # Для демонстрации
-            
-            # Симулируем рост за этот этап
-            stage_hours = hours / total_stages
-            stage_growth = self.simulate_channel_growth(stage_hours)
-            
-            # Суммируем результаты
-            for key in results:
-                results[key] += stage_growth[key]
+                # Пауза этапа; stop_simulation() прерывает ожидание сразу
+                if stage_delay and self._stop_event.wait(stage_delay):
+                    break
+                
+                # Симулируем рост за этот этап
+                stage_hours = hours / total_stages
+                stage_growth = self.simulate_channel_growth(stage_hours, writer=writer, rng=run_rng, seed=run_seed,
+                                                            start_stats=start_stats)
+                
+                # Суммируем результаты
+                for key in results:
+                    results[key] += stage_growth[key]
         
         self.simulation_active = False
+        results['seed'] = run_seed
         return results
     
-    def get_ai_recommendations(self):
-        """Получение AI рекомендаций на основе статистики (для новых аккаунтов)"""
+    def refresh_stats(self):
+        """Обновление stats из общего кэша статистики (изменения других процессов)
+
+        Без изменений в БД не читает таблицы. Во время расширенной симуляции
+        и при незаписанных операциях в очереди фоновой записи stats не
+        трогаются: эти записи еще не в БД.
+        Возвращает True, если статистика изменилась.
+        """
+        # Пока фоновые записи не дошли до БД, в ней более старая статистика
+        if self.simulation_active or (self.persistence is not None and self.persistence.pending):
+            return False
+        
+        stats = self.db.get_latest_channel_stats(self.user_id)
+        if stats is None or stats == self.stats:
+            return False
+        
+        self.stats.update(stats)
+        return True
+    
+    def prepare_simulation(self):
+        """Сброс флага остановки перед запуском расширенной симуляции
+
+        Вызывается там, где прогон назначается (до старта его потока):
+        остановка после этого вызова прерывает прогон, даже если поток
+        еще не начал работу.
+        """
+        self._stop_event.clear()
+        self.simulation_active = True
+    
+    def stop_simulation(self):
+        """Остановка расширенной симуляции (можно вызывать из другого потока)"""
+        self.simulation_active = False
+        self._stop_event.set()
+    
+    def forecast_growth(self, hours, scenarios=10000, seed=None):
+        """Monte-Carlo прогноз роста от текущей статистики (без записи в БД)"""
+        forecaster = GrowthForecaster(scenarios=scenarios, seed=seed)
+        return forecaster.run(self.stats, hours)
+    
+    def get_activity_summary(self, days=ACTIVITY_SUMMARY_DAYS):
+        """Сводка активности из activity_events (буфер журнала сбрасывается перед чтением)"""
+        self.activity_log.flush()
+        return self.db.get_activity_summary(self.user_id, days)
+    
+    def get_report_snapshot(self, days=30):
+        """Снимок данных для отчетов (буфер журнала сбрасывается перед чтением)"""
+        self.activity_log.flush()
+        return self.db.get_report_snapshot(self.user_id, days)
+    
+    def get_ai_recommendations(self, activity=None):
+        """Получение AI рекомендаций на основе статистики (для новых аккаунтов)
+
+        activity - сводка get_activity_summary() для рекомендаций по регулярности.
+        """
         recommendations = []
         
         # Рекомендации для нулевых аккаунтов
@@ -770,6 +2835,10 @@ class YouTubeAutoPromoter:
         if self.stats['estimated_earnings'] < 10 and self.stats['subscribers'] > 100:
             recommendations.append("💰 Включите монетизацию: настройте AdSense для заработка")
         
+        if activity is not None and self.stats['videos_uploaded'] > 0:
+            if not activity['week'].get('CONTENT_GENERATED'):
+                recommendations.append("🎬 За неделю не было новых видео: сгенерируйте контент для следующего выпуска")
+        
         # Общие рекомендации если нет специфичных
         if not recommendations:
             recommendations = [
@@ -781,22 +2850,944 @@ class YouTubeAutoPromoter:
         
         return recommendations
 
+# ================ MONTE-CARLO ПРОГНОЗ РОСТА ================
+
+FORECAST_PERCENTILES = (5, 25, 50, 75, 95)
+
+class GrowthForecaster:
+    """Векторизованный Monte-Carlo прогноз роста канала на NumPy
+
+    Прогоняет N независимых траекторий канала на T шагов по тем же формулам,
+    что и YouTubeAutoPromoter.simulate_channel_growth, и возвращает
+    процентильные полосы подписчиков, просмотров и дохода.
+
+    Пока у части траекторий меньше ~100 подписчиков, множитель роста зависит
+    от состояния, и шаги считаются по одному (массивами по N траекторий).
+    Дальше множитель постоянен и приросты на шагах независимы и одинаково
+    распределены, поэтому шаги считаются блоками: короткий блок - точными
+    выборками (k x N), блок от clt_min_steps шагов - одной нормальной выборкой
+    на траекторию с точными средним и дисперсией суммы (ЦПТ). CPM внутри
+    блока берется по середине пути подписчиков (CPM линеен по подписчикам).
+    clt_min_steps=None отключает приближение.
+    """
+    
+    def __init__(self, scenarios=10000, step_hours=1, seed=None, percentiles=FORECAST_PERCENTILES,
+                 band_points=50, chunk_steps=256, clt_min_steps=32):
+        if scenarios < 1:
+            raise ValueError(f"Число сценариев должно быть не меньше 1: {scenarios}")
+        self.scenarios = scenarios
+        self.step_hours = step_hours
+        self.seed = seed
+        self.percentiles = tuple(percentiles)
+        self.band_points = band_points
+        self.chunk_steps = chunk_steps
+        self.clt_min_steps = clt_min_steps
+    
+    def _increment_moments(self, key):
+        """Точное распределение прироста метрики за шаг при минимальном множителе"""
+        low, high, floor = GROWTH_RANGES[key]
+        values = np.arange(low, high + 1) * self.step_hours * MIN_GROWTH_MULTIPLIER
+        values = np.maximum(floor, values.astype(np.int64))
+        return values.mean(), values.var(), values.min(), values.max()
+    
+    def run(self, stats, hours):
+        """Прогноз на hours часов от стартовой статистики stats"""
+        started = time.perf_counter()
+        rng = np.random.default_rng(self.seed)
+        n = self.scenarios
+        steps = max(1, int(round(hours / self.step_hours)))
+        band_every = max(1, steps // self.band_points)
+        
+        subscribers = np.full(n, stats['subscribers'], dtype=np.int64)
+        views = np.full(n, stats['total_views'], dtype=np.int64)
+        likes = np.full(n, stats['total_likes'], dtype=np.int64)
+        comments = np.full(n, stats['total_comments'], dtype=np.int64)
+        earnings = np.full(n, float(stats['estimated_earnings']))
+        
+        # Подписчиков, начиная с которых множитель роста равен минимальному
+        saturation = int(10 / MIN_GROWTH_MULTIPLIER) - 1
+        
+        checkpoints = []
+        bands = {'subscribers': [], 'total_views': [], 'estimated_earnings': []}
+        
+        def record(step):
+            checkpoints.append(step * self.step_hours)
+            for key, values in (('subscribers', subscribers), ('total_views', views),
+                                ('estimated_earnings', earnings)):
+                bands[key].append(np.percentile(values, self.percentiles))
+        
+        def draw(key, multiplier, shape):
+            low, high, floor = GROWTH_RANGES[key]
+            values = rng.integers(low, high + 1, size=shape) * self.step_hours * multiplier
+            return np.maximum(floor, values.astype(np.int64))
+        
+        moments = {key: self._increment_moments(key) for key in ('views', 'subscribers', 'likes', 'comments')}
+        
+        def block_total(key, block):
+            mean, variance, smallest, largest = moments[key]
+            if variance == 0:
+                return np.full(n, int(round(mean * block)), dtype=np.int64)
+            totals = rng.normal(mean * block, np.sqrt(variance * block), n)
+            return np.clip(np.rint(totals), smallest * block, largest * block).astype(np.int64)
+        
+        step = 0
+        
+        # Фаза 1: множитель зависит от числа подписчиков - по одному шагу
+        while step < steps and subscribers.min() < saturation:
+            multiplier = np.maximum(MIN_GROWTH_MULTIPLIER, 10 / (subscribers + 1))
+            new_views = draw('views', multiplier, n)
+            subscribers += draw('subscribers', multiplier, n)
+            likes += draw('likes', multiplier, n)
+            comments += draw('comments', multiplier, n)
+            views += new_views
+            
+            cpm = BASE_CPM + np.minimum(MAX_CPM_BONUS, subscribers / CPM_BONUS_SUBSCRIBERS)
+            earnings += new_views / 1000 * cpm
+            
+            step += 1
+            if step % band_every == 0 or step == steps:
+                record(step)
+        
+        # Фаза 2: множитель постоянен - блоками шагов
+        while step < steps:
+            next_checkpoint = (step // band_every + 1) * band_every
+            block = min(self.chunk_steps, steps - step, next_checkpoint - step)
+            
+            if self.clt_min_steps is None or block < self.clt_min_steps:
+                shape = (block, n)
+                new_views = draw('views', MIN_GROWTH_MULTIPLIER, shape)
+                subscribers_path = subscribers + np.cumsum(draw('subscribers', MIN_GROWTH_MULTIPLIER, shape), axis=0)
+                cpm = BASE_CPM + np.minimum(MAX_CPM_BONUS, subscribers_path / CPM_BONUS_SUBSCRIBERS)
+                
+                earnings += (new_views / 1000 * cpm).sum(axis=0)
+                subscribers = subscribers_path[-1]
+                views += new_views.sum(axis=0)
+                likes += draw('likes', MIN_GROWTH_MULTIPLIER, shape).sum(axis=0)
+                comments += draw('comments', MIN_GROWTH_MULTIPLIER, shape).sum(axis=0)
+            else:
+                new_views = block_total('views', block)
+                new_subscribers = block_total('subscribers', block)
+                middle = subscribers + new_subscribers / 2
+                cpm = BASE_CPM + np.minimum(MAX_CPM_BONUS, middle / CPM_BONUS_SUBSCRIBERS)
+                
+                earnings += new_views / 1000 * cpm
+                subscribers = subscribers + new_subscribers
+                views += new_views
+                likes += block_total('likes', block)
+                comments += block_total('comments', block)
+            
+            step += block
+            if step % band_every == 0 or step == steps:
+                record(step)
+        
+        engagement = np.where(
+            views > 0,
+            (likes + comments) / np.maximum(views, 1) * 100,
+            float(stats['engagement_rate'])
+        )
+        watch_time = stats['watch_time_hours'] + (views - stats['total_views']) * WATCH_HOURS_PER_VIEW
+        
+        def percentile_map(values):
+            return dict(zip(self.percentiles, np.percentile(values, self.percentiles).tolist()))
+        
+        return {
+            'scenarios': n,
+            'hours': steps * self.step_hours,
+            'checkpoints_hours': checkpoints,
+            'percentiles': self.percentiles,
+            'bands': {
+                key: {p: [float(row[i]) for row in rows] for i, p in enumerate(self.percentiles)}
+                for key, rows in bands.items()
+            },
+            'final': {
+                'subscribers': percentile_map(subscribers),
+                'total_views': percentile_map(views),
+                'total_likes': percentile_map(likes),
+                'total_comments': percentile_map(comments),
+                'estimated_earnings': percentile_map(earnings),
+                'engagement_rate': percentile_map(engagement),
+                'watch_time_hours': percentile_map(watch_time)
+            },
+            'elapsed_sec': time.perf_counter() - started
+        }
+
+# ================ ПАКЕТНАЯ СИМУЛЯЦИЯ КАНАЛОВ ================
+
+BATCH_STEP_HOURS = 1          # Шаг модели роста в пакетном прогоне
+BATCH_TASKS_PER_WORKER = 4    # Число чанков на процесс: баланс нагрузки против накладных расходов
+
+def _simulate_channel_task(task):
+    """Рабочая функция процесса: рост одного канала, без доступа к БД
+
+    Модульная функция (не метод), чтобы ее можно было передать в процесс.
+    """
+    user_id, stats, hours, seed, steps = task
+    final_stats, growth = replay_simulation(stats, hours, seed, steps)
+    
+    total_growth = {key: sum(step[key] for step in growth) for key in GROWTH_RANGES}
+    return user_id, seed, stats, final_stats, total_growth
+
+class BatchSimulationRunner:
+    """Пакетная симуляция роста многих каналов без GUI
+
+    Расчет роста распределяется по процессам ProcessPoolExecutor, а все
+    записи в БД делает родительский процесс (единственный писатель) через
+    SimulationBatchWriter. Каждый канал получает свой seed; строка истории
+    хранит seed, статистику начала и число шагов, так что прогон канала
+    воспроизводится replay_stored_simulation(db, user_id, seed).
+    """
+    
+    def __init__(self, db, workers=None, step_hours=BATCH_STEP_HOURS, seed=None,
+                 flush_interval=SIMULATION_FLUSH_INTERVAL):
+        self.db = db
+        self.workers = workers or os.cpu_count() or 1
+        self.step_hours = step_hours
+        self.rng = random.Random(seed if seed is not None else new_seed())
+        self.flush_interval = flush_interval
+    
+    def _build_tasks(self, user_ids, hours):
+        """Задания для процессов: текущая статистика и seed каждого канала"""
+        steps = max(1, round(hours / self.step_hours))
+        tasks = []
+        for user_id in user_ids:
+            stats = self.db.get_latest_channel_stats(user_id) or empty_channel_stats()
+            tasks.append((user_id, stats, hours, self.rng.getrandbits(63), steps))
+        return tasks, steps
+    
+    def run(self, user_ids, hours):
+        """Прогон hours часов для всех user_ids, возвращает сводку и пропускную способность"""
+        started = time.perf_counter()
+        tasks, steps = self._build_tasks(user_ids, hours)
+        seeds = {}
+        
+        with SimulationBatchWriter(self.db, self.flush_interval) as writer:
+            if self.workers == 1:
+                # Без пула: нет затрат на запуск процессов и передачу данных
+                results = map(_simulate_channel_task, tasks)
+                executor = None
+            else:
+                executor = ProcessPoolExecutor(max_workers=self.workers)
+                chunksize = max(1, len(tasks) // (self.workers * BATCH_TASKS_PER_WORKER))
+                results = executor.map(_simulate_channel_task, tasks, chunksize=chunksize)
+            
+            try:
+                for user_id, seed, start_stats, final_stats, total_growth in results:
+                    writer.add_channel_stats(user_id, final_stats)
+                    writer.add_simulation(user_id, hours, total_growth, seed, start_stats, steps)
+                    seeds[user_id] = seed
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+        
+        elapsed = time.perf_counter() - started
+        return {
+            'channels': len(tasks),
+            'hours': hours,
+            'steps': steps,
+            'workers': self.workers,
+            'elapsed_sec': round(elapsed, 3),
+            'channels_per_sec': round(len(tasks) / elapsed, 1) if elapsed > 0 else float('inf'),
+            'flushes': writer.flush_count,
+            'seeds': seeds
+        }
+
+# ================ ЭКСПОРТ ДАННЫХ ================
+
+EXPORT_TABLES = ('channel_stats', 'simulation_history', 'video_content', 'tasks')
+EXPORT_FORMATS = ('csv', 'parquet')
+EXPORT_CHUNK_ROWS = 5000       # Строк в одном fetchmany / пакете записи
+EXPORT_DIR = "youtube_exports"
+
+# Объявленный тип колонки SQLite -> тип Arrow (остальные - строки;
+# BOOLEAN хранится в SQLite как 0/1)
+ARROW_COLUMN_TYPES = {'INTEGER': 'int64', 'REAL': 'float64', 'BOOLEAN': 'int64'}
+
+# Полная история статистики: ключевые кадры и их дельты в порядке записи
+# (кадры, созданные compact_channel_stats, сортируются по своему времени)
+STATS_HISTORY_SQL = '''
+SELECT timestamp AS keyframe_time, id AS keyframe_id, 0 AS kind, id, timestamp,
+       total_views, subscribers, total_likes, total_comments, videos_uploaded,
+       estimated_earnings, engagement_rate, watch_time_hours, NULL AS changes
+FROM channel_stats WHERE user_id = ?
+UNION ALL
+SELECT k.timestamp, d.keyframe_id, 1, d.id, d.timestamp,
+       NULL, NULL, NULL, NULL, NULL, NULL, NULL, NULL, d.changes
+FROM channel_stats_deltas d JOIN channel_stats k ON k.id = d.keyframe_id
+WHERE d.user_id = ?
+ORDER BY 1, 2, 3, 4
+'''
+
+def parquet_available():
+    """Установлен ли pyarrow (нужен только для экспорта в Parquet)"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+class DataExporter:
+    """Потоковый экспорт данных пользователя из SQLite в CSV или Parquet
+
+    Таблицы читаются курсором порциями по chunk_rows (fetchmany) и сразу
+    пишутся в файл, поэтому память не зависит от размера таблиц.
+    channel_stats выгружается как полная история снимков (ключевые кадры
+    плюс восстановленные по дельтам состояния), остальные таблицы - как есть.
+    Работает в любом потоке: соединение берется из пула Database.
+    """
+    
+    def __init__(self, db, chunk_rows=EXPORT_CHUNK_ROWS):
+        self.db = db
+        self.chunk_rows = chunk_rows
+    
+    def export(self, user_id, output_dir, fmt='csv', tables=EXPORT_TABLES):
+        """Экспорт таблиц в output_dir (по файлу на таблицу); возвращает сводку"""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Неизвестный формат экспорта: {fmt}")
+        if fmt == 'parquet' and not parquet_available():
+            raise ValueError("Для экспорта в Parquet нужен пакет pyarrow")
+        
+        os.makedirs(output_dir, exist_ok=True)
+        conn = self.db.get_connection()
+        started = time.perf_counter()
+        files = {}
+        rows = {}
+        
+        for table in tables:
+            path = os.path.join(output_dir, f"{table}.{fmt}")
+            columns, chunks = self.iter_chunks(conn, user_id, table)
+            if fmt == 'csv':
+                rows[table] = self._write_csv(path, columns, chunks)
+            else:
+                rows[table] = self._write_parquet(path, self._arrow_schema(conn, table, columns), chunks)
+            files[table] = path
+        
+        return {
+            'format': fmt,
+            'directory': output_dir,
+            'files': files,
+            'rows': rows,
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+    
+    def iter_chunks(self, conn, user_id, table):
+        """Имена колонок и генератор порций строк таблицы пользователя"""
+        if table == 'channel_stats':
+            return ['timestamp', *CHANNEL_STATS_FIELDS], self._stats_history_chunks(conn, user_id)
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Таблица не экспортируется: {table}")
+        
+        cursor = conn.execute(f'SELECT * FROM {table} WHERE user_id = ? ORDER BY id', (user_id,))
+        return [column[0] for column in cursor.description], self._fetch_chunks(cursor)
+    
+    def _fetch_chunks(self, cursor):
+        while True:
+            rows = cursor.fetchmany(self.chunk_rows)
+            if not rows:
+                return
+            yield rows
+    
+    def _stats_history_chunks(self, conn, user_id):
+        """Снимки статистики: кадр задает состояние, каждая дельта его изменяет"""
+        cursor = conn.execute(STATS_HISTORY_SQL, (user_id, user_id))
+        stats = {}
+        for batch in self._fetch_chunks(cursor):
+            rows = []
+            for _, _, kind, _, timestamp, *values, changes in batch:
+                if kind == 0:
+                    stats = dict(zip(CHANNEL_STATS_FIELDS, values))
+                else:
+                    stats.update(json.loads(changes))
+                rows.append((timestamp, *(stats[field] for field in CHANNEL_STATS_FIELDS)))
+            yield rows
+    
+    def _write_csv(self, path, columns, chunks):
+        count = 0
+        # utf-8-sig: Excel правильно открывает кириллицу
+        with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for rows in chunks:
+                writer.writerows(rows)
+                count += len(rows)
+        return count
+    
+    def _arrow_schema(self, conn, table, columns):
+        """Схема Arrow по объявленным типам колонок (для channel_stats - по таблице кадров)"""
+        declared = {row[1]: row[2].upper() for row in conn.execute(f'PRAGMA table_info({table})')}
+        return pa.schema([
+            (column, getattr(pa, ARROW_COLUMN_TYPES.get(declared.get(column), 'string'))())
+            for column in columns
+        ])
+    
+    def _write_parquet(self, path, schema, chunks):
+        count = 0
+        with pq.ParquetWriter(path, schema) as writer:
+            for rows in chunks:
+                arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                count += len(rows)
+        return count
+
+# ================ ОТЧЕТЫ ================
+
+REPORTS_DIR = "youtube_reports"
+REPORT_PERIOD_DAYS = 30
+REPORT_PAGE_SIZE = (8.27, 11.69)   # A4, дюймы
+REPORT_TABLE_ROWS = 40             # Строк таблицы на странице PDF
+REPORT_MP_CONTEXT = 'spawn'        # Процессы отчетов не наследуют состояние Tk и потоков GUI
+
+# Типы отчетов: значок и название для GUI, описание, форматы файлов
+REPORT_TYPES = {
+    'weekly': ("📈", "Еженедельный отчет", "Полная статистика за неделю", ('pdf', 'excel')),
+    'earnings': ("💰", "Отчет по доходам", "Детализация доходов и монетизация", ('excel',)),
+    'content': ("🎬", "Отчет по контенту", "Анализ опубликованного контента", ('pdf',)),
+    'audience': ("📊", "Анализ аудитории", "Вовлеченность и активность зрителей по часам", ('pdf', 'excel')),
+    'growth': ("🚀", "Отчет по росту", "Динамика роста канала", ('pdf', 'excel')),
+    'quick': ("⚡", "Быстрый отчет", "Краткий обзор ключевых метрик", ('pdf',))
+}
+
+def excel_available():
+    """Есть ли pandas и openpyxl для отчетов Excel (иначе пишется CSV)"""
+    return all(importlib.util.find_spec(name) is not None for name in ('pandas', 'openpyxl'))
+
+def _report_content(report_type, snapshot):
+    """Содержимое отчета из снимка: сводка, таблицы и графики
+
+    Таблицы - (заголовок, колонки, строки), графики - (заголовок, 'line'
+    или 'bar', подписи, значения).
+    """
+    stats = snapshot['stats']
+    simulations = snapshot['simulations']
+    daily = snapshot['daily']
+    activity = snapshot['activity']
+    
+    # Доход на 1000 просмотров по накопленной статистике
+    rpm = stats['estimated_earnings'] / stats['total_views'] * 1000 if stats['total_views'] else 0.0
+    key_metrics = [
+        ("Подписчики", f"{stats['subscribers']:,}"),
+        ("Просмотры", f"{stats['total_views']:,}"),
+        ("Лайки", f"{stats['total_likes']:,}"),
+        ("Комментарии", f"{stats['total_comments']:,}"),
+        ("Видео", f"{stats['videos_uploaded']}"),
+        ("Вовлеченность", f"{stats['engagement_rate']:.2f}%"),
+        ("Часы просмотра", f"{stats['watch_time_hours']:.0f}"),
+        ("Доход", f"${stats['estimated_earnings']:.2f}")
+    ]
+    daily_columns = ["День", "Новые подписчики", "Новые просмотры", "Подписчики (накоп.)", "Просмотры (накоп.)", "Симуляций"]
+    days = [row[0] for row in daily]
+    summary, tables, charts = [], [], []
+    
+    if report_type == 'weekly':
+        week = daily[-7:]
+        summary = key_metrics + [
+            ("Новые подписчики за неделю", f"{sum(row[1] for row in week):,}"),
+            ("Новые просмотры за неделю", f"{sum(row[2] for row in week):,}"),
+            ("Симуляций за неделю", f"{sum(row[5] for row in week)}"),
+            ("Генераций контента за неделю", f"{activity['week'].get('CONTENT_GENERATED', 0)}")
+        ]
+        tables = [("Неделя по дням", daily_columns, week)]
+        charts = [("Новые подписчики по дням", 'bar', [row[0] for row in week], [row[1] for row in week])]
+    elif report_type == 'earnings':
+        summary = [
+            ("Доход всего", f"${stats['estimated_earnings']:.2f}"),
+            ("Доход на 1000 просмотров", f"${rpm:.2f}"),
+            (f"Оценка за {snapshot['period_days']} дней", f"${simulations['views'] * rpm / 1000:.2f}")
+        ]
+        tables = [("Оценка дохода по дням", ["День", "Новые просмотры", "Доход, $"],
+                   [(row[0], row[2], round(row[2] * rpm / 1000, 2)) for row in daily])]
+    elif report_type == 'content':
+        summary = [
+            ("Видео всего", f"{stats['videos_uploaded']}"),
+            ("Категорий", f"{len(snapshot['content'])}"),
+            (f"Генераций за {snapshot['period_days']} дней", f"{activity['totals'].get('CONTENT_GENERATED', 0)}"),
+            ("Активных дней", f"{activity['active_days']}")
+        ]
+        tables = [
+            ("Контент по категориям", ["Категория", "Видео", "Первое", "Последнее"], snapshot['content']),
+            ("Последние видео", ["Создано", "Категория", "Заголовок"], snapshot['recent_titles']),
+            ("Активность по дням (UTC)", ["День", "Генераций контента", "Симуляций"], activity['daily'])
+        ]
+        charts = [("Видео по категориям", 'bar', [row[0] or "без категории" for row in snapshot['content']],
+                   [row[1] for row in snapshot['content']])]
+    elif report_type == 'audience':
+        views = simulations['views']
+        summary = [
+            ("Лайков на 100 просмотров", f"{simulations['likes'] / views * 100:.2f}" if views else "нет данных"),
+            ("Комментариев на 100 просмотров", f"{simulations['comments'] / views * 100:.2f}" if views else "нет данных"),
+            ("Подписок на 1000 просмотров", f"{simulations['subscribers'] / views * 1000:.2f}" if views else "нет данных"),
+            ("Вовлеченность канала", f"{stats['engagement_rate']:.2f}%")
+        ]
+        tables = [("Активность по часам (UTC)", ["Час", "Симуляций", "Просмотры", "Лайки", "Комментарии"],
+                   snapshot['hours_of_day'])]
+        charts = [("Просмотры по часам (UTC)", 'bar', [f"{row[0]:02d}" for row in snapshot['hours_of_day']],
+                   [row[2] for row in snapshot['hours_of_day']])]
+    elif report_type == 'growth':
+        summary = [
+            (f"Симуляций за {snapshot['period_days']} дней", f"{simulations['runs']}"),
+            ("Часов симуляции", f"{simulations['hours']}"),
+            ("Новые подписчики", f"{simulations['subscribers']:,}"),
+            ("Новые просмотры", f"{simulations['views']:,}")
+        ]
+        tables = [("Рост по дням", daily_columns, daily)]
+        charts = [
+            ("Подписчики (накопительно)", 'line', days, [row[3] for row in daily]),
+            ("Просмотры (накопительно)", 'line', days, [row[4] for row in daily])
+        ]
+    elif report_type == 'quick':
+        summary = key_metrics + [
+            ("Задач выполнено", f"{sum(row[2] for row in snapshot['tasks'])} из {sum(row[1] for row in snapshot['tasks'])}")
+        ]
+    else:
+        raise ValueError(f"Неизвестный тип отчета: {report_type}")
+    
+    return {'title': REPORT_TYPES[report_type][1], 'summary': summary, 'tables': tables, 'charts': charts}
+
+def _pdf_text(value):
+    """Текст ячейки PDF без эмодзи вне BMP (в шрифтах matplotlib их нет)"""
+    return ''.join(char for char in str(value) if ord(char) <= 0xFFFF)
+
+def _write_report_pdf(path, content, snapshot):
+    """PDF через matplotlib (Figure + PdfPages, без pyplot): сводка, таблицы, графики"""
+    with PdfPages(path) as pdf:
+        figure = Figure(figsize=REPORT_PAGE_SIZE)
+        figure.text(0.08, 0.94, content['title'], fontsize=20, weight='bold')
+        figure.text(0.08, 0.91, f"Сформирован {snapshot['generated_at']} UTC, период {snapshot['period_days']} дней",
+                    fontsize=10, color='gray')
+        for i, (label, value) in enumerate(content['summary']):
+            figure.text(0.08, 0.86 - i * 0.03, label, fontsize=12)
+            figure.text(0.60, 0.86 - i * 0.03, value, fontsize=12, weight='bold')
+        pdf.savefig(figure)
+        
+        for title, columns, rows in content['tables']:
+            for start in range(0, max(len(rows), 1), REPORT_TABLE_ROWS):
+                figure = Figure(figsize=REPORT_PAGE_SIZE)
+                ax = figure.add_subplot()
+                ax.axis('off')
+                ax.set_title(title, fontsize=14)
+                page = rows[start:start + REPORT_TABLE_ROWS]
+                if page:
+                    table = ax.table(cellText=[[_pdf_text(value) for value in row] for row in page],
+                                     colLabels=columns, loc='upper center')
+                    table.auto_set_font_size(False)
+                    table.set_fontsize(8)
+                else:
+                    ax.text(0.5, 0.5, "Нет данных за период", ha='center', va='center', fontsize=12)
+                pdf.savefig(figure)
+        
+        for title, kind, labels, values in content['charts']:
+            figure = Figure(figsize=REPORT_PAGE_SIZE)
+            ax = figure.add_subplot(2, 1, 1)
+            ax.set_title(title, fontsize=14)
+            positions = range(len(values))
+            if kind == 'line':
+                ax.plot(positions, values, marker='o', color='#FF0000')
+            else:
+                ax.bar(positions, values, color='#2196F3')
+            ax.set_xticks(positions)
+            ax.set_xticklabels([_pdf_text(label) for label in labels], rotation=45, ha='right', fontsize=8)
+            pdf.savefig(figure)
+
+def _write_report_excel(path, content):
+    """Excel через pandas: лист сводки и по листу на таблицу"""
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame(content['summary'], columns=["Показатель", "Значение"]).to_excel(writer, sheet_name="Сводка", index=False)
+        for title, columns, rows in content['tables']:
+            pd.DataFrame(rows, columns=columns).to_excel(writer, sheet_name=title[:31], index=False)
+
+def _write_report_csv(path, content):
+    """Замена Excel без pandas: сводка и таблицы подряд в одном CSV"""
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow([content['title']])
+        writer.writerows(content['summary'])
+        for title, columns, rows in content['tables']:
+            writer.writerow([])
+            writer.writerow([title])
+            writer.writerow(columns)
+            writer.writerows(rows)
+
+def render_report(task):
+    """Рабочая функция процесса: файлы одного отчета из общего снимка
+
+    task = (тип отчета, снимок get_report_snapshot, папка); возвращает
+    (тип, список файлов, секунды). БД не открывается.
+    """
+    report_type, snapshot, output_dir = task
+    started = time.perf_counter()
+    content = _report_content(report_type, snapshot)
+    stamp = snapshot['generated_at'].replace('-', '').replace(':', '').replace(' ', '_')
+    base = os.path.join(output_dir, f"{report_type}_{stamp}")
+    files = []
+    
+    for fmt in REPORT_TYPES[report_type][3]:
+        if fmt == 'pdf':
+            _write_report_pdf(base + '.pdf', content, snapshot)
+            files.append(base + '.pdf')
+        elif excel_available():
+            _write_report_excel(base + '.xlsx', content)
+            files.append(base + '.xlsx')
+        else:
+            _write_report_csv(base + '.csv', content)
+            files.append(base + '.csv')
+    
+    return report_type, files, round(time.perf_counter() - started, 3)
+
+class ReportEngine:
+    """Генерация отчетов REPORT_TYPES в файлы
+
+    Данные читаются один раз (Database.get_report_snapshot - агрегирующие
+    запросы), затем отчеты рендерятся параллельно в процессах
+    ProcessPoolExecutor из общего снимка; БД процессы не трогают.
+    Журнал активности процесса сбрасывается перед снимком, чтобы
+    свежие события успели попасть в activity_events.
+    """
+    
+    def __init__(self, db, output_dir=REPORTS_DIR, workers=None, period_days=REPORT_PERIOD_DAYS):
+        self.db = db
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.period_days = period_days
+    
+    def generate(self, user_id, report_types=None):
+        """Отчеты report_types (по умолчанию все); сводка с временем каждого отчета"""
+        started = time.perf_counter()
+        flush_activity_log()
+        snapshot = self.db.get_report_snapshot(user_id, self.period_days)
+        snapshot_seconds = time.perf_counter() - started
+        
+        summary = self.render(snapshot, report_types)
+        summary['snapshot_sec'] = round(snapshot_seconds, 3)
+        summary['total_sec'] = round(time.perf_counter() - started, 3)
+        return summary
+    
+    def render(self, snapshot, report_types=None):
+        """Рендер отчетов из готового снимка (без обращения к БД)"""
+        report_types = list(report_types or REPORT_TYPES)
+        for report_type in report_types:
+            if report_type not in REPORT_TYPES:
+                raise ValueError(f"Неизвестный тип отчета: {report_type}")
+        
+        started = time.perf_counter()
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        tasks = [(report_type, snapshot, self.output_dir) for report_type in report_types]
+        workers = min(self.workers, len(tasks))
+        if workers == 1:
+            # Один отчет или один процесс: без затрат на запуск пула
+            results = list(map(render_report, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context(REPORT_MP_CONTEXT)) as executor:
+                results = list(executor.map(render_report, tasks))
+        
+        return {
+            'directory': self.output_dir,
+            'workers': workers,
+            'render_sec': round(time.perf_counter() - started, 3),
+            'reports': {report_type: {'files': files, 'seconds': seconds} for report_type, files, seconds in results}
+        }
+
+# ================ ГРАФИКИ АНАЛИТИКИ ================
+
+CHART_FACECOLOR = '#202020'
+CHART_FIGSIZE = (8, 4)
+CHART_SUBSCRIBER_POINTS = 10
+ENGAGEMENT_SLICES = (('Лайки', '#FF5722'), ('Комментарии', '#4CAF50'), ('Другие действия', '#2196F3'))
+ENGAGEMENT_MIN_PERCENT = 0.1    # Доли меньше этой не показываются на диаграмме
+
+class AnalyticsChartManager:
+    """Графики раздела аналитики с переиспользованием Figure/Axes
+
+    Фигуры создаются один раз через matplotlib.figure.Figure (без pyplot и его
+    глобального реестра фигур). При каждом посещении вкладки линия обновляется
+    через set_data, круговая диаграмма перерисовывается только при изменении
+    данных, а Tk-холст создается заново и освобождается в release().
+    """
+    
+    def __init__(self):
+        self._figures = {}
+        self._canvases = {}
+        self._subscriber_line = None
+        self._engagement_key = None
+    
+    def _figure(self, name):
+        """Фигура и оси графика name (создаются при первом обращении)"""
+        if name not in self._figures:
+            figure = Figure(figsize=CHART_FIGSIZE, facecolor=CHART_FACECOLOR)
+            ax = figure.add_subplot()
+            message = ax.text(0.5, 0.5, '', ha='center', va='center', transform=ax.transAxes,
+                              fontsize=12, color='white', visible=False)
+            self._figures[name] = (figure, ax, message)
+        return self._figures[name]
+    
+    def update_subscriber_chart(self, dates, subscribers):
+        """Линия роста подписчиков (последние CHART_SUBSCRIBER_POINTS точек)"""
+        figure, ax, message = self._figure('subscribers')
+        
+        if self._subscriber_line is None:
+            ax.set_facecolor(CHART_FACECOLOR)
+            ax.tick_params(colors='white')
+            ax.spines['bottom'].set_color('white')
+            ax.spines['left'].set_color('white')
+            self._subscriber_line, = ax.plot([], [], marker='o', color='#FF0000', linewidth=2)
+        
+        dates = list(dates)[-CHART_SUBSCRIBER_POINTS:]
+        subscribers = list(subscribers)[-CHART_SUBSCRIBER_POINTS:]
+        # Числовые позиции по X: строковые категории копились бы в осях между обновлениями
+        positions = range(len(subscribers))
+        self._subscriber_line.set_data(positions, subscribers)
+        ax.set_xticks(positions)
+        ax.set_xticklabels(dates)
+        
+        if subscribers:
+            message.set_visible(False)
+            ax.relim()
+            ax.autoscale_view()
+            ax.set_title(f'Рост подписчиков (последние {CHART_SUBSCRIBER_POINTS} дней)', fontsize=14, color='white')
+        else:
+            message.set_text('Запустите симуляцию\nдля появления данных')
+            message.set_visible(True)
+            ax.set_title('Ожидание данных...', fontsize=14, color='white')
+    
+    def update_engagement_chart(self, stats):
+        """Круговая диаграмма вовлеченности; перерисовывается только при изменении долей"""
+        figure, ax, message = self._figure('engagement')
+        
+        slices = []
+        if stats['total_views'] > 0:
+            likes_percent = (stats['total_likes'] / stats['total_views']) * 100
+            comments_percent = (stats['total_comments'] / stats['total_views']) * 100
+            sizes = (likes_percent, comments_percent, 100 - likes_percent - comments_percent)
+            slices = [
+                (label, color, round(size, 1))
+                for (label, color), size in zip(ENGAGEMENT_SLICES, sizes)
+                if size > ENGAGEMENT_MIN_PERCENT  # Показываем только значимые значения
+            ]
+            key = tuple(slices)
+        else:
+            key = 'empty'
+        
+        if key == self._engagement_key:
+            return
+        self._engagement_key = key
+        
+        for artist in list(ax.patches) + list(ax.texts):
+            if artist is not message:
+                artist.remove()
+        
+        if slices:
+            message.set_visible(False)
+            ax.pie([size for _, _, size in slices], labels=[label for label, _, _ in slices],
+                   colors=[color for _, color, _ in slices], autopct='%1.1f%%', startangle=90)
+            ax.set_title('Распределение вовлеченности', fontsize=14, color='white')
+        elif stats['total_views'] > 0:
+            message.set_text('Недостаточно данных\nдля анализа вовлеченности')
+            message.set_visible(True)
+            ax.set_title('Ожидание данных...', fontsize=14, color='white')
+        else:
+            message.set_text('Создайте контент\nи привлеките аудиторию')
+            message.set_visible(True)
+            ax.set_title('Канал начинается с нуля', fontsize=14, color='white')
+    
+    def attach(self, name, master):
+        """Холст Tk для графика name внутри master; возвращает виджет холста"""
+        self.release(name)
+        figure, _, _ = self._figure(name)
+        canvas = FigureCanvasTkAgg(figure, master)
+        canvas.draw()
+        self._canvases[name] = canvas
+        return canvas.get_tk_widget()
+    
+    def redraw(self):
+        """Отложенная перерисовка прикрепленных холстов после update_*"""
+        for canvas in self._canvases.values():
+            canvas.draw_idle()
+    
+    def release(self, name=None):
+        """Освобождение Tk-холстов (фигуры и оси остаются для следующего посещения)"""
+        names = [name] if name is not None else list(self._canvases)
+        for chart_name in names:
+            canvas = self._canvases.pop(chart_name, None)
+            if canvas is not None:
+                canvas.get_tk_widget().destroy()
+    
+    def close(self):
+        """Полное освобождение холстов и фигур"""
+        self.release()
+        for figure, _, _ in self._figures.values():
+            figure.clear()
+        self._figures.clear()
+        self._subscriber_line = None
+        self._engagement_key = None
+
+# ================ ПОСТРАНИЧНЫЕ СПИСКИ ================
+
+PAGE_SIZE = 100            # Строк в одной подгружаемой странице
+PAGE_WINDOW_ROWS = 500     # Максимум строк в Treeview одновременно
+PAGE_PREFETCH_ROWS = 30    # Подгрузка начинается, когда до края окна осталось столько строк
+
+class PagedTreeview:
+    """Treeview со скользящим окном строк для длинных списков Database.PAGED_LISTS
+
+    Строки подгружаются страницами по ключу (значение сортировки, id) при
+    приближении прокрутки к краю окна; окно не больше max_rows строк, строки
+    с противоположного края удаляются. Заголовки колонок с ключом сортировки
+    переключают сортировку (каждая идет по индексу).
+    columns: список (заголовок, ключ сортировки или None, ширина);
+    format_row(row) -> значения колонок для строки get_page().
+    """
+    
+    def __init__(self, master, db, list_name, user_id, columns, format_row, height=10,
+                 page_size=PAGE_SIZE, max_rows=PAGE_WINDOW_ROWS, prefetch_rows=PAGE_PREFETCH_ROWS):
+        self.db = db
+        self.list_name = list_name
+        self.user_id = user_id
+        self.format_row = format_row
+        self.page_size = page_size
+        self.max_rows = max_rows
+        self.prefetch_rows = prefetch_rows
+        
+        self.sort_key = db.PAGED_LISTS[list_name]['default_sort']
+        self.descending = True
+        self._cursors = []          # (значение сортировки, id) строк окна по порядку
+        self._more_before = False
+        self._more_after = False
+        self._loading = False
+        
+        self.frame = tk.Frame(master)
+        headings = [heading for heading, _, _ in columns]
+        self.tree = ttk.Treeview(self.frame, columns=headings, show="headings", height=height)
+        for heading, sort_key, width in columns:
+            if sort_key:
+                self.tree.heading(heading, text=heading, command=lambda key=sort_key: self.sort_by(key))
+            else:
+                self.tree.heading(heading, text=heading)
+            self.tree.column(heading, width=width)
+        
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_scroll)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        self.reload()
+    
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+    
+    def sort_by(self, sort_key):
+        """Сортировка по колонке; повторный выбор меняет направление"""
+        if sort_key == self.sort_key:
+            self.descending = not self.descending
+        else:
+            self.sort_key = sort_key
+            self.descending = True
+        self.reload()
+    
+    def reload(self):
+        """Окно с начала списка"""
+        self.tree.delete(*self.tree.get_children())
+        self._cursors = []
+        self._more_before = False
+        rows = self._fetch(None, forward=True)
+        self._append(rows)
+        self._more_after = len(rows) == self.page_size
+    
+    def _fetch(self, cursor, forward):
+        return self.db.get_page(self.list_name, self.user_id, self.sort_key, self.descending,
+                                cursor=cursor, forward=forward, limit=self.page_size)
+    
+    def _append(self, rows):
+        for row in rows:
+            self.tree.insert("", "end", iid=str(row[0]), values=self.format_row(row))
+            self._cursors.append((row[1], row[0]))
+    
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self._loading or not self._cursors:
+            return
+        
+        # Доля окна, при которой пора подгружать следующую страницу
+        threshold = self.prefetch_rows / len(self._cursors)
+        if self._more_after and float(last) >= 1 - threshold:
+            self._loading = True
+            self.tree.after_idle(self._load_after)
+        elif self._more_before and float(first) <= threshold:
+            self._loading = True
+            self.tree.after_idle(self._load_before)
+    
+    def _top_visible(self):
+        """Первая видимая строка (по положению прокрутки)"""
+        items = self.tree.get_children()
+        if not items:
+            return None
+        return items[min(len(items) - 1, int(self.tree.yview()[0] * len(items)))]
+    
+    def _restore_view(self, item):
+        """Прокрутка к строке, которая была первой видимой до изменения окна"""
+        if item and self.tree.exists(item):
+            self.tree.yview_moveto(self.tree.index(item) / max(1, len(self._cursors)))
+    
+    def _load_after(self):
+        try:
+            rows = self._fetch(self._cursors[-1], forward=True)
+            self._more_after = len(rows) == self.page_size
+            top = self._top_visible()
+            self._append(rows)
+            
+            excess = len(self._cursors) - self.max_rows
+            if excess > 0:
+                self.tree.delete(*(str(row_id) for _, row_id in self._cursors[:excess]))
+                del self._cursors[:excess]
+                self._more_before = True
+            self._restore_view(top)
+        finally:
+            self._loading = False
+    
+    def _load_before(self):
+        try:
+            rows = self._fetch(self._cursors[0], forward=False)
+            self._more_before = len(rows) == self.page_size
+            top = self._top_visible()
+            for index, row in enumerate(rows):
+                self.tree.insert("", index, iid=str(row[0]), values=self.format_row(row))
+            self._cursors[:0] = [(row[1], row[0]) for row in rows]
+            
+            excess = len(self._cursors) - self.max_rows
+            if excess > 0:
+                self.tree.delete(*(str(row_id) for _, row_id in self._cursors[-excess:]))
+                del self._cursors[-excess:]
+                self._more_after = True
+            self._restore_view(top)
+        finally:
+            self._loading = False
+
 # ================ PREMIUM ГРАФИЧЕСКИЙ ИНТЕРФЕЙС ================
 
 class PremiumYouTubePromoGUI:
     """Premium графический интерфейс для YouTube AutoPromoter"""
     
-    def __init__(self):
+    def __init__(self, db_name="youtube_promo.db"):
         self.root = tk.Tk()
         self.root.title("YouTube Аналитик 5.0 - Нулевой старт")
         
         # База данных
-        self.db = Database()
+        self.db = Database(db_name)
         
-        # Система авторизации
-        self.auth = AuthSystem()
+        # Фоновая запись: поток Tk не ждет SQLite, колбэки возвращаются через after
+        self.persistence = PersistenceQueue(self.db, dispatch=lambda callback, *args: self.root.after(0, callback, *args))
+        
+        # Система авторизации (общая база и кэш статистики)
+        self.auth = AuthSystem(self.db)
         self.promoter = None
         
+        # Графики аналитики (создаются при первом открытии раздела)
+        self.chart_manager = None
+        
+        # Кэш собранных разделов и привязанные к данным StringVar
+        self.sections = {}
+        self.bound_vars = {}
+        
+        # Поля статистики, измененные с последней отрисовки (см. on_stats_changed)
+        self.dirty_stats = set()
+        self.dirty_stats_lock = threading.Lock()
+        self.stats_flush_scheduled = False
+        
         # Переменные для полноэкранного режима
         self.fullscreen_mode = True
         
@@ -967,7 +3958,7 @@ class PremiumYouTubePromoGUI:
             success, message = self.auth.login(username, password)
             if success:
                 user_id = self.auth.current_user_data['id']
-                self.promoter = YouTubeAutoPromoter(username, user_id, self.db)
+                self.promoter = YouTubeAutoPromoter(username, user_id, self.db, persistence=self.persistence)
                 self.create_main_interface()
             else:
                 messagebox.showerror("Ошибка автовхода", message)
@@ -1398,7 +4389,7 @@ class PremiumYouTubePromoGUI:
             self.auth.save_remembered_user(username, remember)
             
             user_id = self.auth.current_user_data['id']
-            self.promoter = YouTubeAutoPromoter(username, user_id, self.db)
+            self.promoter = YouTubeAutoPromoter(username, user_id, self.db, persistence=self.persistence)
             
             # Анимация успешного входа
             self.login_btn.config(text="✅ Успешно!", bg=self.colors['success'])
@@ -1426,6 +4417,9 @@ class PremiumYouTubePromoGUI:
         # Основное содержимое
         self.create_main_content()
         
+        # Живое обновление разделов при изменении статистики
+        self.promoter.stats.subscribe(self.on_stats_changed)
+        
         # Инициализация
         self.show_dashboard()
         
@@ -1630,44 +4624,237 @@ class PremiumYouTubePromoGUI:
             btn.bind("<Leave>", lambda e, b=btn: b.config(bg=self.colors['card_bg'], fg=self.colors['text_secondary']))
     
     def create_main_content(self):
-        """Создание основной области содержимого"""
-        self.main_content = tk.Frame(self.root, bg=self.colors['background'])
-        self.main_content.grid(row=1, column=1, sticky='nsew', padx=20, pady=20)
+        """Создание основной области содержимого (общая ячейка для фреймов разделов)"""
+        self.content_host = tk.Frame(self.root, bg=self.colors['background'])
+        self.content_host.grid(row=1, column=1, sticky='nsew', padx=20, pady=20)
+        self.content_host.grid_rowconfigure(0, weight=1)
+        self.content_host.grid_columnconfigure(0, weight=1)
+        self.main_content = self.content_host
+        
+        # Разделы прошлой сессии уничтожены вместе с окном
+        self.sections = {}
+        self.bound_vars = {}
         
         # Конфигурация сетки
         self.root.grid_columnconfigure(1, weight=1)
         self.root.grid_rowconfigure(1, weight=1)
     
+    def activate_section(self, index, build, signature=None, refresh=None, return_action=None, teardown=None):
+        """Показ раздела: сборка при первом посещении, затем подъем кэшированного фрейма.
+
+        signature() - снимок данных раздела; если он изменился с прошлого показа,
+        вызывается refresh(), а без refresh раздел пересобирается целиком.
+        return_action перепривязывает Enter, teardown освобождает ресурсы перед пересборкой.
+        """
+        self.highlight_nav_button(index)
+        if self.promoter is not None:
+            self.promoter.refresh_stats()
+        
+        current = signature() if signature is not None else None
+        section = self.sections.get(index)
+        if section is not None and section['signature'] != current:
+            if refresh is not None:
+                refresh()
+            else:
+                self.drop_section(index)
+                section = None
+        
+        if section is None:
+            frame = tk.Frame(self.content_host, bg=self.colors['background'])
+            frame.grid(row=0, column=0, sticky='nsew')
+            self.main_content = frame
+            build()
+            section = self.sections[index] = {'frame': frame, 'teardown': teardown}
+        
+        section['signature'] = current
+        self.main_content = section['frame']
+        section['frame'].tkraise()
+        
+        # Enter относится только к активному разделу
+        if return_action is not None:
+            self.root.bind('<Return>', lambda e: return_action())
+        else:
+            self.root.unbind('<Return>')
+    
+    def drop_section(self, index):
+        """Уничтожение кэшированного фрейма раздела"""
+        section = self.sections.pop(index, None)
+        if section is None:
+            return
+        if section['teardown'] is not None:
+            section['teardown']()
+        section['frame'].destroy()
+    
+    def bind_text(self, key, text):
+        """StringVar для подписи, зависящей от данных; set() только при изменении текста"""
+        var = self.bound_vars.get(key)
+        if var is None:
+            var = self.bound_vars[key] = tk.StringVar(master=self.root, value=text)
+        elif var.get() != text:
+            var.set(text)
+        return var
+    
+    def stats_signature(self):
+        """Снимок статистики канала для проверки актуальности разделов"""
+        return tuple(self.promoter.stats.get(field) for field in CHANNEL_STATS_FIELDS)
+    
+    def on_stats_changed(self, field, old, new):
+        """Подписчик ObservableStats: копит измененные поля до одного after_idle
+
+        Может вызываться из потока симуляции; серия быстрых изменений
+        отрисовывается один раз, когда Tk освободится.
+        """
+        with self.dirty_stats_lock:
+            self.dirty_stats.add(field)
+            if self.stats_flush_scheduled:
+                return
+            self.stats_flush_scheduled = True
+        self.root.after_idle(self.flush_stats_changes)
+    
+    def flush_stats_changes(self):
+        """Обновление подписей, зависящих от изменившихся полей"""
+        with self.dirty_stats_lock:
+            fields = self.dirty_stats
+            self.dirty_stats = set()
+            self.stats_flush_scheduled = False
+        
+        if self.promoter is None or not fields:
+            return
+        self.refresh_live_sections()
+    
+    def refresh_live_sections(self):
+        """Привязанные значения собранных разделов; set() только для изменившихся текстов"""
+        if 0 in self.sections:
+            self.refresh_dashboard()
+        if 1 in self.sections:
+            self.bind_text('generator.subtitle', self.content_generator_subtitle())
+        if 3 in self.sections:
+            self.refresh_ai_assistant()
+        if 6 in self.sections:
+            self.bind_text('simulation.subtitle', self.simulation_subtitle())
+    
     def show_dashboard(self):
         """Показать дашборд (адаптивный интерфейс для нулевых аккаунтов)"""
-        self.clear_main_content()
-        self.highlight_nav_button(0)
-        
-        # Заголовок
-        header_frame = tk.Frame(self.main_content, bg=self.colors['background'], pady=20)
-        header_frame.pack(fill='x')
-        
-        tk.Label(
-            header_frame,
-            text="📊 Дашборд канала",
-            font=('Segoe UI', 28, 'bold'),
-            bg=self.colors['background'],
-            fg=self.colors['text']
-        ).pack(anchor='w')
+        self.activate_section(0, self.build_dashboard)
+    
+    def dashboard_values(self):
+        """Тексты дашборда, зависящие от статистики канала"""
+        stats = self.promoter.stats
         
         # Динамический подзаголовок в зависимости от стадии канала
-        if self.promoter.stats['subscribers'] == 0:
+        if stats['subscribers'] == 0:
             subtitle = "🎬 Ваш канал начинается с нуля! Создайте первое видео"
-        elif self.promoter.stats['subscribers'] < 100:
+        elif stats['subscribers'] < 100:
             subtitle = "🚀 Отличное начало! Продолжайте развивать канал"
-        elif self.promoter.stats['subscribers'] < 1000:
+        elif stats['subscribers'] < 1000:
             subtitle = "📈 Канал активно растет! Достигайте новых высот"
         else:
             subtitle = "🔥 Отличные результаты! Вы - успешный YouTube-автор"
         
+        # Динамические подписи для карточек
+        if stats['total_views'] == 0:
+            views_note = "🎯 Создайте первое видео!"
+        else:
+            views_note = f"📈 +{max(10, int(stats['total_views'] * 0.1)):} за неделю"
+        
+        if stats['subscribers'] == 0:
+            subscribers_note = "🚀 Первые подписчики ждут!"
+        else:
+            subscribers_note = f"🔥 +{max(1, int(stats['subscribers'] * 0.05))} новых"
+        
+        if stats['total_likes'] == 0:
+            likes_note = "💖 Получите первые лайки!"
+        else:
+            likes_note = f"🎯 {stats['engagement_rate']:.1f}% вовлеченности"
+        
+        if stats['estimated_earnings'] == 0:
+            earnings_note = "💵 Начните монетизацию!"
+        else:
+            earnings_note = f"💵 +${stats['estimated_earnings'] * 0.1:.2f}"
+        
+        return {
+            'dashboard.subtitle': subtitle,
+            'dashboard.views': f"{stats['total_views']:,}",
+            'dashboard.views_note': views_note,
+            'dashboard.subscribers': f"{stats['subscribers']:,}",
+            'dashboard.subscribers_note': subscribers_note,
+            'dashboard.likes': f"{stats['total_likes']:,}",
+            'dashboard.likes_note': likes_note,
+            'dashboard.earnings': f"${stats['estimated_earnings']:.2f}",
+            'dashboard.earnings_note': earnings_note,
+            'dashboard.comments': f"{stats['total_comments']:,}",
+            'dashboard.videos': f"{stats['videos_uploaded']}",
+            'dashboard.engagement': f"{stats['engagement_rate']:.1f}%",
+            'dashboard.watch_time': f"{stats['watch_time_hours']:.0f} ч",
+        }
+    
+    def refresh_dashboard(self):
+        """Обновление собранного дашборда: меняются только изменившиеся значения"""
+        for key, text in self.dashboard_values().items():
+            self.bind_text(key, text)
+        self.render_dashboard_recommendations()
+        self.update_dashboard_actions()
+    
+    def render_dashboard_recommendations(self):
+        """Перерисовка списка рекомендаций, если он изменился"""
+        recommendations = self.promoter.get_ai_recommendations()
+        if recommendations == self.dashboard_recommendations:
+            return
+        self.dashboard_recommendations = recommendations
+        
+        for widget in self.dashboard_recommendations_list.winfo_children():
+            widget.destroy()
+        
+        for rec in recommendations:
+            rec_frame = tk.Frame(self.dashboard_recommendations_list, bg=self.colors['card_bg'])
+            rec_frame.pack(fill='x', pady=8)
+            
+            tk.Label(
+                rec_frame,
+                text="•",
+                font=('Segoe UI', 12),
+                bg=self.colors['card_bg'],
+                fg=self.colors['accent']
+            ).pack(side='left', padx=(0, 10))
+            
+            tk.Label(
+                rec_frame,
+                text=rec,
+                font=('Segoe UI', 11),
+                bg=self.colors['card_bg'],
+                fg=self.colors['text'],
+                wraplength=400,
+                justify='left'
+            ).pack(side='left', fill='x')
+    
+    def update_dashboard_actions(self):
+        """Кнопка первого видео видна только у канала без видео"""
+        if self.promoter.stats['videos_uploaded'] == 0:
+            if not self.first_video_button.winfo_manager():
+                self.first_video_button.pack(side='left', padx=5, before=self.quick_simulation_button)
+        else:
+            self.first_video_button.pack_forget()
+    
+    def build_dashboard(self):
+        """Сборка дашборда (один раз за сессию, дальше refresh_dashboard)"""
+        values = self.dashboard_values()
+        
+        # Заголовок
+        header_frame = tk.Frame(self.main_content, bg=self.colors['background'], pady=20)
+        header_frame.pack(fill='x')
+        
+        tk.Label(
+            header_frame,
+            text="📊 Дашборд канала",
+            font=('Segoe UI', 28, 'bold'),
+            bg=self.colors['background'],
+            fg=self.colors['text']
+        ).pack(anchor='w')
+        
+        # Динамический подзаголовок в зависимости от стадии канала
         tk.Label(
             header_frame,
-            text=subtitle,
+            textvariable=self.bind_text('dashboard.subtitle', values['dashboard.subtitle']),
             font=('Segoe UI', 13),
             bg=self.colors['background'],
             fg=self.colors['text_secondary']
@@ -1693,31 +4880,15 @@ class PremiumYouTubePromoGUI:
         top_stats_frame = tk.Frame(scrollable_frame, bg=self.colors['background'], pady=10)
         top_stats_frame.pack(fill='x', padx=10)
         
-        # Динамические подписи для карточек
-        stats_cards = []
-        
-        if self.promoter.stats['total_views'] == 0:
-            stats_cards.append(("👁️ Просмотры", self.promoter.stats['total_views'], "{:,}", "#FF5722", "🎯 Создайте первое видео!"))
-        else:
-            stats_cards.append(("👁️ Просмотры", self.promoter.stats['total_views'], "{:,}", "#FF5722", f"📈 +{max(10, int(self.promoter.stats['total_views'] * 0.1)):} за неделю"))
-        
-        if self.promoter.stats['subscribers'] == 0:
-            stats_cards.append(("📈 Подписчики", self.promoter.stats['subscribers'], "{:,}", "#4CAF50", "🚀 Первые подписчики ждут!"))
-        else:
-            stats_cards.append(("📈 Подписчики", self.promoter.stats['subscribers'], "{:,}", "#4CAF50", f"🔥 +{max(1, int(self.promoter.stats['subscribers'] * 0.05))} новых"))
-        
-        if self.promoter.stats['total_likes'] == 0:
-            stats_cards.append(("👍 Лайки", self.promoter.stats['total_likes'], "{:,}", "#2196F3", "💖 Получите первые лайки!"))
-        else:
-            engagement = self.promoter.stats['engagement_rate']
-            stats_cards.append(("👍 Лайки", self.promoter.stats['total_likes'], "{:,}", "#2196F3", f"🎯 {engagement:.1f}% вовлеченности"))
-        
-        if self.promoter.stats['estimated_earnings'] == 0:
-            stats_cards.append(("💰 Доход", self.promoter.stats['estimated_earnings'], "${:.2f}", "#9C27B0", "💵 Начните монетизацию!"))
-        else:
-            stats_cards.append(("💰 Доход", self.promoter.stats['estimated_earnings'], "${:.2f}", "#9C27B0", f"💵 +${self.promoter.stats['estimated_earnings'] * 0.1:.2f}"))
+        # Значения и подписи обновляются через StringVar
+        stats_cards = [
+            ("👁️ Просмотры", 'dashboard.views', "#FF5722", 'dashboard.views_note'),
+            ("📈 Подписчики", 'dashboard.subscribers', "#4CAF50", 'dashboard.subscribers_note'),
+            ("👍 Лайки", 'dashboard.likes', "#2196F3", 'dashboard.likes_note'),
+            ("💰 Доход", 'dashboard.earnings', "#9C27B0", 'dashboard.earnings_note')
+        ]
         
-        for title, value, fmt, color, subtext in stats_cards:
+        for title, value_key, color, note_key in stats_cards:
             card = tk.Frame(
                 top_stats_frame,
                 bg=self.colors['card_bg'],
@@ -1735,10 +4906,9 @@ class PremiumYouTubePromoGUI:
                 fg=self.colors['text_secondary']
             ).pack(anchor='w')
             
-            formatted_value = fmt.format(value)
             tk.Label(
                 card,
-                text=formatted_value,
+                textvariable=self.bind_text(value_key, values[value_key]),
                 font=('Segoe UI', 26, 'bold'),
                 bg=self.colors['card_bg'],
                 fg=color
@@ -1746,7 +4916,7 @@ class PremiumYouTubePromoGUI:
             
             tk.Label(
                 card,
-                text=subtext,
+                textvariable=self.bind_text(note_key, values[note_key]),
                 font=('Segoe UI', 10),
                 bg=self.colors['card_bg'],
                 fg=self.colors['text_secondary']
@@ -1761,10 +4931,10 @@ class PremiumYouTubePromoGUI:
         left_col.pack(side='left', fill='both', padx=(0, 10))
         
         additional_stats = [
-            ("💬 Комментарии", f"{self.promoter.stats['total_comments']:,}"),
-            ("🎥 Видео", f"{self.promoter.stats['videos_uploaded']}"),
-            ("📊 Engagement", f"{self.promoter.stats['engagement_rate']:.1f}%"),
-            ("⏱️ Часы просмотра", f"{self.promoter.stats['watch_time_hours']:.0f} ч")
+            ("💬 Комментарии", 'dashboard.comments'),
+            ("🎥 Видео", 'dashboard.videos'),
+            ("📊 Engagement", 'dashboard.engagement'),
+            ("⏱️ Часы просмотра", 'dashboard.watch_time')
         ]
         
         stats_box = tk.Frame(left_col, bg=self.colors['card_bg'], padx=25, pady=25)
@@ -1778,7 +4948,7 @@ class PremiumYouTubePromoGUI:
             fg=self.colors['text']
         ).pack(anchor='w', pady=(0, 20))
         
-        for label, value in additional_stats:
+        for label, value_key in additional_stats:
             item_frame = tk.Frame(stats_box, bg=self.colors['card_bg'])
             item_frame.pack(fill='x', pady=12)
             
@@ -1792,7 +4962,7 @@ class PremiumYouTubePromoGUI:
             
             tk.Label(
                 item_frame,
-                text=value,
+                textvariable=self.bind_text(value_key, values[value_key]),
                 font=('Segoe UI', 12, 'bold'),
                 bg=self.colors['card_bg'],
                 fg=self.colors['text']
@@ -1813,52 +4983,32 @@ class PremiumYouTubePromoGUI:
             fg=self.colors['text']
         ).pack(anchor='w', pady=(0, 20))
         
-        recommendations = self.promoter.get_ai_recommendations()
-        
-        for rec in recommendations:
-            rec_frame = tk.Frame(recommendations_box, bg=self.colors['card_bg'])
-            rec_frame.pack(fill='x', pady=8)
-            
-            tk.Label(
-                rec_frame,
-                text="•",
-                font=('Segoe UI', 12),
-                bg=self.colors['card_bg'],
-                fg=self.colors['accent']
-            ).pack(side='left', padx=(0, 10))
-            
-            tk.Label(
-                rec_frame,
-                text=rec,
-                font=('Segoe UI', 11),
-                bg=self.colors['card_bg'],
-                fg=self.colors['text'],
-                wraplength=400,
-                justify='left'
-            ).pack(side='left', fill='x')
+        self.dashboard_recommendations_list = tk.Frame(recommendations_box, bg=self.colors['card_bg'])
+        self.dashboard_recommendations_list.pack(fill='x')
+        self.dashboard_recommendations = None
+        self.render_dashboard_recommendations()
         
         # Кнопка быстрой симуляции
         action_frame = tk.Frame(scrollable_frame, bg=self.colors['background'], pady=20)
         action_frame.pack(fill='x', padx=10)
         
-        # Кнопки действий в зависимости от стадии канала
-        if self.promoter.stats['videos_uploaded'] == 0:
-            # Для нулевого аккаунта предлагаем создать первое видео
-            tk.Button(
-                action_frame,
-                text="🎬 Создать первое видео",
-                font=('Segoe UI', 13, 'bold'),
-                bg=self.colors['primary'],
-                fg='white',
-                relief='flat',
-                cursor='hand2',
-                command=self.show_content_generator,
-                pady=15,
-                padx=30
-            ).pack(side='left', padx=5)
+        # Кнопки действий в зависимости от стадии канала:
+        # для нулевого аккаунта предлагаем создать первое видео
+        self.first_video_button = tk.Button(
+            action_frame,
+            text="🎬 Создать первое видео",
+            font=('Segoe UI', 13, 'bold'),
+            bg=self.colors['primary'],
+            fg='white',
+            relief='flat',
+            cursor='hand2',
+            command=self.show_content_generator,
+            pady=15,
+            padx=30
+        )
         
         # Всегда показываем кнопку симуляции
-        tk.Button(
+        self.quick_simulation_button = tk.Button(
             action_frame,
             text="🚀 Запустить быструю симуляцию роста",
             font=('Segoe UI', 13, 'bold'),
@@ -1869,7 +5019,9 @@ class PremiumYouTubePromoGUI:
             command=self.quick_simulation,
             pady=15,
             padx=30
-        ).pack(side='left', padx=5)
+        )
+        self.quick_simulation_button.pack(side='left', padx=5)
+        self.update_dashboard_actions()
         
         # Кнопка аналитики
         tk.Button(
@@ -1908,14 +5060,23 @@ class PremiumYouTubePromoGUI:
                      f"💬 Комментариев: +{result['comments']}\n\n" \
                      f"💰 Доход: +${(result['views'] / 1000) * 0.5:.2f}"
         
+        message += f"\n\n🎲 Seed: {self.promoter.last_seed}"
+        
         messagebox.showinfo("🎯 Результаты симуляции", message)
-        self.show_dashboard()
     
     def show_content_generator(self):
         """Показать генератор контента"""
-        self.clear_main_content()
-        self.highlight_nav_button(1)
-        
+        self.activate_section(1, self.build_content_generator, return_action=self.generate_content)
+    
+    def content_generator_subtitle(self):
+        """Подзаголовок генератора с количеством видео"""
+        video_count = self.promoter.stats['videos_uploaded']
+        if video_count == 0:
+            return "🎯 Создайте свое первое видео! (у вас еще нет видео)"
+        return f"📊 У вас уже {video_count} видео. Создайте следующее!"
+    
+    def build_content_generator(self):
+        """Сборка генератора контента"""
         # Заголовок с информацией о количестве видео
         header_frame = tk.Frame(self.main_content, bg=self.colors['background'], pady=20)
         header_frame.pack(fill='x')
@@ -1928,15 +5089,9 @@ class PremiumYouTubePromoGUI:
             fg=self.colors['text']
         ).pack(anchor='w')
         
-        video_count = self.promoter.stats['videos_uploaded']
-        if video_count == 0:
-            subtitle = "🎯 Создайте свое первое видео! (у вас еще нет видео)"
-        else:
-            subtitle = f"📊 У вас уже {video_count} видео. Создайте следующее!"
-        
         tk.Label(
             header_frame,
-            text=subtitle,
+            textvariable=self.bind_text('generator.subtitle', self.content_generator_subtitle()),
             font=('Segoe UI', 13),
             bg=self.colors['background'],
             fg=self.colors['text_secondary']
@@ -2001,7 +5156,30 @@ class PremiumYouTubePromoGUI:
             relief='flat',
             width=40
         )
-        self.keyword_entry.pack(anchor='w', pady=(0, 30), ipady=10)
+        self.keyword_entry.pack(anchor='w', pady=(0, 20), ipady=10)
+        
+        # Размер пакета: больше 1 - черновики одной транзакцией
+        tk.Label(
+            main_frame,
+            text="Количество черновиков (для пакета ключевые слова - через запятую):",
+            font=('Segoe UI', 14, 'bold'),
+            bg=self.colors['card_bg'],
+            fg=self.colors['text']
+        ).pack(anchor='w', pady=(0, 10))
+        
+        self.content_count = tk.StringVar(value="1")
+        tk.Spinbox(
+            main_frame,
+            from_=1,
+            to=CONTENT_BATCH_MAX,
+            textvariable=self.content_count,
+            font=('Segoe UI', 13),
+            bg=self.colors['background'],
+            fg=self.colors['text'],
+            buttonbackground=self.colors['card_bg'],
+            relief='flat',
+            width=6
+        ).pack(anchor='w', pady=(0, 30), ipady=6)
         
         # Кнопка генерации
         generate_btn = tk.Button(
@@ -2017,9 +5195,6 @@ class PremiumYouTubePromoGUI:
         )
         generate_btn.pack(fill='x', pady=(0, 20))
         
-        # Привязываем Enter
-        self.root.bind('<Return>', lambda e: self.generate_content())
-        
         # Область для результатов
         self.result_frame = tk.Frame(main_frame, bg=self.colors['card_bg'])
         self.result_frame.pack(fill='both', expand=True)
@@ -2029,6 +5204,27 @@ class PremiumYouTubePromoGUI:
         category = self.selected_category.get()
         keyword = self.keyword_entry.get().strip()
         
+        try:
+            count = int(self.content_count.get())
+        except ValueError:
+            count = 1
+        count = min(max(count, 1), CONTENT_BATCH_MAX)
+        
+        if count > 1:
+            # Пакет черновиков: одна запись в БД, показываем последний
+            keywords = [item.strip() for item in keyword.split(',')]
+            items = self.promoter.generate_video_content_batch(category, keywords, count)
+            content = items[-1]
+            video_count = self.promoter.stats['videos_uploaded']
+            messagebox.showinfo(
+                "✅ Пакет контента создан",
+                f"Создано черновиков: {len(items)}.\n\n"
+                f"🎬 Теперь у вас {video_count} видео на канале.\n"
+                f"Ниже - последний из них."
+            )
+            self.show_generated_content(content)
+            return
+        
         content = self.promoter.generate_video_content(category, keyword)
         
         # Показываем сообщение о добавлении видео
@@ -2047,6 +5243,10 @@ class PremiumYouTubePromoGUI:
                 f"🎬 Теперь у вас {video_count} видео на канале."
             )
         
+        self.show_generated_content(content)
+    
+    def show_generated_content(self, content):
+        """Заголовок, описание и хештеги сгенерированного видео в области результатов"""
         # Очищаем область результатов
         for widget in self.result_frame.winfo_children():
             widget.destroy()
@@ -2174,20 +5374,89 @@ class PremiumYouTubePromoGUI:
     
     def save_generated_content(self, content):
         """Сохранение сгенерированного контента"""
-        self.db.save_video_content(
+        self.persistence.submit(
+            self.db.save_video_content,
             self.auth.current_user_data['id'],
             content['title'],
             content['description'],
             content['category'],
-            content['keyword']
+            content['keyword'],
+            # Сообщение - только после фактической записи
+            callback=lambda _: messagebox.showinfo("💾 Успешно", "Контент сохранен в базу данных!"),
+            error_callback=self.show_persistence_error
         )
-        messagebox.showinfo("💾 Успешно", "Контент сохранен в базу данных!")
     
     def show_analytics(self):
         """Показать аналитику с реальными данными"""
-        self.clear_main_content()
-        self.highlight_nav_button(2)
+        self.activate_section(
+            2, self.build_analytics,
+            signature=self.stats_signature,
+            refresh=self.refresh_analytics,
+            teardown=lambda: self.chart_manager.release()
+        )
+    
+    def update_analytics_charts(self):
+        """Данные графиков: дневной ряд подписчиков и доли вовлеченности"""
+        # Дневной накопительный ряд из channel_daily_rollup (один запрос по ключу)
+        curve = self.db.get_subscriber_curve(self.auth.current_user_data['id'], days=CHART_SUBSCRIBER_POINTS)
+        dates = [day for day, _, _ in curve]
+        subscribers = [day_subscribers for _, day_subscribers, _ in curve]
+        
+        self.chart_manager.update_subscriber_chart(dates, subscribers)
+        self.chart_manager.update_engagement_chart(self.promoter.stats)
+    
+    def refresh_analytics(self):
+        """Обновление собранной аналитики без пересоздания вкладок"""
+        self.update_analytics_charts()
+        self.chart_manager.redraw()
         
+        if self.analytics_history_view is not None:
+            self.analytics_history_view.reload()
+        else:
+            self.render_analytics_history()
+    
+    def render_analytics_history(self):
+        """Вкладка истории: таблица или подсказка, пока симуляций не было"""
+        history_frame = self.analytics_history_frame
+        for widget in history_frame.winfo_children():
+            widget.destroy()
+        self.analytics_history_view = None
+        
+        # Таблица истории симуляций: постраничная подгрузка при прокрутке
+        user_id = self.auth.current_user_data['id']
+        
+        if self.db.get_page('simulation_history', user_id, limit=1):
+            columns = [
+                ("Дата", 'timestamp', 140),
+                ("Часы", None, 80),
+                ("Подписчики", 'new_subscribers', 120),
+                ("Просмотры", 'new_views', 120),
+                ("Лайки", None, 120),
+                ("Комментарии", None, 120)
+            ]
+            
+            def format_history_row(row):
+                _, _, timestamp, hours, subscribers, views, likes, comments = row
+                date = timestamp[:16] if timestamp else "неизвестно"
+                return (date, hours, f"+{subscribers}", f"+{views:,}", f"+{likes}", f"+{comments}")
+            
+            self.analytics_history_view = PagedTreeview(
+                history_frame, self.db, 'simulation_history', user_id, columns, format_history_row
+            )
+            self.analytics_history_view.pack(fill="both", expand=True, padx=20, pady=20)
+        else:
+            tk.Label(
+                history_frame,
+                text="📊 История симуляций будет отображаться здесь после запуска симуляций\n\n"
+                     "🚀 Запустите первую симуляцию в разделе 'Симуляция'!",
+                font=('Segoe UI', 14),
+                bg=self.colors['background'],
+                fg=self.colors['text_secondary'],
+                justify='center'
+            ).pack(expand=True)
+    
+    def build_analytics(self):
+        """Сборка раздела аналитики"""
         header_frame = tk.Frame(self.main_content, bg=self.colors['background'], pady=20)
         header_frame.pack(fill='x')
         
@@ -2220,134 +5489,160 @@ class PremiumYouTubePromoGUI:
         notebook.add(metrics_frame, text="📊 Основные метрики")
         
         # График роста подписчиков (динамический, на основе реальных данных)
-        fig1, ax1 = plt.subplots(figsize=(8, 4))
-        
-        # Получаем историю симуляций для графика
-        history = self.db.get_simulation_history(self.auth.current_user_data['id'], limit=30)
-        
-        if history:
-            # Строим график на основе реальных данных
-            dates = []
-            subscribers = []
-            cumulative_subs = self.promoter.stats['subscribers']
-            
-            for i, record in enumerate(reversed(history)):
-                date = record[2][:10] if record[2] else f"День {i+1}"
-                new_subs = record[4]
-                cumulative_subs -= new_subs
-                dates.append(date)
-                subscribers.append(cumulative_subs)
-            
-            # Добавляем текущее значение
-            dates.append("Сегодня")
-            subscribers.append(self.promoter.stats['subscribers'])
-            
-            ax1.plot(dates[-10:], subscribers[-10:], marker='o', color='#FF0000', linewidth=2)
-            ax1.set_title('Рост подписчиков (последние 10 дней)', fontsize=14, color='white')
-        else:
-            # Если нет данных, показываем пустой график с ожиданием
-            ax1.text(0.5, 0.5, 'Запустите симуляцию\nдля появления данных', 
-                    ha='center', va='center', transform=ax1.transAxes, 
-                    fontsize=12, color='white')
-            ax1.set_title('Ожидание данных...', fontsize=14, color='white')
-        
-        ax1.set_facecolor('#202020')
-        fig1.patch.set_facecolor('#202020')
-        ax1.tick_params(colors='white')
-        ax1.spines['bottom'].set_color('white')
-        ax1.spines['left'].set_color('white')
-        
-        canvas1 = FigureCanvasTkAgg(fig1, metrics_frame)
-        canvas1.draw()
-        canvas1.get_tk_widget().pack(fill='both', expand=True, padx=20, pady=20)
+        if self.chart_manager is None:
+            self.chart_manager = AnalyticsChartManager()
+        
+        self.update_analytics_charts()
+        self.chart_manager.attach('subscribers', metrics_frame).pack(fill='both', expand=True, padx=20, pady=20)
         
         # Вкладка 2: Engagement rate
         engagement_frame = tk.Frame(notebook, bg=self.colors['background'])
         notebook.add(engagement_frame, text="💬 Вовлеченность")
         
-        # Данные для графика на основе реальной статистики
-        fig2, ax2 = plt.subplots(figsize=(8, 4))
-        
-        if self.promoter.stats['total_views'] > 0:
-            likes_percent = (self.promoter.stats['total_likes'] / self.promoter.stats['total_views']) * 100
-            comments_percent = (self.promoter.stats['total_comments'] / self.promoter.stats['total_views']) * 100
-            other_percent = 100 - likes_percent - comments_percent
-            
-            labels = ['Лайки', 'Комментарии', 'Другие действия']
-            sizes = [likes_percent, comments_percent, other_percent]
-            colors = ['#FF5722', '#4CAF50', '#2196F3']
-            
-            # Фильтруем нулевые значения
-            filtered_labels = []
-            filtered_sizes = []
-            filtered_colors = []
-            
-            for i, size in enumerate(sizes):
-                if size > 0.1:  # Показываем только значимые значения
-                    filtered_labels.append(labels[i])
-                    filtered_sizes.append(size)
-                    filtered_colors.append(colors[i])
-            
-            if filtered_sizes:
-                ax2.pie(filtered_sizes, labels=filtered_labels, colors=filtered_colors, 
-                       autopct='%1.1f%%', startangle=90)
-                ax2.set_title('Распределение вовлеченности', fontsize=14, color='white')
-            else:
-                ax2.text(0.5, 0.5, 'Недостаточно данных\nдля анализа вовлеченности', 
-                        ha='center', va='center', transform=ax2.transAxes, 
-                        fontsize=12, color='white')
-                ax2.set_title('Ожидание данных...', fontsize=14, color='white')
-        else:
-            ax2.text(0.5, 0.5, 'Создайте контент\nи привлеките аудиторию', 
-                    ha='center', va='center', transform=ax2.transAxes, 
-                    fontsize=12, color='white')
-            ax2.set_title('Канал начинается с нуля', fontsize=14, color='white')
-        
-        fig2.patch.set_facecolor('#202020')
-        
-        canvas2 = FigureCanvasTkAgg(fig2, engagement_frame)
-        canvas2.draw()
-        canvas2.get_tk_widget().pack(fill='both', expand=True, padx=20, pady=20)
+        self.chart_manager.attach('engagement', engagement_frame).pack(fill='both', expand=True, padx=20, pady=20)
         
         # Вкладка 3: История симуляций
         history_frame = tk.Frame(notebook, bg=self.colors['background'])
         notebook.add(history_frame, text="📈 История роста")
+        self.analytics_history_frame = history_frame
+        self.render_analytics_history()
+    
+    def show_ai_assistant(self):
+        """Показать AI помощник"""
+        self.activate_section(3, self.build_ai_assistant)
+    
+    def ai_assistant_values(self):
+        """Тексты AI помощника, зависящие от статистики канала и журнала активности
+
+        Сводка активности - последняя полученная request_assistant_activity();
+        пока ее нет, вместо чисел активности выводится многоточие.
+        """
+        stats = self.promoter.stats
+        activity = self.assistant_activity
         
-        # Таблица истории симуляций
-        history = self.db.get_simulation_history(self.auth.current_user_data['id'], limit=10)
+        # Динамический подзаголовок
+        if stats['subscribers'] == 0:
+            subtitle = "🎯 Помощь в запуске канала с нуля"
+        elif stats['subscribers'] < 100:
+            subtitle = "🚀 Рекомендации для начального роста"
+        else:
+            subtitle = "📈 Продвинутые стратегии для развития"
+        
+        return {
+            'assistant.subtitle': subtitle,
+            'assistant.videos': f"🎬 Видео: {stats['videos_uploaded']}",
+            'assistant.subscribers': f"📈 Подписчики: {stats['subscribers']}",
+            'assistant.views': f"👁️ Просмотры: {stats['total_views']:,}",
+            'assistant.earnings': f"💰 Доход: ${stats['estimated_earnings']:.2f}",
+            **self.assistant_activity_values(activity)
+        }
+    
+    def assistant_activity_values(self, activity):
+        """Тексты активности AI помощника из сводки get_activity_summary()"""
+        if activity is None:
+            return {
+                'assistant.activity_today': "⚡ Сегодня: …",
+                'assistant.activity_week': "📅 За 7 дней: …",
+                'assistant.active_days': "🔥 Активных дней: …",
+            }
+        
+        today, week = activity['today'], activity['week']
+        return {
+            'assistant.activity_today': (f"⚡ Сегодня: {today.get('CONTENT_GENERATED', 0)} видео, "
+                                         f"{today.get('GROWTH_SIMULATED', 0)} симуляций"),
+            'assistant.activity_week': (f"📅 За 7 дней: {week.get('CONTENT_GENERATED', 0)} видео, "
+                                        f"{week.get('GROWTH_SIMULATED', 0)} симуляций"),
+            'assistant.active_days': f"🔥 Активных дней: {activity['active_days']} из {activity['period_days']}",
+        }
+    
+    def request_assistant_activity(self):
+        """Сводка activity_events через очередь фоновой записи
+
+        Сброс журнала активности (запись файла и activity_events) и запрос
+        выполняются в потоке очереди, а не в Tk; еще не начатые запросы
+        сливаются в один. Результат применяет apply_assistant_activity().
+        """
+        user_id = self.promoter.user_id
+        self.persistence.submit(
+            self.promoter.get_activity_summary,
+            key=('activity_summary', user_id),
+            callback=lambda activity: self.apply_assistant_activity(user_id, activity)
+        )
+    
+    def apply_assistant_activity(self, user_id, activity):
+        """Обновление текстов и рекомендаций AI помощника по полученной сводке"""
+        # Пока запрос шел, раздел могли закрыть или сменить пользователя
+        if 3 not in self.sections or self.promoter is None or self.promoter.user_id != user_id:
+            return
+        self.assistant_activity = activity
+        for key, text in self.assistant_activity_values(activity).items():
+            self.bind_text(key, text)
+        self.render_assistant_recommendations()
+    
+    def refresh_ai_assistant(self):
+        """Обновление собранного AI помощника; сводка активности - асинхронно"""
+        for key, text in self.ai_assistant_values().items():
+            self.bind_text(key, text)
+        self.render_assistant_recommendations()
+        self.request_assistant_activity()
+    
+    def render_assistant_recommendations(self):
+        """Перерисовка нумерованных рекомендаций, если список изменился"""
+        recommendations = self.promoter.get_ai_recommendations(self.assistant_activity)
+        if recommendations == self.assistant_recommendations:
+            return
+        self.assistant_recommendations = recommendations
+        
+        for widget in self.assistant_recommendations_list.winfo_children():
+            widget.destroy()
         
-        if history:
-            columns = ("Дата", "Часы", "Подписчики", "Просмотры", "Лайки", "Комментарии")
-            tree = ttk.Treeview(history_frame, columns=columns, show="headings", height=10)
+        for i, rec in enumerate(recommendations):
+            rec_frame = tk.Frame(self.assistant_recommendations_list, bg=self.colors['card_bg'])
+            rec_frame.pack(fill='x', pady=10)
             
-            for col in columns:
-                tree.heading(col, text=col)
-                tree.column(col, width=120)
+            # Номер рекомендации
+            tk.Label(
+                rec_frame,
+                text=f"{i+1}.",
+                font=('Segoe UI', 16, 'bold'),
+                bg=self.colors['card_bg'],
+                fg=self.colors['primary']
+            ).pack(side='left', padx=(0, 15))
             
-            for row in history:
-                date = row[2][:10] if row[2] else "неизвестно"
-                tree.insert("", "end", values=(date, row[3], f"+{row[4]}", f"+{row[5]:,}", f"+{row[6]}", f"+{row[7]}"))
+            # Иконка в зависимости от типа рекомендации
+            icon = "🤖"
+            if "видео" in rec.lower():
+                icon = "🎬"
+            elif "симуляция" in rec.lower():
+                icon = "🚀"
+            elif "комментарии" in rec.lower():
+                icon = "💬"
+            elif "монетизация" in rec.lower():
+                icon = "💰"
             
-            scrollbar = ttk.Scrollbar(history_frame, orient="vertical", command=tree.yview)
-            tree.configure(yscrollcommand=scrollbar.set)
+            tk.Label(
+                rec_frame,
+                text=icon,
+                font=('Segoe UI', 16),
+                bg=self.colors['card_bg'],
+                fg=self.colors['accent']
+            ).pack(side='left', padx=(0, 15))
             
-            tree.pack(side="left", fill="both", expand=True, padx=20, pady=20)
-            scrollbar.pack(side="right", fill="y")
-        else:
+            # Текст рекомендации
             tk.Label(
-                history_frame,
-                text="📊 История симуляций будет отображаться здесь после запуска симуляций\n\n"
-                     "🚀 Запустите первую симуляцию в разделе 'Симуляция'!",
-                font=('Segoe UI', 14),
-                bg=self.colors['background'],
-                fg=self.colors['text_secondary'],
-                justify='center'
-            ).pack(expand=True)
+                rec_frame,
+                text=rec,
+                font=('Segoe UI', 13),
+                bg=self.colors['card_bg'],
+                fg=self.colors['text'],
+                wraplength=800,
+                justify='left'
+            ).pack(side='left', fill='x')
     
-    def show_ai_assistant(self):
-        """Показать AI помощник"""
-        self.clear_main_content()
-        self.highlight_nav_button(3)
+    def build_ai_assistant(self):
+        """Сборка AI помощника"""
+        self.assistant_activity = None
+        values = self.ai_assistant_values()
         
         header_frame = tk.Frame(self.main_content, bg=self.colors['background'], pady=20)
         header_frame.pack(fill='x')
@@ -2361,16 +5656,9 @@ class PremiumYouTubePromoGUI:
         ).pack(anchor='w')
         
         # Динамический подзаголовок
-        if self.promoter.stats['subscribers'] == 0:
-            subtitle = "🎯 Помощь в запуске канала с нуля"
-        elif self.promoter.stats['subscribers'] < 100:
-            subtitle = "🚀 Рекомендации для начального роста"
-        else:
-            subtitle = "📈 Продвинутые стратегии для развития"
-        
         tk.Label(
             header_frame,
-            text=subtitle,
+            textvariable=self.bind_text('assistant.subtitle', values['assistant.subtitle']),
             font=('Segoe UI', 13),
             bg=self.colors['background'],
             fg=self.colors['text_secondary']
@@ -2391,79 +5679,49 @@ class PremiumYouTubePromoGUI:
         
         # Статистика канала
         stats_frame = tk.Frame(main_frame, bg=self.colors['card_bg'], pady=10)
-        stats_frame.pack(fill='x', pady=(0, 20))
+        stats_frame.pack(fill='x', pady=(0, 10))
         
-        stats_items = [
-            f"🎬 Видео: {self.promoter.stats['videos_uploaded']}",
-            f"📈 Подписчики: {self.promoter.stats['subscribers']}",
-            f"👁️ Просмотры: {self.promoter.stats['total_views']:,}",
-            f"💰 Доход: ${self.promoter.stats['estimated_earnings']:.2f}"
-        ]
+        stats_items = ['assistant.videos', 'assistant.subscribers', 'assistant.views', 'assistant.earnings']
         
-        for stat in stats_items:
+        for key in stats_items:
             tk.Label(
                 stats_frame,
-                text=stat,
+                textvariable=self.bind_text(key, values[key]),
                 font=('Segoe UI', 13),
                 bg=self.colors['card_bg'],
                 fg=self.colors['text_secondary'],
                 padx=10
             ).pack(side='left')
         
-        # AI рекомендации
-        tk.Label(
-            main_frame,
-            text="💡 AI рекомендации:",
-            font=('Segoe UI', 20, 'bold'),
-            bg=self.colors['card_bg'],
-            fg=self.colors['text']
-        ).pack(anchor='w', pady=(0, 20))
-        
-        # Получаем рекомендации
-        recommendations = self.promoter.get_ai_recommendations()
+        # Активность из журнала событий
+        activity_frame = tk.Frame(main_frame, bg=self.colors['card_bg'])
+        activity_frame.pack(fill='x', pady=(0, 20))
         
-        for i, rec in enumerate(recommendations):
-            rec_frame = tk.Frame(main_frame, bg=self.colors['card_bg'])
-            rec_frame.pack(fill='x', pady=10)
-            
-            # Номер рекомендации
-            tk.Label(
-                rec_frame,
-                text=f"{i+1}.",
-                font=('Segoe UI', 16, 'bold'),
-                bg=self.colors['card_bg'],
-                fg=self.colors['primary']
-            ).pack(side='left', padx=(0, 15))
-            
-            # Иконка в зависимости от типа рекомендации
-            icon = "🤖"
-            if "видео" in rec.lower():
-                icon = "🎬"
-            elif "симуляция" in rec.lower():
-                icon = "🚀"
-            elif "комментарии" in rec.lower():
-                icon = "💬"
-            elif "монетизация" in rec.lower():
-                icon = "💰"
-            
-            tk.Label(
-                rec_frame,
-                text=icon,
-                font=('Segoe UI', 16),
-                bg=self.colors['card_bg'],
-                fg=self.colors['accent']
-            ).pack(side='left', padx=(0, 15))
-            
-            # Текст рекомендации
+        for key in ['assistant.activity_today', 'assistant.activity_week', 'assistant.active_days']:
             tk.Label(
-                rec_frame,
-                text=rec,
-                font=('Segoe UI', 13),
+                activity_frame,
+                textvariable=self.bind_text(key, values[key]),
+                font=('Segoe UI', 12),
                 bg=self.colors['card_bg'],
-                fg=self.colors['text'],
-                wraplength=800,
-                justify='left'
-            ).pack(side='left', fill='x')
+                fg=self.colors['text_secondary'],
+                padx=10
+            ).pack(side='left')
+        
+        # AI рекомендации
+        tk.Label(
+            main_frame,
+            text="💡 AI рекомендации:",
+            font=('Segoe UI', 20, 'bold'),
+            bg=self.colors['card_bg'],
+            fg=self.colors['text']
+        ).pack(anchor='w', pady=(0, 20))
+        
+        # Рекомендации перерисовываются только при изменении списка
+        self.assistant_recommendations_list = tk.Frame(main_frame, bg=self.colors['card_bg'])
+        self.assistant_recommendations_list.pack(fill='x')
+        self.assistant_recommendations = None
+        self.render_assistant_recommendations()
+        self.request_assistant_activity()
         
         # Кнопка обновления рекомендаций
         tk.Button(
@@ -2481,9 +5739,55 @@ class PremiumYouTubePromoGUI:
     
     def show_planner(self):
         """Показать планировщик"""
-        self.clear_main_content()
-        self.highlight_nav_button(4)
+        self.activate_section(4, self.build_planner, signature=self.stats_signature, refresh=self.refresh_planner)
+    
+    def refresh_planner(self):
+        """Новый контент после генерации: перечитываем первую страницу плана"""
+        if self.planner_content_view is not None:
+            self.planner_content_view.reload()
+        else:
+            self.render_planner_content()
+    
+    def render_planner_content(self):
+        """Вкладка плана контента: таблица или подсказка, пока контента нет"""
+        content_frame = self.planner_content_frame
+        for widget in content_frame.winfo_children():
+            widget.destroy()
+        self.planner_content_view = None
         
+        # История сгенерированного контента: постраничная подгрузка при прокрутке
+        user_id = self.auth.current_user_data['id']
+        
+        if self.db.get_page('video_content', user_id, limit=1):
+            columns = [
+                ("Дата", 'created_at', 200),
+                ("Категория", 'category', 200),
+                ("Заголовок", 'title', 200)
+            ]
+            
+            def format_content_row(row):
+                _, _, created_at, category, title = row
+                date = created_at[:10] if created_at else "неизвестно"
+                title = title[:50] + "..." if len(title) > 50 else title
+                return (date, category or "не указана", title)
+            
+            self.planner_content_view = PagedTreeview(
+                content_frame, self.db, 'video_content', user_id, columns, format_content_row
+            )
+            self.planner_content_view.pack(fill="both", expand=True, padx=20, pady=20)
+        else:
+            tk.Label(
+                content_frame,
+                text="🎬 Сгенерированный контент появится здесь после использования генератора\n\n"
+                     "🎯 Создайте свое первое видео в разделе 'Генератор'!",
+                font=('Segoe UI', 14),
+                bg=self.colors['background'],
+                fg=self.colors['text_secondary'],
+                justify='center'
+            ).pack(expand=True)
+    
+    def build_planner(self):
+        """Сборка планировщика"""
         header_frame = tk.Frame(self.main_content, bg=self.colors['background'], pady=20)
         header_frame.pack(fill='x')
         
@@ -2624,18 +5928,25 @@ class PremiumYouTubePromoGUI:
                 messagebox.showerror("Ошибка", "Введите название задачи!")
                 return
             
-            self.db.save_task(
+            def on_saved(_):
+                # Пользователь мог уйти из раздела, пока задача записывалась
+                if tasks_container.winfo_exists():
+                    load_tasks()
+            
+            self.persistence.submit(
+                self.db.save_task,
                 self.auth.current_user_data['id'],
                 title,
                 description,
                 due_date,
-                priority
+                priority,
+                callback=on_saved,
+                error_callback=self.show_persistence_error
             )
             
             messagebox.showinfo("✅ Успешно", "Задача добавлена!")
             task_title_entry.delete(0, tk.END)
             task_desc_entry.delete(0, tk.END)
-            load_tasks()
         
         add_btn = tk.Button(
             add_task_frame,
@@ -2745,49 +6056,27 @@ class PremiumYouTubePromoGUI:
         # Вкладка 2: Контент план
         content_frame = tk.Frame(notebook, bg=self.colors['background'])
         notebook.add(content_frame, text="🎬 План контента")
-        
-        # История сгенерированного контента
-        content_history = self.db.get_video_content(self.auth.current_user_data['id'], limit=10)
-        
-        if content_history:
-            columns = ("Дата", "Категория", "Заголовок")
-            tree = ttk.Treeview(content_frame, columns=columns, show="headings", height=10)
-            
-            for col in columns:
-                tree.heading(col, text=col)
-                tree.column(col, width=200)
-            
-            for row in content_history:
-                date = row[6][:10] if row[6] else "неизвестно"
-                category = row[4] or "не указана"
-                title = row[2][:50] + "..." if len(row[2]) > 50 else row[2]
-                tree.insert("", "end", values=(date, category, title))
-            
-            scrollbar = ttk.Scrollbar(content_frame, orient="vertical", command=tree.yview)
-            tree.configure(yscrollcommand=scrollbar.set)
-            
-            tree.pack(side="left", fill="both", expand=True, padx=20, pady=20)
-            scrollbar.pack(side="right", fill="y")
-        else:
-            tk.Label(
-                content_frame,
-                text="🎬 Сгенерированный контент появится здесь после использования генератора\n\n"
-                     "🎯 Создайте свое первое видео в разделе 'Генератор'!",
-                font=('Segoe UI', 14),
-                bg=self.colors['background'],
-                fg=self.colors['text_secondary'],
-                justify='center'
-            ).pack(expand=True)
+        self.planner_content_frame = content_frame
+        self.render_planner_content()
     
     def update_task_status(self, task_id, completed):
-        """Обновление статуса задачи"""
-        self.db.update_task_status(task_id, completed)
+        """Обновление статуса задачи (быстрые переключения сливаются в одну запись)"""
+        self.persistence.submit(
+            self.db.update_task_status, task_id, completed,
+            key=('task_status', task_id),
+            error_callback=self.show_persistence_error
+        )
+    
+    def show_persistence_error(self, error):
+        """Ошибка фоновой записи в БД"""
+        messagebox.showerror("❌ Ошибка сохранения", f"Не удалось сохранить данные:\n{error}")
     
     def show_automation(self):
         """Показать автоматизацию"""
-        self.clear_main_content()
-        self.highlight_nav_button(5)
-        
+        self.activate_section(5, self.build_automation)
+    
+    def build_automation(self):
+        """Сборка раздела автоматизации"""
         header_frame = tk.Frame(self.main_content, bg=self.colors['background'], pady=20)
         header_frame.pack(fill='x')
         
@@ -2899,9 +6188,16 @@ class PremiumYouTubePromoGUI:
     
     def show_simulation(self):
         """Показать симуляцию с визуальными эффектами"""
-        self.clear_main_content()
-        self.highlight_nav_button(6)
-        
+        self.activate_section(6, self.build_simulation, return_action=self.run_extended_simulation)
+    
+    def simulation_subtitle(self):
+        """Подзаголовок симуляции с текущим числом подписчиков"""
+        if self.promoter.stats['subscribers'] == 0:
+            return "🎯 Запустите первую симуляцию для роста канала с нуля!"
+        return f"📊 Текущие подписчики: {self.promoter.stats['subscribers']}. Продолжаем рост!"
+    
+    def build_simulation(self):
+        """Сборка раздела симуляции (прогресс и результаты переживают переключение разделов)"""
         header_frame = tk.Frame(self.main_content, bg=self.colors['background'], pady=20)
         header_frame.pack(fill='x')
         
@@ -2914,14 +6210,9 @@ class PremiumYouTubePromoGUI:
         ).pack(anchor='w')
         
         # Динамический подзаголовок
-        if self.promoter.stats['subscribers'] == 0:
-            subtitle = "🎯 Запустите первую симуляцию для роста канала с нуля!"
-        else:
-            subtitle = f"📊 Текущие подписчики: {self.promoter.stats['subscribers']}. Продолжаем рост!"
-        
         tk.Label(
             header_frame,
-            text=subtitle,
+            textvariable=self.bind_text('simulation.subtitle', self.simulation_subtitle()),
             font=('Segoe UI', 13),
             bg=self.colors['background'],
             fg=self.colors['text_secondary']
@@ -2966,9 +6257,6 @@ class PremiumYouTubePromoGUI:
         )
         hours_entry.pack(side='left', padx=(0, 20))
         
-        # Привязываем Enter в поле ввода
-        hours_entry.bind('<Return>', lambda e: self.run_extended_simulation())
-        
         tk.Label(
             hours_frame,
             text="(1-72 часов, Enter для запуска)",
@@ -2977,6 +6265,33 @@ class PremiumYouTubePromoGUI:
             fg=self.colors['text_secondary']
         ).pack(side='left')
         
+        # Темп симуляции
+        pacing_frame = tk.Frame(sim_container, bg=self.colors['card_bg'])
+        pacing_frame.pack(fill='x', pady=(0, 20))
+        
+        tk.Label(
+            pacing_frame,
+            text="Темп:",
+            font=('Segoe UI', 13),
+            bg=self.colors['card_bg'],
+            fg=self.colors['text_secondary']
+        ).pack(side='left', padx=(0, 10))
+        
+        self.sim_pacing_options = {
+            "🎬 Демо (0.5 с на этап)": PACING_PACED,
+            "⚡ Быстро (без пауз)": PACING_FAST,
+            f"⏱️ Реальное время ×{DEFAULT_TIME_SCALE}": PACING_REALTIME
+        }
+        self.sim_pacing = tk.StringVar(value=next(iter(self.sim_pacing_options)))
+        
+        ttk.Combobox(
+            pacing_frame,
+            textvariable=self.sim_pacing,
+            values=list(self.sim_pacing_options),
+            state="readonly",
+            width=30
+        ).pack(side='left')
+        
         # Предварительный прогноз результатов
         if self.promoter.stats['subscribers'] == 0:
             forecast_frame = tk.Frame(sim_container, bg=self.colors['card_bg'], pady=20)
@@ -3060,9 +6375,6 @@ class PremiumYouTubePromoGUI:
             state='disabled'
         )
         self.stop_sim_btn.pack(fill='x')
-        
-        # Привязываем Enter для запуска симуляции
-        self.root.bind('<Return>', lambda e: self.run_extended_simulation())
     
     def run_extended_simulation(self):
         """Запуск расширенной симуляции"""
@@ -3090,10 +6402,15 @@ class PremiumYouTubePromoGUI:
                     fg=self.colors['accent']
                 )
             
+            pacing = self.sim_pacing_options.get(self.sim_pacing.get(), PACING_PACED)
+            
+            # Флаг остановки сбрасывается до старта потока: стоп до начала прогона не теряется
+            self.promoter.prepare_simulation()
+            
             # Запускаем симуляцию в отдельном потоке
             thread = threading.Thread(
                 target=self._run_simulation_thread,
-                args=(hours,),
+                args=(hours, pacing),
                 daemon=True
             )
             thread.start()
@@ -3104,20 +6421,21 @@ class PremiumYouTubePromoGUI:
     def stop_simulation(self):
         """Остановка симуляции"""
         if self.promoter:
-            self.promoter.simulation_active = False
+            self.promoter.stop_simulation()
             self.stop_sim_btn.config(state='disabled')
             self.current_stage_label.config(
                 text="⏹️ Симуляция остановлена",
                 fg=self.colors['warning']
             )
     
-    def _run_simulation_thread(self, hours):
+    def _run_simulation_thread(self, hours, pacing=PACING_PACED):
         """Поток для выполнения симуляции"""
         try:
             # Запускаем расширенную симуляцию
             results = self.promoter.run_extended_simulation(
                 hours,
-                update_callback=self.update_simulation_progress
+                update_callback=self.update_simulation_progress,
+                pacing=pacing
             )
             
             # Показываем результаты
@@ -3126,6 +6444,9 @@ class PremiumYouTubePromoGUI:
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("❌ Ошибка", f"Ошибка симуляции: {str(e)}"))
         finally:
+            # Возвращаем соединение потока симуляции в пул
+            self.promoter.db.release_connection()
+            
             # Включаем кнопку старта, отключаем стоп
             self.root.after(0, lambda: self.start_sim_btn.config(state='normal'))
             self.root.after(0, lambda: self.stop_sim_btn.config(state='disabled'))
@@ -3135,7 +6456,8 @@ class PremiumYouTubePromoGUI:
         if not self.promoter.simulation_active:
             return
         
-        progress = int((current / total) * 100)
+        # Этап current только начался: завершено current - 1 этапов из total
+        progress = int(((current - 1) / total) * 100)
         
         # Обновляем UI в основном потоке
         self.root.after(0, lambda: self.sim_progress_bar.config(value=progress))
@@ -3168,6 +6490,7 @@ class PremiumYouTubePromoGUI:
             ⏱️ Общее время просмотра: +{results['views'] * 0.05:.0f} часов
             
             🚀 Отличное начало! Канал запущен успешно!
+            🎲 Seed прогона: {results.get('seed')}
             """
         else:
             results_text = f"""
@@ -3183,6 +6506,7 @@ class PremiumYouTubePromoGUI:
             ⏱️ Общее время просмотра: +{results['views'] * 0.05:.0f} часов
             
             📈 Всего подписчиков: {self.promoter.stats['subscribers']:,}
+            🎲 Seed прогона: {results.get('seed')}
             """
         
         for widget in self.results_frame.winfo_children():
@@ -3199,10 +6523,10 @@ class PremiumYouTubePromoGUI:
         )
         results_label.pack(anchor='w', pady=10)
         
-        # Кнопка для обновления дашборда
+        # Дашборд уже обновлен событиями статистики - кнопка только переходит к нему
         tk.Button(
             self.results_frame,
-            text="📊 Обновить дашборд (F5)",
+            text="📊 Перейти к дашборду",
             font=('Segoe UI', 12, 'bold'),
             bg=self.colors['accent'],
             fg='white',
@@ -3215,9 +6539,10 @@ class PremiumYouTubePromoGUI:
     
     def show_reports(self):
         """Показать отчеты"""
-        self.clear_main_content()
-        self.highlight_nav_button(7)
-        
+        self.activate_section(7, self.build_reports)
+    
+    def build_reports(self):
+        """Сборка раздела отчетов"""
         header_frame = tk.Frame(self.main_content, bg=self.colors['background'], pady=20)
         header_frame.pack(fill='x')
         
@@ -3241,17 +6566,10 @@ class PremiumYouTubePromoGUI:
         main_frame = tk.Frame(self.main_content, bg=self.colors['card_bg'], padx=30, pady=30)
         main_frame.pack(fill='both', expand=True)
         
-        # Типы отчетов
-        reports = [
-            ("📈 Еженедельный отчет", "Полная статистика за неделю", "PDF, Excel"),
-            ("💰 Отчет по доходам", "Детализация доходов и монетизация", "Excel"),
-            ("🎬 Отчет по контенту", "Анализ опубликованного контента", "PDF"),
-            ("📊 Анализ аудитории", "Демография и поведение зрителей", "PDF, Excel"),
-            ("🚀 Отчет по росту", "Динамика роста канала", "PDF, Excel"),
-            ("⚡ Быстрый отчет", "Краткий обзор ключевых метрик", "PDF")
-        ]
+        # Типы отчетов (Excel без pandas/openpyxl заменяется CSV)
+        format_names = {'pdf': "PDF", 'excel': "Excel" if excel_available() else "CSV"}
         
-        for i, (name, description, formats) in enumerate(reports):
+        for i, (report_type, (icon, name, description, formats)) in enumerate(REPORT_TYPES.items()):
             report_frame = tk.Frame(main_frame, bg=self.colors['card_bg'], pady=15)
             report_frame.pack(fill='x')
             
@@ -3270,7 +6588,7 @@ class PremiumYouTubePromoGUI:
             
             tk.Label(
                 desc_frame,
-                text=name,
+                text=f"{icon} {name}",
                 font=('Segoe UI', 14, 'bold'),
                 bg=self.colors['card_bg'],
                 fg=self.colors['text']
@@ -3287,7 +6605,7 @@ class PremiumYouTubePromoGUI:
             # Форматы
             tk.Label(
                 desc_frame,
-                text=f"📁 Форматы: {formats}",
+                text=f"📁 Форматы: {', '.join(format_names[fmt] for fmt in formats)}",
                 font=('Segoe UI', 11),
                 bg=self.colors['card_bg'],
                 fg=self.colors['accent']
@@ -3302,7 +6620,7 @@ class PremiumYouTubePromoGUI:
                 fg='white',
                 relief='flat',
                 cursor='hand2',
-                command=lambda n=name: self.generate_report(n),
+                command=lambda t=report_type: self.generate_report(t),
                 padx=15,
                 pady=5
             ).pack(side='right')
@@ -3321,40 +6639,101 @@ class PremiumYouTubePromoGUI:
             padx=30
         ).pack(pady=30)
     
-    def generate_report(self, report_name):
-        """Генерация отчета"""
-        filename = f"{report_name.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-        messagebox.showinfo(
-            "📊 Отчет готов", 
-            f"Отчет '{report_name}' успешно сгенерирован!\n\n"
-            f"📁 Файл: {filename}\n"
-            f"📊 Данные: Использована актуальная статистика\n"
-            f"⚡ Создан: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
-        )
+    def generate_report(self, report_type):
+        """Генерация одного отчета"""
+        self.start_report_job([report_type])
     
     def generate_all_reports(self):
-        """Генерация всех отчетов"""
+        """Генерация всех отчетов (параллельно в процессах из одного снимка данных)"""
+        self.start_report_job(list(REPORT_TYPES))
+    
+    def start_report_job(self, report_types):
+        """Снимок данных через очередь фоновой записи, рендер - в отдельном потоке
+
+        Снимок берется после всех поставленных в очередь записей; долгий
+        рендер не задерживает ни Tk, ни очередь записи.
+        """
+        def render(snapshot):
+            def worker():
+                try:
+                    summary = ReportEngine(self.db).render(snapshot, report_types)
+                except Exception as e:
+                    self.root.after(0, self.show_report_error, e)
+                else:
+                    self.root.after(0, self.show_report_result, summary)
+            
+            threading.Thread(target=worker, name="reports", daemon=True).start()
+        
+        self.persistence.submit(
+            self.promoter.get_report_snapshot, REPORT_PERIOD_DAYS,
+            callback=render,
+            error_callback=self.show_report_error
+        )
+    
+    def show_report_result(self, summary):
+        """Список созданных файлов и время каждого отчета"""
+        lines = []
+        for report_type, report in summary['reports'].items():
+            icon, name = REPORT_TYPES[report_type][:2]
+            files = ", ".join(os.path.basename(path) for path in report['files'])
+            lines.append(f"{icon} {name} - {report['seconds']:.2f} с\n    {files}")
+        
         messagebox.showinfo(
-            "🚀 Все отчеты готовы", 
-            "Все отчеты успешно сгенерированы!\n\n"
-            "📁 Создано файлов: 6\n"
-            "📊 Форматы: PDF и Excel\n"
-            "📂 Сохранено в папке: youtube_reports/\n\n"
-            "Готовы к скачиванию и анализу!"
+            "📊 Отчеты готовы",
+            "\n".join(lines) + "\n\n"
+            f"📂 Папка: {summary['directory']}/\n"
+            f"⚡ Всего: {summary['render_sec']:.2f} с, процессов: {summary['workers']}"
         )
     
+    def show_report_error(self, error):
+        """Ошибка генерации отчетов"""
+        messagebox.showerror("❌ Ошибка отчета", f"Не удалось сформировать отчет:\n{error}")
+    
     def update_stats(self):
-        """Обновление статистики"""
-        self.show_dashboard()
+        """Обновление статистики (изменения других процессов приходят событиями stats)"""
+        self.promoter.refresh_stats()
         messagebox.showinfo("🔄 Обновлено", "Статистика канала обновлена!")
     
     def export_data(self):
-        """Экспорт данных"""
-        filename = f"youtube_data_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        """Экспорт данных пользователя в CSV
+
+        Выгрузка идет в отдельном потоке со своим соединением из пула: ни Tk,
+        ни очередь фоновой записи ее не ждут. Поток запускается колбэком
+        пустой операции очереди, поэтому все поставленные раньше записи уже
+        будут в БД к началу экспорта.
+        """
+        if self.promoter is None:
+            return
+        
+        user_id = self.auth.current_user_data['id']
+        output_dir = os.path.join(EXPORT_DIR, f"youtube_data_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        
+        def worker():
+            try:
+                summary = DataExporter(self.db).export(user_id, output_dir)
+            except Exception as e:
+                self.root.after(0, self.show_export_error, e)
+            else:
+                self.root.after(0, self.show_export_result, summary)
+            finally:
+                self.db.release_connection()
+        
+        self.persistence.submit(
+            lambda: None,
+            callback=lambda _: threading.Thread(target=worker, name="export", daemon=True).start()
+        )
+    
+    def show_export_error(self, error):
+        """Сообщение о неудачном экспорте"""
+        messagebox.showerror("❌ Ошибка экспорта", f"Не удалось экспортировать данные:\n{error}")
+    
+    def show_export_result(self, summary):
+        """Сводка завершенного экспорта"""
+        tables = "\n".join(f"• {table}: {count:,} записей" for table, count in summary['rows'].items())
         messagebox.showinfo("📤 Экспорт данных", 
             f"Данные успешно экспортированы!\n\n"
-            f"Файл: {filename}\n"
-            f"Записей: {len(self.promoter.analytics_data) if self.promoter else 0}\n"
+            f"Папка: {summary['directory']}\n"
+            f"{tables}\n\n"
             f"Формат: CSV (Excel)"
         )
     
@@ -3552,8 +6931,14 @@ class PremiumYouTubePromoGUI:
         """Выход из системы"""
         if messagebox.askyesno("🚪 Выход", "Вы уверены, что хотите выйти из системы?"):
             self.auth.logout()
+            self.clear_main_content()
+            self.promoter.stats.unsubscribe(self.on_stats_changed)
             self.promoter = None
             
+            if self.chart_manager is not None:
+                self.chart_manager.close()
+                self.chart_manager = None
+            
             # Сбрасываем полноэкранный режим
             self.root.attributes('-fullscreen', False)
             
@@ -3647,9 +7032,10 @@ class PremiumYouTubePromoGUI:
         text_widget.config(state='disabled')
     
     def clear_main_content(self):
-        """Очистка основной области содержимого"""
-        for widget in self.main_content.winfo_children():
-            widget.destroy()
+        """Очистка основной области: уничтожение всех кэшированных разделов"""
+        for index in list(self.sections):
+            self.drop_section(index)
+        self.bound_vars = {}
     
     def highlight_nav_button(self, index):
         """Подсветка активной кнопки навигации"""
@@ -3675,12 +7061,1014 @@ class PremiumYouTubePromoGUI:
             y = (self.root.winfo_screenheight() // 2) - (height // 2)
             self.root.geometry(f'{width}x{height}+{x}+{y}')
         
+        # Закрытие окна завершает главный цикл; окно уничтожается после записи очереди
+        self.root.protocol("WM_DELETE_WINDOW", self.root.quit)
+        
         # Запускаем главный цикл
         self.root.mainloop()
+        
+        # Дописываем фоновую очередь и журнал, закрываем графики и соединения с БД
+        self.persistence.shutdown()
+        flush_activity_log()
+        if self.chart_manager is not None:
+            self.chart_manager.close()
+        self.db.close()
+        self.root.destroy()
 
-# ================ ЗАПУСК ПРОГРАММЫ ================
+# ================ БЕНЧМАРКИ ================
 
-if __name__ == "__main__":
+def _ops_per_second(operation, count):
+    """Выполняет операцию count раз и возвращает число операций в секунду"""
+    started = time.perf_counter()
+    for i in range(count):
+        operation(i)
+    elapsed = time.perf_counter() - started
+    return count / elapsed if elapsed > 0 else float('inf')
+
+def benchmark_database(operations=2000):
+    """Сравнение connect-per-call (старая схема) и пула соединений Database
+
+    Смешанная нагрузка: чтение последней статистики и запись снимка
+    статистики, как при симуляции роста.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        db = Database(db_path)
+        _, user_id = db.save_user("bench", "hash")
+        stats = db.get_latest_channel_stats(user_id)
+        
+        insert_sql = '''
+        INSERT INTO channel_stats 
+        (user_id, total_views, subscribers, total_likes, total_comments, 
+         videos_uploaded, estimated_earnings, engagement_rate, watch_time_hours)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        select_sql = 'SELECT * FROM channel_stats WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1'
+        
+        def legacy_operation(i):
+            # Так работали методы Database до пула: connect/execute/close на каждый вызов
+            conn = sqlite3.connect(db_path)
+            cursor = conn.cursor()
+            if i % 2:
+                cursor.execute(insert_sql, (user_id, i, i, i, i, 0, 0.0, 0.0, 0.0))
+                conn.commit()
+            else:
+                cursor.execute(select_sql, (user_id,))
+                cursor.fetchone()
+            conn.close()
+        
+        def pooled_operation(i):
+            if i % 2:
+                # Меняем статистику, иначе неизменный снимок не записывается
+                stats['total_views'] = i
+                db.save_channel_stats(user_id, stats)
+            else:
+                db.get_latest_channel_stats(user_id)
+        
+        legacy = _ops_per_second(legacy_operation, operations)
+        pooled = _ops_per_second(pooled_operation, operations)
+        db.close()
+    
+    return {
+        'operations': operations,
+        'legacy_ops_per_sec': round(legacy, 1),
+        'pooled_ops_per_sec': round(pooled, 1),
+        'speedup': round(pooled / legacy, 2)
+    }
+
+def benchmark_storage_contention(duration=2.0, readers=2, storage_profiles=('compat', 'balanced')):
+    """Конкурентный доступ: поток-писатель (как поток симуляции) и потоки-читатели (как GUI)
+
+    Для каждого профиля хранения возвращает число чтений и записей в секунду
+    и максимальную задержку чтения.
+    """
+    results = {}
+    
+    for profile in storage_profiles:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = Database(os.path.join(tmp_dir, "bench.db"), pool_size=readers + 1, storage_profile=profile)
+            _, user_id = db.save_user("bench", "hash")
+            stats = db.get_latest_channel_stats(user_id)
+            
+            stop_event = threading.Event()
+            counters = {'reads': 0, 'writes': 0, 'max_read_ms': 0.0, 'errors': 0}
+            counters_lock = threading.Lock()
+            
+            def writer():
+                try:
+                    while not stop_event.is_set():
+                        try:
+                            db.save_channel_stats(user_id, stats)
+                            db.save_simulation(user_id, 1, {'subscribers': 1, 'views': 10})
+                        except sqlite3.OperationalError:
+                            with counters_lock:
+                                counters['errors'] += 1
+                            continue
+                        with counters_lock:
+                            counters['writes'] += 1
+                finally:
+                    db.release_connection()
+            
+            def reader():
+                try:
+                    while not stop_event.is_set():
+                        started = time.perf_counter()
+                        try:
+                            db.get_latest_channel_stats(user_id)
+                            db.get_simulation_history(user_id, limit=30)
+                        except sqlite3.OperationalError:
+                            with counters_lock:
+                                counters['errors'] += 1
+                            continue
+                        latency_ms = (time.perf_counter() - started) * 1000
+                        with counters_lock:
+                            counters['reads'] += 1
+                            counters['max_read_ms'] = max(counters['max_read_ms'], latency_ms)
+                finally:
+                    db.release_connection()
+            
+            threads = [threading.Thread(target=writer)]
+            threads += [threading.Thread(target=reader) for _ in range(readers)]
+            for thread in threads:
+                thread.start()
+            time.sleep(duration)
+            stop_event.set()
+            for thread in threads:
+                thread.join()
+            db.close()
+        
+        results[profile] = {
+            'reads_per_sec': round(counters['reads'] / duration, 1),
+            'writes_per_sec': round(counters['writes'] / duration, 1),
+            'max_read_ms': round(counters['max_read_ms'], 2),
+            'busy_errors': counters['errors']
+        }
+    
+    return results
+
+def benchmark_forecast(scenarios=10000, hours=24 * 365, seed=42):
+    """Время Monte-Carlo прогноза: scenarios траекторий x hours часовых шагов"""
+    forecast = GrowthForecaster(scenarios=scenarios, seed=seed).run(empty_channel_stats(), hours)
+    elapsed = forecast['elapsed_sec']
+    
+    return {
+        'scenarios': scenarios,
+        'steps': int(forecast['hours']),
+        'elapsed_sec': round(elapsed, 3),
+        'trajectory_steps_per_sec': round(scenarios * forecast['hours'] / elapsed),
+        'median_subscribers': forecast['final']['subscribers'][50]
+    }
+
+def benchmark_batch_simulation(channels=200, hours=24 * 30, workers=None):
+    """Пропускная способность пакетной симуляции (каналов/сек): 1 процесс против пула
+
+    replayed - сколько прогонов последовательного запуска повторено из БД
+    (replay_stored_simulation) с той же итоговой статистикой.
+    """
+    workers = workers or os.cpu_count() or 1
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "bench.db"))
+        user_ids = [db.save_user(f"bench{i}", "hash")[1] for i in range(channels)]
+        
+        serial = BatchSimulationRunner(db, workers=1, seed=1).run(user_ids, hours)
+        replayed = 0
+        for user_id in user_ids:
+            replay = replay_stored_simulation(db, user_id, serial['seeds'][user_id])
+            if replay is not None and replay[0] == db.get_latest_channel_stats(user_id):
+                replayed += 1
+        parallel = BatchSimulationRunner(db, workers=workers, seed=1).run(user_ids, hours)
+        db.close()
+    
+    return {
+        'channels': channels,
+        'hours': hours,
+        'workers': workers,
+        'serial_channels_per_sec': serial['channels_per_sec'],
+        'parallel_channels_per_sec': parallel['channels_per_sec'],
+        'speedup': round(parallel['channels_per_sec'] / serial['channels_per_sec'], 2),
+        'replayed': f"{replayed}/{channels}"
+    }
+
+def benchmark_persistence_queue(writes=300, storage_profile='durable'):
+    """Время блокировки вызывающего потока: прямая запись против PersistenceQueue
+
+    Профиль durable (fsync на каждый коммит) имитирует медленный диск.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "bench.db"), storage_profile=storage_profile)
+        _, user_id = db.save_user("bench", "hash")
+        
+        def direct_write(i):
+            db.save_task(user_id, f"Задача {i}", "", None, 2)
+        
+        direct = _ops_per_second(direct_write, writes)
+        
+        persistence = PersistenceQueue(db)
+        
+        def queued_write(i):
+            persistence.submit(db.save_task, user_id, f"Задача {i}", "", None, 2)
+        
+        queued = _ops_per_second(queued_write, writes)
+        persistence.shutdown()
+        metrics = persistence.metrics()
+        db.close()
+    
+    return {
+        'writes': writes,
+        'direct_block_ms': round(1000 / direct, 3),
+        'queued_block_ms': round(1000 / queued, 3),
+        'queue_avg_latency_ms': metrics['avg_latency_ms'],
+        'queue_max_depth': metrics['max_depth']
+    }
+
+def benchmark_activity_log(events=20000):
+    """Пропускная способность журнала активности, событий/с
+
+    Прежняя схема (открыть файл, дописать строку, закрыть на каждое событие)
+    против ActivityLogSink: время emit() в вызывающем потоке и полное время
+    до записи на диск (включая close()). Маленький max_bytes включает ротацию.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_path = os.path.join(tmp_dir, "legacy.log")
+        
+        def legacy_write(i):
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            with open(legacy_path, 'a', encoding='utf-8') as f:
+                f.write(f"[{timestamp}] [bench] GROWTH_SIMULATED: 1 hours: +{i} subs\n")
+        
+        legacy = _ops_per_second(legacy_write, events)
+        
+        sink = ActivityLogSink(os.path.join(tmp_dir, LOG_FILE_NAME), max_bytes=256 * 1024, backup_count=3)
+        
+        def buffered_write(i):
+            sink.emit({'ts': datetime.now().isoformat(timespec='milliseconds'), 'user_id': 'bench',
+                       'activity': 'GROWTH_SIMULATED', 'details': f"1 hours: +{i} subs",
+                       'hours': 1, 'subscribers': i})
+        
+        start = time.perf_counter()
+        emitted = _ops_per_second(buffered_write, events)
+        sink.close()
+        total = time.perf_counter() - start
+        metrics = sink.metrics()
+        files = sorted(os.listdir(tmp_dir))
+    
+    return {
+        'events': events,
+        'legacy_events_per_sec': round(legacy),
+        'sink_emit_events_per_sec': round(emitted),
+        'sink_total_events_per_sec': round(events / total),
+        'flushes': metrics['flushes'],
+        'rotations': metrics['rotations'],
+        'files': files
+    }
+
+def benchmark_activity_events(events=100000, users=10, days=30):
+    """Метрики активности пользователя: разбор JSONL-журнала против activity_events
+
+    Те же events событий (users пользователей, days дней) записываются в
+    JSONL-файл и в activity_events; сравнивается время подсчета событий
+    одного пользователя по дням полным чтением файла и индексным запросом.
+    """
+    now = time.time()
+    records = []
+    for i in range(events):
+        ts = datetime.fromtimestamp(now - (i // users % days) * 86400 - i % 3600, timezone.utc)
+        record = {'ts': ts.isoformat(timespec='milliseconds'), 'user_id': f"user{i % users}",
+                  'activity': 'CONTENT_GENERATED' if i % 3 else 'GROWTH_SIMULATED', 'details': ""}
+        if i % 3:
+            record.update(category='gaming', keyword='Minecraft')
+        else:
+            record.update(hours=1, subscribers=i % 15, views=i % 300)
+        records.append(record)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, LOG_FILE_NAME)
+        with open(log_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        
+        db = Database(os.path.join(tmp_dir, "bench.db"))
+        started = time.perf_counter()
+        for start in range(0, events, LOG_BUFFER_EVENTS):
+            db.save_activity_events(records[start:start + LOG_BUFFER_EVENTS])
+        insert_sec = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        counts = {}
+        with open(log_path, encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if record['user_id'] == 'user0':
+                    key = (record['ts'][:10], record['activity'])
+                    counts[key] = counts.get(key, 0) + 1
+        scan_ms = (time.perf_counter() - started) * 1000
+        
+        started = time.perf_counter()
+        summary = db.get_activity_summary('user0', days)
+        query_ms = (time.perf_counter() - started) * 1000
+        db.close()
+    
+    return {
+        'events': events,
+        'insert_events_per_sec': round(events / insert_sec),
+        'jsonl_scan_ms': round(scan_ms, 2),
+        'indexed_query_ms': round(query_ms, 2),
+        'user_events': sum(summary['totals'].values()),
+        'active_days': summary['active_days']
+    }
+
+def benchmark_content_batch(drafts=300, storage_profile='durable'):
+    """Черновики в секунду: generate_video_content в цикле против пакетной генерации
+
+    Поштучно - две транзакции на черновик (контент и снимок статистики),
+    пакетом - одна транзакция на все. Профиль durable (fsync на коммит)
+    делает стоимость транзакции заметной.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "bench.db"), storage_profile=storage_profile)
+        sink = ActivityLogSink(os.path.join(tmp_dir, LOG_FILE_NAME))
+        
+        single = YouTubeAutoPromoter("single", "single", db, seed=1, activity_log=sink)
+        started = time.perf_counter()
+        for _ in range(drafts):
+            single.generate_video_content('gaming')
+        single_sec = time.perf_counter() - started
+        
+        batch = YouTubeAutoPromoter("batch", "batch", db, seed=1, activity_log=sink)
+        started = time.perf_counter()
+        batch.generate_video_content_batch('gaming', n=drafts)
+        batch_sec = time.perf_counter() - started
+        
+        sink.close()
+        db.close()
+    
+    return {
+        'drafts': drafts,
+        'single_drafts_per_sec': round(drafts / single_sec),
+        'batch_drafts_per_sec': round(drafts / batch_sec),
+        'speedup': round(single_sec / batch_sec, 1)
+    }
+
+def benchmark_content_render(renders=20000, large_templates=5000):
+    """Рендеров контента в секунду: прежняя генерация против ContentCatalog
+
+    Рендер - заголовок, описание, хештеги и тайм-коды. Прежняя схема
+    (str.format, склейка списков хештегов, списки тайм-кодов на каждый
+    вызов) повторена здесь. Оба варианта меряются на встроенном каталоге и
+    на каталоге с large_templates шаблонов, фраз и хештегов в категории.
+    """
+    def legacy_renderer(data):
+        def render(rng):
+            keyword = rng.choice(data['keywords']['gaming'])
+            title = rng.choice(data['titles']['gaming']).format(keyword=keyword.upper())
+            description = "\n".join(rng.sample(data['descriptions'], rng.randint(3, 5)))
+            all_hashtags = data['hashtags']['gaming'] + ['#' + keyword.replace(' ', '').lower(), '#gamingканал',
+                                                         '#youtube', '#ютуб', '#новоевидео']
+            hashtags = rng.sample(all_hashtags, min(10, len(all_hashtags)))
+            times = [0, 30, 120, 300, 600]
+            topics = ['Вступление', 'Основная часть', 'Демонстрация', 'Советы', 'Заключение']
+            timecodes = [f"{times[i] // 60}:{str(times[i] % 60).zfill(2)} - {rng.choice(topics)}"
+                         for i in range(rng.randint(3, 5))]
+            return title, description, hashtags, timecodes
+        return render
+    
+    def catalog_renderer(catalog):
+        def render(rng):
+            keyword = catalog.pick_keyword('gaming', rng)
+            return (catalog.render_title('gaming', keyword, rng), catalog.render_description(rng),
+                    catalog.render_hashtags('gaming', keyword, rng), catalog.render_timecodes(rng))
+        return render
+    
+    large = dict(DEFAULT_CONTENT_CATALOG)
+    large['titles'] = {'gaming': [f"🎮 {{keyword}} - ВЫПУСК {i}" for i in range(large_templates)]}
+    large['descriptions'] = [f"Фраза описания {i}\n" for i in range(large_templates)]
+    large['hashtags'] = {'gaming': [f"#тег{i}" for i in range(large_templates)]}
+    large['default_category'] = 'gaming'
+    
+    results = {'renders': renders, 'large_templates': large_templates}
+    for label, data in (('default', DEFAULT_CONTENT_CATALOG), ('large', large)):
+        started = time.perf_counter()
+        catalog = ContentCatalog(data)
+        results[f'{label}_compile_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        
+        for name, render in (('legacy', legacy_renderer(data)), ('catalog', catalog_renderer(catalog))):
+            rng = random.Random(1)
+            started = time.perf_counter()
+            for _ in range(renders):
+                render(rng)
+            results[f'{label}_{name}_renders_per_sec'] = round(renders / (time.perf_counter() - started))
+    
+    return results
+
+def benchmark_title_index(items=100000, lookups=500):
+    """Задержка проверки заголовка на повтор при items сохраненных заголовках
+
+    Заголовки одного пользователя - случайные фразы из 3-5 слов. Проверяются
+    точные повторы (другой регистр и пунктуация), похожие (изменена одна
+    буква) и новые заголовки; время - p50 и p99 на проверку, мс. Отдельно
+    проверяются заголовки без слов: повторы находятся, другие не совпадают.
+    """
+    rng = random.Random(1)
+    alphabet = "абвгдеёжзийклмнопрстуфхцчшщэюяabcdefghijklmnopqrstuvwxyz"
+    
+    def random_title():
+        return ' '.join(''.join(rng.choice(alphabet) for _ in range(rng.randint(4, 9)))
+                        for _ in range(rng.randint(3, 5))).upper()
+    
+    def percentiles(samples):
+        samples.sort()
+        return round(samples[len(samples) // 2] * 1000, 3), round(samples[int(len(samples) * 0.99)] * 1000, 3)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "bench.db"))
+        titles = [random_title() for _ in range(items)]
+        
+        started = time.perf_counter()
+        for start in range(0, items, CONTENT_BATCH_MAX):
+            db.save_video_content_batch("bench", [(title, "", 'gaming', "") for title in titles[start:start + CONTENT_BATCH_MAX]])
+        insert_sec = time.perf_counter() - started
+        
+        # Заголовки без слов: у эмодзи и пунктуации нет 3-грамм слов, у пустого - вовсе
+        symbols = ["🎮🎮", "🔥🔥🔥", "!!!", "?!", ""]
+        db.save_video_content_batch("bench", [(title, "", 'gaming', "") for title in symbols])
+        
+        index = TitleIndex(db)
+        probes = {
+            'exact': [f"🎮 {title.lower()}!" for title in rng.sample(titles, lookups)],
+            'near': [title[:-1] + ('Я' if title[-1] != 'Я' else 'Ю') for title in rng.sample(titles, lookups)],
+            'new': [random_title() for _ in range(lookups)]
+        }
+        
+        results = {'items': items, 'insert_titles_per_sec': round(items / insert_sec)}
+        for kind, batch in probes.items():
+            samples, found = [], 0
+            for title in batch:
+                started = time.perf_counter()
+                found += index.find_duplicate("bench", title) is not None
+                samples.append(time.perf_counter() - started)
+            p50, p99 = percentiles(samples)
+            results[kind] = {'p50_ms': p50, 'p99_ms': p99, 'detected': f"{found}/{lookups}"}
+        
+        found = sum(index.find_duplicate("bench", title) is not None for title in symbols)
+        distinct = sum(index.find_duplicate("bench", title) is None for title in ("🎮", "🔥🔥", "!?"))
+        results['symbols'] = {'detected': f"{found}/{len(symbols)}", 'distinct': f"{distinct}/3"}
+        db.close()
+    
+    return results
+
+def benchmark_paged_list(rows=20000, page_size=PAGE_SIZE):
+    """Выборка страницы глубоко в списке: keyset-курсор против LIMIT/OFFSET
+
+    Время последней страницы истории симуляций из rows строк одного
+    пользователя (середина и конец списка).
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "bench.db"))
+        user_id = "bench"
+        conn = db.get_connection()
+        with conn:
+            conn.executemany('''
+            INSERT INTO simulation_history 
+            (user_id, timestamp, simulation_hours, new_subscribers, new_views, new_likes, new_comments)
+            VALUES (?, datetime('2024-01-01', '+' || ? || ' minutes'), 1, ?, ?, 0, 0)
+            ''', [(user_id, i, i % 97, i % 1013) for i in range(rows)])
+        
+        # Курсоры, до которых дошла бы прокрутка
+        cursors = {}
+        cursor = None
+        for page in range(rows // page_size):
+            batch = db.get_page('simulation_history', user_id, cursor=cursor, limit=page_size)
+            cursor = (batch[-1][1], batch[-1][0])
+            cursors[page + 1] = cursor
+        
+        offset_sql = ('SELECT * FROM simulation_history WHERE user_id = ? '
+                      'ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?')
+        results = {}
+        for label, page in (('middle', rows // page_size // 2), ('end', rows // page_size - 1)):
+            started = time.perf_counter()
+            db.get_page('simulation_history', user_id, cursor=cursors[page], limit=page_size)
+            keyset = time.perf_counter() - started
+            
+            started = time.perf_counter()
+            conn.execute(offset_sql, (user_id, page_size, page * page_size)).fetchall()
+            offset = time.perf_counter() - started
+            
+            results[label] = {'keyset_ms': round(keyset * 1000, 3), 'offset_ms': round(offset * 1000, 3)}
+        db.close()
+    
+    return {'rows': rows, 'page_size': page_size, **results}
+
+def benchmark_export(rows=100000):
+    """Потоковый экспорт: строки в секунду и пик памяти Python
+
+    История симуляций из rows строк выгружается в CSV (и в Parquet, если
+    установлен pyarrow). Пик tracemalloc при выгрузке rows // 10 строк и
+    остальных строк показывает, что память не растет с размером таблицы.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "bench.db"))
+        user_id = "bench"
+        with db.get_connection() as conn:
+            conn.executemany('''
+            INSERT INTO simulation_history 
+            (user_id, timestamp, simulation_hours, new_subscribers, new_views, new_likes, new_comments)
+            VALUES (?, datetime('2024-01-01', '+' || ? || ' minutes'), 1, ?, ?, ?, ?)
+            ''', [(user_id, i, i % 97, i % 1013, i % 31, i % 7) for i in range(rows)])
+        
+        exporter = DataExporter(db)
+        results = {'rows': rows}
+        formats = EXPORT_FORMATS if parquet_available() else ('csv',)
+        for fmt in formats:
+            summary = exporter.export(user_id, os.path.join(tmp_dir, fmt), fmt=fmt, tables=('simulation_history',))
+            results[f"{fmt}_rows_per_sec"] = round(rows / summary['seconds']) if summary['seconds'] else None
+        
+        # Пик памяти: десятая часть таблицы против всей таблицы
+        with db.get_connection() as conn:
+            conn.execute("UPDATE simulation_history SET user_id = 'small' WHERE user_id = ? AND id <= ?", (user_id, rows // 10))
+        for label, export_user in (('small', 'small'), ('full', user_id)):
+            tracemalloc.start()
+            exporter.export(export_user, os.path.join(tmp_dir, f"peak_{label}"), tables=('simulation_history',))
+            results[f"peak_kb_{label}"] = round(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+        db.close()
+    
+    return results
+
+def benchmark_reports(days=REPORT_PERIOD_DAYS, runs_per_day=24):
+    """Генерация всех отчетов: последовательно и в процессах из одного снимка
+
+    История из days дней по runs_per_day симуляций; для обоих режимов
+    выводится время снимка, рендера и каждого отчета.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "bench.db"))
+        _, user_id = db.save_user("bench", "hash")
+        
+        rng = random.Random(1)
+        stats = empty_channel_stats()
+        stats_rows, simulation_rows = [], []
+        start = time.time() - days * 86400
+        for i in range(days * runs_per_day):
+            timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(start + i * 86400 / runs_per_day))
+            growth = apply_growth_step(stats, 1, rng)
+            stats_rows.append((user_id, timestamp, *(stats[field] for field in CHANNEL_STATS_FIELDS)))
+            simulation_rows.append((user_id, timestamp, 1, growth['subscribers'], growth['views'],
+                                    growth['likes'], growth['comments'], None, None, 1))
+        db.save_simulation_batch(stats_rows, simulation_rows)
+        
+        results = {'simulations': len(simulation_rows)}
+        for label, workers in (('sequential', 1), ('parallel', len(REPORT_TYPES))):
+            summary = ReportEngine(db, output_dir=os.path.join(tmp_dir, label), workers=workers,
+                                   period_days=days).generate(user_id)
+            results[label] = {
+                'workers': summary['workers'],
+                'snapshot_sec': summary['snapshot_sec'],
+                'total_sec': summary['total_sec'],
+                'reports_sec': {report_type: report['seconds'] for report_type, report in summary['reports'].items()}
+            }
+        db.close()
+    
+    return results
+
+def benchmark_stats_cache(reads=5000):
+    """Чтения текущей статистики: напрямую из БД против ChannelStatsCache
+
+    Трассировка SQL показывает, что повторные чтения через кэш выполняют
+    только PRAGMA data_version и не читают таблицы.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(os.path.join(tmp_dir, "bench.db"))
+        _, user_id = db.save_user("bench", "hash")
+        
+        statements = []
+        conn = db.get_connection()
+        conn.set_trace_callback(statements.append)
+        
+        direct = _ops_per_second(lambda i: db._read_latest_channel_stats(user_id), reads)
+        statements.clear()
+        cached = _ops_per_second(lambda i: db.get_latest_channel_stats(user_id), reads)
+        table_reads = sum(1 for sql in statements if 'data_version' not in sql)
+        
+        conn.set_trace_callback(None)
+        db.close()
+    
+    return {
+        'reads': reads,
+        'direct_reads_per_sec': round(direct, 1),
+        'cached_reads_per_sec': round(cached, 1),
+        'speedup': round(cached / direct, 2),
+        'cached_table_queries': table_reads
+    }
+
+def _rss_mb():
+    """Текущий RSS процесса в МБ (по /proc/self/statm, только Linux)"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+def benchmark_analytics_memory(switches=500, warmup=20):
+    """RSS при многократном открытии раздела аналитики через AnalyticsChartManager
+
+    Каждое переключение обновляет оба графика растущими данными и создает
+    холсты заново, как show_analytics. Без дисплея вместо Tk-холстов
+    используется рендеринг Agg (фигуры и оси переиспользуются так же).
+    """
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError:
+        root = None
+    
+    manager = AnalyticsChartManager()
+    stats = empty_channel_stats()
+    subscribers = []
+    rss_samples = []
+    
+    for i in range(warmup + switches):
+        if i == warmup:
+            rss_samples.append(_rss_mb())
+        
+        stats['total_views'] += 100
+        stats['total_likes'] += 7 + i % 3
+        stats['total_comments'] += 2
+        subscribers.append(i)
+        manager.update_subscriber_chart([f"День {n}" for n in range(len(subscribers))], subscribers)
+        manager.update_engagement_chart(stats)
+        
+        if root is not None:
+            frame = tk.Frame(root)
+            for name in ('subscribers', 'engagement'):
+                manager.attach(name, frame)
+            root.update()
+            manager.release()
+            frame.destroy()
+        else:
+            for name in ('subscribers', 'engagement'):
+                FigureCanvasAgg(manager._figure(name)[0]).draw()
+    
+    rss_samples.append(_rss_mb())
+    manager.close()
+    if root is not None:
+        root.destroy()
+    
+    start_mb, end_mb = rss_samples
+    return {
+        'switches': switches,
+        'canvas': 'TkAgg' if root is not None else 'Agg (нет дисплея)',
+        'rss_start_mb': round(start_mb, 1) if start_mb is not None else None,
+        'rss_end_mb': round(end_mb, 1) if end_mb is not None else None,
+        'rss_growth_mb': round(end_mb - start_mb, 1) if start_mb is not None else None
+    }
+
+# Холодный старт: бюджет импорта модуля (мс) и модули, которых не должно быть при старте
+IMPORT_TIME_BUDGET_MS = 250
+STARTUP_FORBIDDEN_MODULES = ('matplotlib', 'pandas', 'numpy')
+
+def _profile_imports(statement):
+    """Профиль импортов (-X importtime) выполнения statement в новом интерпретаторе
+
+    Возвращает {модуль: (собственное время, суммарное время, уровень)} в мкс.
+    """
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=module_dir, capture_output=True, text=True, check=True
+    )
+    
+    profile = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, raw_name = line[len('import time:'):].split('|')
+        level = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+        profile[raw_name.strip()] = (int(self_us), int(cumulative_us), level)
+    return profile
+
+def benchmark_import_time(budget_ms=IMPORT_TIME_BUDGET_MS, top=5):
+    """Регрессионный бенчмарк холодного старта по профилю -X importtime
+
+    headless - только импорт модуля (консольные команды), gui - плюс модули
+    tkinter, нужные заставке и окну входа. Ни в одном сценарии не должны
+    загружаться matplotlib, pandas и numpy. При within_budget = False
+    команда bench завершается с ошибкой.
+    """
+    module = Path(__file__).stem
+    scenarios = {
+        'headless': f"import {module}",
+        'gui': f"import {module}; {module}.tk.Tk; {module}.ttk.Style; {module}.messagebox.showinfo"
+    }
+    
+    results = {}
+    for name, statement in scenarios.items():
+        profile = _profile_imports(statement)
+        top_level = {mod: cumulative for mod, (_, cumulative, level) in profile.items() if level == 0}
+        total_ms = sum(top_level.values()) / 1000
+        slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:top]
+        forbidden = sorted({mod.split('.')[0] for mod in profile} & set(STARTUP_FORBIDDEN_MODULES))
+        
+        results[name] = {
+            'total_ms': round(total_ms, 1),
+            'slowest_ms': {mod: round(us / 1000, 1) for mod, us in slowest},
+            'forbidden_loaded': forbidden,
+            'within_budget': total_ms <= budget_ms and not forbidden
+        }
+    
+    results['budget_ms'] = budget_ms
+    results['within_budget'] = all(results[name]['within_budget'] for name in scenarios)
+    return results
+
+def benchmark_navigation(rounds=20):
+    """Задержка переключения разделов GUI (Ctrl+1..8)
+
+    Первый проход собирает каждый раздел, дальше переключение - подъем
+    кэшированного фрейма; после изменения статистики измеряется обновление
+    привязанных значений. Время включает отрисовку (update_idletasks).
+    Без дисплея бенчмарк пропускается.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            gui = PremiumYouTubePromoGUI(os.path.join(tmp_dir, "bench.db"))
+        except tk.TclError as e:
+            return {'skipped': f"нет дисплея: {e}"}
+        
+        try:
+            gui.root.withdraw()
+            gui.auth.register("bench", "bench")
+            gui.auth.login("bench", "bench")
+            user_id = gui.auth.current_user_data['id']
+            gui.promoter = YouTubeAutoPromoter("bench", user_id, gui.db, seed=1, persistence=gui.persistence)
+            gui.create_main_interface()
+            
+            sections = [
+                gui.show_dashboard, gui.show_content_generator, gui.show_analytics, gui.show_ai_assistant,
+                gui.show_planner, gui.show_automation, gui.show_simulation, gui.show_reports
+            ]
+            
+            def switch(show):
+                started = time.perf_counter()
+                show()
+                gui.root.update_idletasks()
+                return (time.perf_counter() - started) * 1000
+            
+            build = [switch(show) for show in sections]
+            warm = sorted(switch(show) for _ in range(rounds) for show in sections)
+            
+            refresh = []
+            for _ in range(rounds):
+                gui.promoter.simulate_channel_growth(1)
+                refresh.append(switch(gui.show_dashboard))
+                switch(gui.show_reports)
+            refresh.sort()
+            cached = len(gui.sections)
+        finally:
+            gui.persistence.shutdown()
+            flush_activity_log()
+            if gui.chart_manager is not None:
+                gui.chart_manager.close()
+            gui.db.close()
+            gui.root.destroy()
+    
+    return {
+        'build_ms': round(sum(build), 2),
+        'switch_mean_ms': round(sum(warm) / len(warm), 3),
+        'switch_p95_ms': round(warm[int(len(warm) * 0.95) - 1], 3),
+        'refresh_mean_ms': round(sum(refresh) / len(refresh), 3),
+        'sections_cached': cached
+    }
+
+# ================ КОМАНДНАЯ СТРОКА ================
+
+BENCHMARKS = {
+    'import': benchmark_import_time,
+    'database': benchmark_database,
+    'storage': benchmark_storage_contention,
+    'forecast': benchmark_forecast,
+    'batch': benchmark_batch_simulation,
+    'charts': benchmark_analytics_memory,
+    'stats-cache': benchmark_stats_cache,
+    'persistence': benchmark_persistence_queue,
+    'activity-log': benchmark_activity_log,
+    'activity-events': benchmark_activity_events,
+    'content-batch': benchmark_content_batch,
+    'content-render': benchmark_content_render,
+    'title-index': benchmark_title_index,
+    'paging': benchmark_paged_list,
+    'export': benchmark_export,
+    'reports': benchmark_reports,
+    'navigation': benchmark_navigation
+}
+
+class CLIError(Exception):
+    """Ошибка консольной команды (сообщение выводится пользователю)"""
+
+def _print_json(data):
+    print(json.dumps(data, ensure_ascii=False, indent=2, default=str))
+
+def _resolve_user_id(db, username):
+    """user_id пользователя по имени"""
+    user = db.get_user(username)
+    if not user:
+        raise CLIError(f"Пользователь не найден: {username}")
+    return user[4]
+
+def _cli_promoter(args, db):
+    user_id = _resolve_user_id(db, args.user)
+    return YouTubeAutoPromoter(args.user, user_id, db=db, seed=getattr(args, 'seed', None))
+
+def cli_simulate(args, db):
+    """Симуляция роста канала пользователя"""
+    promoter = _cli_promoter(args, db)
+    
+    def progress(stage, current, total):
+        print(f"[{current}/{total}] {stage}")
+    
+    results = promoter.run_extended_simulation(
+        args.hours,
+        update_callback=None if args.quiet else progress,
+        pacing=args.pacing,
+        seed=args.run_seed
+    )
+    print(f"📊 Результаты за {args.hours} часов (seed {results['seed']}):")
+    print(f"  📈 Подписчиков: +{results['subscribers']:,}")
+    print(f"  👁️ Просмотров: +{results['views']:,}")
+    print(f"  👍 Лайков: +{results['likes']:,}")
+    print(f"  💬 Комментариев: +{results['comments']:,}")
+    print(f"  📈 Всего подписчиков: {promoter.stats['subscribers']:,}")
+
+def cli_generate_content(args, db):
+    """Генерация контента для видео (--count > 1 - пакет черновиков)"""
+    if not 1 <= args.count <= CONTENT_BATCH_MAX:
+        raise CLIError(f"--count должен быть от 1 до {CONTENT_BATCH_MAX}")
+    
+    promoter = _cli_promoter(args, db)
+    if args.count == 1:
+        content = promoter.generate_video_content(args.category, args.keyword)
+        print(content['description'])
+        return
+    
+    started = time.perf_counter()
+    keywords = [keyword.strip() for keyword in args.keyword.split(',')]
+    items = promoter.generate_video_content_batch(args.category, keywords, args.count)
+    elapsed = time.perf_counter() - started
+    
+    for content in items:
+        print(content['title'])
+    print(f"✅ Создано черновиков: {len(items)} за {elapsed:.2f} с; видео на канале: {promoter.stats['videos_uploaded']}")
+
+def cli_list_tasks(args, db):
+    """Список задач пользователя"""
+    user_id = _resolve_user_id(db, args.user)
+    tasks = db.get_tasks(user_id, show_completed=args.all)
+    if not tasks:
+        print("Задач нет")
+    for task in tasks:
+        status = "✅" if task[6] else "⏳"
+        print(f"{status} #{task[0]} [{task[5]}] {task[2]} (до {task[4]})")
+
+def cli_export(args, db):
+    """Экспорт данных пользователя: JSON-файл или папка CSV/Parquet по таблицам"""
+    user_id = _resolve_user_id(db, args.user)
+    
+    if args.format in EXPORT_FORMATS:
+        output_dir = args.output or os.path.join(EXPORT_DIR, f"youtube_data_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        try:
+            summary = DataExporter(db).export(user_id, output_dir, fmt=args.format)
+        except ValueError as e:
+            raise CLIError(str(e))
+        _print_json(summary)
+        return
+    
+    output = args.output or f"youtube_data_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    data = {
+        'user_id': user_id,
+        'channel_stats': db.get_latest_channel_stats(user_id),
+        'simulation_history': db.get_simulation_history(user_id, limit=-1),
+        'video_content': db.get_video_content(user_id, limit=-1),
+        'tasks': db.get_tasks(user_id, show_completed=True)
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+    print(f"📤 Данные экспортированы: {output}")
+
+def cli_batch_simulate(args, db):
+    """Пакетная симуляция для всех (или указанных) пользователей"""
+    user_ids = [_resolve_user_id(db, name) for name in args.users] if args.users else db.get_user_ids()
+    summary = BatchSimulationRunner(db, workers=args.workers, seed=args.seed).run(user_ids, args.hours)
+    summary.pop('seeds')
+    _print_json(summary)
+
+def cli_forecast(args, db):
+    """Monte-Carlo прогноз роста канала"""
+    if args.scenarios < 1:
+        raise CLIError("--scenarios должен быть не меньше 1")
+    promoter = _cli_promoter(args, db)
+    forecast = promoter.forecast_growth(args.hours, scenarios=args.scenarios, seed=args.seed)
+    _print_json({'hours': forecast['hours'], 'scenarios': forecast['scenarios'], 'final': forecast['final']})
+
+def cli_compact_stats(args, db):
+    """Прореживание старой истории статистики каналов"""
+    _print_json(db.compact_channel_stats(args.older_than_days))
+
+def cli_report(args, db):
+    """Генерация отчетов в файлы"""
+    user_id = _resolve_user_id(db, args.user)
+    engine = ReportEngine(db, output_dir=args.output, workers=args.workers, period_days=args.days)
+    _print_json(engine.generate(user_id, args.types))
+
+def cli_bench(args, db):
+    """Запуск бенчмарков"""
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        raise CLIError(f"Неизвестные бенчмарки: {', '.join(unknown)}")
+    over_budget = []
+    for name in args.names or BENCHMARKS:
+        print(f"== {name}")
+        results = BENCHMARKS[name]()
+        _print_json(results)
+        # Регрессионные бенчмарки с бюджетом сообщают within_budget
+        if results.get('within_budget') is False:
+            over_budget.append(name)
+    if over_budget:
+        raise CLIError(f"Бюджет превышен: {', '.join(over_budget)}")
+
+def build_cli_parser():
+    """Парсер аргументов командной строки"""
+    parser = argparse.ArgumentParser(
+        prog='project2.py',
+        description="YouTube Аналитик: GUI (по умолчанию) и консольные команды"
+    )
+    parser.add_argument('--db', default="youtube_promo.db", help="файл базы данных SQLite")
+    subparsers = parser.add_subparsers(dest='command')
+    
+    subparsers.add_parser('gui', help="графический интерфейс (по умолчанию)")
+    
+    simulate = subparsers.add_parser('simulate', help="симуляция роста канала")
+    simulate.add_argument('--user', default='admin', help="имя пользователя")
+    simulate.add_argument('--hours', type=int, default=24)
+    simulate.add_argument('--pacing', choices=PACING_MODES, default=PACING_FAST)
+    simulate.add_argument('--seed', type=int, dest='run_seed', help="seed прогона (для повтора)")
+    simulate.add_argument('--quiet', action='store_true', help="не выводить этапы")
+    simulate.set_defaults(handler=cli_simulate)
+    
+    content = subparsers.add_parser('generate-content', help="генерация контента для видео")
+    content.add_argument('--user', default='admin')
+    content.add_argument('--category', default='education')
+    content.add_argument('--keyword', default='', help="ключевое слово; для пакета - список через запятую")
+    content.add_argument('--count', type=int, default=1, help=f"число черновиков (до {CONTENT_BATCH_MAX}) одной транзакцией")
+    content.add_argument('--seed', type=int)
+    content.set_defaults(handler=cli_generate_content)
+    
+    tasks = subparsers.add_parser('list-tasks', help="список задач")
+    tasks.add_argument('--user', default='admin')
+    tasks.add_argument('--all', action='store_true', help="включая выполненные")
+    tasks.set_defaults(handler=cli_list_tasks)
+    
+    export = subparsers.add_parser('export', help="экспорт данных пользователя")
+    export.add_argument('--user', default='admin')
+    export.add_argument('--output', help="путь к файлу (для csv/parquet - к папке)")
+    export.add_argument('--format', choices=('json', *EXPORT_FORMATS), default='json')
+    export.set_defaults(handler=cli_export)
+    
+    batch = subparsers.add_parser('batch-simulate', help="пакетная симуляция многих каналов")
+    batch.add_argument('--users', nargs='*', help="имена пользователей (по умолчанию все)")
+    batch.add_argument('--hours', type=int, default=24)
+    batch.add_argument('--workers', type=int, help="число процессов (по умолчанию по числу ядер)")
+    batch.add_argument('--seed', type=int)
+    batch.set_defaults(handler=cli_batch_simulate)
+    
+    forecast = subparsers.add_parser('forecast', help="Monte-Carlo прогноз роста")
+    forecast.add_argument('--user', default='admin')
+    forecast.add_argument('--hours', type=int, default=24 * 30)
+    forecast.add_argument('--scenarios', type=int, default=10000)
+    forecast.add_argument('--seed', type=int)
+    forecast.set_defaults(handler=cli_forecast)
+    
+    compact = subparsers.add_parser('compact-stats', help="прореживание старой истории статистики")
+    compact.add_argument('--older-than-days', type=int, default=30)
+    compact.set_defaults(handler=cli_compact_stats)
+    
+    report = subparsers.add_parser('report', help="генерация отчетов (PDF, Excel/CSV)")
+    report.add_argument('--user', default='admin')
+    report.add_argument('--types', nargs='*', choices=list(REPORT_TYPES), help="типы отчетов (по умолчанию все)")
+    report.add_argument('--days', type=int, default=REPORT_PERIOD_DAYS, help="период отчетов в днях")
+    report.add_argument('--workers', type=int, help="число процессов (по умолчанию по числу ядер)")
+    report.add_argument('--output', default=REPORTS_DIR, help="папка для файлов")
+    report.set_defaults(handler=cli_report)
+    
+    bench = subparsers.add_parser('bench', help="бенчмарки")
+    # Без choices: argparse 3.11 проверяет по ним и пустой список позиционных nargs='*'
+    bench.add_argument('names', nargs='*', metavar='NAME',
+                       help=f"бенчмарки: {', '.join(BENCHMARKS)} (по умолчанию все)")
+    bench.set_defaults(handler=cli_bench)
+    
+    return parser
+
+def run_gui(db_name="youtube_promo.db"):
+    """Запуск графического интерфейса"""
     print("=" * 60)
     print("🎬 YOUTUBE АНАЛИТИК 5.0")
     print("=" * 60)
@@ -3699,5 +8087,32 @@ if __name__ == "__main__":
     print("=" * 60)
     
     # Запускаем приложение
-    app = PremiumYouTubePromoGUI()
-    app.run()
\ No newline at end of file
+    app = PremiumYouTubePromoGUI(db_name)
+    app.run()
+
+def main(argv=None):
+    """Точка входа: без команды запускается GUI"""
+    args = build_cli_parser().parse_args(argv)
+    
+    if args.command in (None, 'gui'):
+        run_gui(args.db)
+        return 0
+    
+    with Database(args.db) as db:
+        try:
+            args.handler(args, db)
+        except CLIError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        finally:
+            # События команды пишутся в activity_events до закрытия БД
+            flush_activity_log()
+    return 0
+
+# ================ ЗАПУСК ПРОГРАММЫ ================
+
+if __name__ == "__main__":
+    # Нужно для ProcessPoolExecutor в собранном (frozen) приложении под Windows
+    multiprocessing.freeze_support()
+    
+    sys.exit(main())